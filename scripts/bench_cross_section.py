@@ -0,0 +1,45 @@
+# scripts/bench_cross_section.py
+import sys, argparse, pathlib, time
+repo = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(repo))
+
+import numpy as np
+import pandas as pd
+from src.quant_trader.features.cross_section import (
+    cs_rank, cs_zscore, cs_quantile_bucket, market_demean, group_demean,
+)
+
+
+def timed(label, fn, *a, **kw):
+    t0 = time.perf_counter()
+    out = fn(*a, **kw)
+    print(f"[bench] {label:<28} {time.perf_counter() - t0:8.2f}s")
+    return out
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--tickers", type=int, default=3000)
+    ap.add_argument("--dates", type=int, default=5000)
+    ap.add_argument("--sectors", type=int, default=11)
+    ap.add_argument("--compare", action="store_true", help="Also time groupby('date') on the long frame")
+    args = ap.parse_args()
+
+    rng = np.random.default_rng(0)
+    M = rng.normal(0.0, 0.02, (args.dates, args.tickers))
+    M[rng.random(M.shape) < 0.05] = np.nan
+    sectors = rng.integers(0, args.sectors, args.tickers)
+    print(f"[bench] matrix {args.dates} dates x {args.tickers} tickers")
+
+    timed("cs_rank", cs_rank, M)
+    timed("cs_zscore", cs_zscore, M)
+    timed("cs_quantile_bucket(5)", cs_quantile_bucket, M, 5)
+    timed("market_demean", market_demean, M)
+    timed("group_demean(sectors)", group_demean, M, sectors)
+
+    if args.compare:
+        long = pd.DataFrame(M).stack().rename("v").reset_index()
+        long.columns = ["date", "ticker", "v"]
+        g = long.groupby("date")["v"]
+        timed("groupby rank(pct)", g.rank, pct=True)
+        timed("groupby zscore", lambda: (long["v"] - g.transform("mean")) / g.transform("std"))
@@ -0,0 +1,42 @@
+# scripts/bench_importtime.py
+import sys, argparse, pathlib, subprocess, time
+repo = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(repo))
+
+from src.quant_trader.cli import COMMANDS
+
+
+def importtime(argv: list[str]) -> tuple[float, float, list[tuple[float, str]]]:
+    """
+    Run `python -X importtime <argv>`; return (import seconds, wall seconds, top-level packages by cost).
+    """
+    t0 = time.perf_counter()
+    res = subprocess.run([sys.executable, "-X", "importtime", *argv], cwd=repo, capture_output=True, text=True)
+    wall = time.perf_counter() - t0
+    top = []
+    for line in res.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum, name = line[len("import time:"):].split("|")
+        if not name[1:].startswith(" "):  # top-level import (no nesting indent)
+            top.append((int(cum) / 1e6, name.strip()))
+    return sum(t for t, _ in top), wall, sorted(top, reverse=True)
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--legacy", action="store_true", help="Also time `python scripts/<name>.py --help`")
+    ap.add_argument("--top", type=int, default=3, help="heaviest top-level imports to show")
+    args = ap.parse_args()
+
+    cases = [("quant_trader --help", ["-m", "src.quant_trader", "--help"])]
+    for cmd, (module, _) in COMMANDS.items():
+        cases.append((f"quant_trader {cmd} --help", ["-m", "src.quant_trader", cmd, "--help"]))
+        if args.legacy:
+            cases.append((f"scripts/{module.split('.')[1]}.py --help", [module.replace(".", "/") + ".py", "--help"]))
+
+    print(f"{'command':<40} {'imports':>8} {'wall':>8}  heaviest")
+    for label, argv in cases:
+        imp, wall, top = importtime(argv)
+        heavy = ", ".join(f"{n} {t:.2f}s" for t, n in top[:args.top])
+        print(f"{label:<40} {imp:7.2f}s {wall:7.2f}s  {heavy}")
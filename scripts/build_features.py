@@ -1,22 +1,25 @@
 # scripts/build_features.py
-import sys, argparse, pathlib, pandas as pd
+import sys, argparse, pathlib
 repo = pathlib.Path(__file__).resolve().parents[1]
 sys.path.append(str(repo))
 
 from pathlib import Path
 from src.quant_trader.utils.config import load_config
-from src.quant_trader.features.feature_set import build_feature_matrix
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--config", default="configs/base.yaml")
     args = ap.parse_args()
 
+    import pandas as pd
+    from src.quant_trader.features.feature_set import build_feature_matrix
+    from src.quant_trader.io.universe import universe_from_config
+
     cfg = load_config(args.config)
     proc_dir = Path("data/processed")
     df = pd.read_parquet(proc_dir / "prices.parquet")
 
-    X, y, meta = build_feature_matrix(df, cfg)
+    X, y, meta = build_feature_matrix(df, cfg, universe=universe_from_config(cfg))
     feat = X.copy(); feat["target"] = y; feat = feat.reset_index()
     feat.to_parquet(proc_dir / "features.parquet", index=False)
     print(f"[features] saved {proc_dir/'features.parquet'} rows={len(feat)}")
@@ -0,0 +1,59 @@
+# scripts/daemon.py
+import sys, argparse, json, pathlib
+repo = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(repo))
+
+DEFAULT_PORT = 8765  # = automation.daemon.DEFAULT_PORT
+
+
+def parse_params(items: list[str]) -> dict:
+    # key=value pairs; values parsed as JSON when possible (k=10, exact=true, names='["ret_5d"]')
+    out = {}
+    for item in items:
+        key, _, raw = item.partition("=")
+        try:
+            out[key] = json.loads(raw)
+        except json.JSONDecodeError:
+            out[key] = raw
+    return out
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Persistent worker keeping prices, features and models warm")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=DEFAULT_PORT)
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    s = sub.add_parser("serve", help="start the daemon (foreground)")
+    s.add_argument("--config", default="configs/base.yaml")
+    s.add_argument("--models", default="configs/models.yaml")
+    s.add_argument("--strategy", default="configs/strategy.yaml")
+    s.add_argument("--features", nargs="+", default=None)
+    s.add_argument("--no-persist", action="store_true", help="keep appended bars in memory only")
+    c = sub.add_parser("call", help="send a command to a running daemon")
+    c.add_argument("command", help="status | append | features | fit | score | simulate | reload | shutdown")
+    c.add_argument("params", nargs="*", help="key=value arguments")
+    c.add_argument("--bars", help="parquet/csv of bars for `append`")
+    args = ap.parse_args()
+
+    if args.cmd == "serve":
+        from src.quant_trader.automation.daemon import Worker, serve
+        from src.quant_trader.utils.config import load_config
+
+        cfg = load_config(args.config)
+        prices_path = cfg.get("data", {}).get("processed_parquet_path", "data/processed/prices.parquet")
+        worker = Worker(prices_path, features=args.features, models_yaml=args.models,
+                        random_state=cfg.get("project", {}).get("seed", 42), persist=not args.no_persist,
+                        config_path=args.config, strategy_path=args.strategy)
+        serve(worker, args.host, args.port,
+              config_files=[args.config, args.models, args.strategy],
+              code_dirs=[str(repo / "src" / "quant_trader")])
+    else:
+        from src.quant_trader.automation.daemon import call
+
+        params = parse_params(args.params)
+        if args.bars:
+            import pandas as pd
+            bars = pd.read_csv(args.bars) if args.bars.endswith(".csv") else pd.read_parquet(args.bars)
+            params["bars"] = bars
+        result = call(args.command, args.host, args.port, **params)
+        print(json.dumps(result, indent=2, default=str))
@@ -1,18 +1,22 @@
 # scripts/download_data.py
-import sys, argparse, pathlib, pandas as pd
+import sys, argparse, pathlib
 repo = pathlib.Path(__file__).resolve().parents[1]
 sys.path.append(str(repo))
 
 from pathlib import Path
 from src.quant_trader.utils.config import load_config
-from src.quant_trader.io.loaders import fetch_all
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--config", default="configs/base.yaml")
     ap.add_argument("--file-mode", action="store_true")
+    ap.add_argument("--full", action="store_true", help="re-download all history instead of appending new bars")
     args = ap.parse_args()
 
+    import pandas as pd
+    from src.quant_trader.io.loaders import fetch_all
+    from src.quant_trader.io.quality import check_prices
+
     cfg = load_config(args.config)
     proc_dir = Path("data/processed"); proc_dir.mkdir(parents=True, exist_ok=True)
     prices_path = proc_dir / "prices.parquet"
@@ -21,7 +25,14 @@ if __name__ == "__main__":
         df = pd.read_parquet(prices_path)
         print(f"[data] using existing {prices_path}, rows={len(df)}")
     else:
-        df = fetch_all(cfg)
+        df_old = None if args.full or not prices_path.exists() else pd.read_parquet(prices_path)
+        df = fetch_all(cfg, existing=df_old)
+        if df_old is not None:
+            print(f"[data] fetched {len(df)} new rows")
+            df = (pd.concat([df_old, df], ignore_index=True)
+                    .drop_duplicates(subset=["ticker", "date"], keep="last")
+                    .sort_values(["ticker", "date"]))
+        df, _ = check_prices(df, cfg)
         df.to_parquet(prices_path, index=False)
         print(f"[data] saved {prices_path}, rows={len(df)}")
 
@@ -0,0 +1,56 @@
+# scripts/feature_attribution.py
+import sys, argparse, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from src.quant_trader.utils.config import load_config
+
+
+def feature_columns(features_path: str, target_col: str = "target") -> list[str]:
+    """
+    Every numeric column of the features file except keys and labels (target, fwd_*).
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    schema = pq.read_schema(features_path)
+    return [f.name for f in schema
+            if (pa.types.is_floating(f.type) or pa.types.is_integer(f.type))
+            and f.name != target_col and not f.name.startswith("fwd_")]
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--config", default="configs/base.yaml")
+    ap.add_argument("--models", default="configs/models.yaml", help="attribution / ensemble settings")
+    ap.add_argument("--features", default="data/processed/features.parquet")
+    ap.add_argument("--columns", nargs="*", default=None, help="features to attribute (default: all numeric)")
+    ap.add_argument("--out-dir", default="docs")
+    ap.add_argument("--workers", type=int, default=None, help="processes (default: config / CPU count)")
+    args = ap.parse_args()
+
+    from src.quant_trader.modeling.attribution import feature_attribution
+
+    cfg = load_config(args.config)
+    mcfg = load_config(args.models) if pathlib.Path(args.models).exists() else {}
+    acfg = (mcfg or {}).get("attribution", {}) or {}
+    model = acfg.get("model", "random_forest")
+    params = (((mcfg or {}).get("ensemble", {}) or {}).get("models", {}) or {}).get(model)
+
+    summary, _, shap = feature_attribution(
+        features_path=args.features,
+        out_dir=args.out_dir,
+        feature_names=args.columns or feature_columns(args.features),
+        model=model,
+        params=params,
+        n_folds=int(acfg.get("n_folds", 4)),
+        n_repeats=int(acfg.get("n_repeats", 5)),
+        max_eval_rows=acfg.get("max_eval_rows", 200_000),
+        max_workers=args.workers or acfg.get("max_workers"),
+        shap_rows=int(acfg.get("shap_rows", 2000)),
+        random_state=cfg.get("project", {}).get("seed", 42),
+    )
+    print("[attribution] permutation importance (rise in test MSE when shuffled):")
+    print(summary.to_string(index=False))
+    if shap is not None:
+        print("[attribution] mean |SHAP|:")
+        print(shap.to_string(index=False))
+    print(f"[attribution] Saved → {args.out_dir}/permutation_importance.csv")
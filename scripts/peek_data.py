@@ -1,7 +1,7 @@
-import pandas as pd
+import pyarrow.parquet as pq
 p = "data/processed/prices.parquet"
-df = pd.read_parquet(p)
+pf = pq.ParquetFile(p)  # footer only: shape and schema without reading the data
 print("Path:", p)
-print("Rows, Cols:", df.shape)
-print("Columns:", df.columns.tolist())
-print(df.head(10))
+print("Rows, Cols:", (pf.metadata.num_rows, pf.metadata.num_columns))
+print("Columns:", pf.schema_arrow.names)
+print(next(pf.iter_batches(batch_size=10)).to_pandas() if pf.metadata.num_rows else "(empty)")
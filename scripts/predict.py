@@ -1,8 +1,9 @@
 # scripts/predict.py
-import pathlib, pandas as pd
+import pathlib
+import pyarrow.parquet as pq
 
 if __name__ == "__main__":
-    preds = pd.read_parquet(pathlib.Path("outputs/predictions/baseline.parquet"))
-    print("[predict] predictions loaded, rows=", len(preds))
-    print(preds.head())
-
+    pf = pq.ParquetFile(pathlib.Path("outputs/predictions/baseline.parquet"))
+    print("[predict] predictions loaded, rows=", pf.metadata.num_rows)
+    # first rows only; the footer gives the row count without reading the data
+    print(next(pf.iter_batches(batch_size=5)).to_pandas() if pf.metadata.num_rows else "(empty)")
@@ -0,0 +1,46 @@
+# scripts/query.py
+import sys, argparse, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+from src.quant_trader.io.query import QueryLayer
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Out-of-core SQL over data/processed and outputs (DuckDB)")
+    ap.add_argument("--root", default=".")
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    sub.add_parser("views", help="list registered views")
+    p = sub.add_parser("sql", help="run a SQL query")
+    p.add_argument("query")
+    p = sub.add_parser("head", help="first rows of a view")
+    p.add_argument("view")
+    p.add_argument("-n", type=int, default=10)
+    for name in ("stats", "slice"):
+        p = sub.add_parser(name, help="per-ticker stats" if name == "stats" else "date/ticker slice of a view")
+        p.add_argument("--start")
+        p.add_argument("--end")
+        p.add_argument("--tickers", nargs="*")
+        if name == "slice":
+            p.add_argument("--view", default="prices")
+            p.add_argument("--columns", nargs="*")
+    p = sub.add_parser("leaderboard", help="top sweep runs by a metric")
+    p.add_argument("--by", default="Sharpe")
+    p.add_argument("-n", type=int, default=20)
+    p.add_argument("--kind")
+    args = ap.parse_args()
+
+    q = QueryLayer(args.root)
+    if args.cmd == "views":
+        for name, src in q.views.items():
+            print(f"{name:24s} {src}")
+        raise SystemExit(0)
+    if args.cmd == "sql":
+        t = q.sql(args.query)
+    elif args.cmd == "head":
+        t = q.head(args.view, args.n)
+    elif args.cmd == "stats":
+        t = q.ticker_stats(args.start, args.end, args.tickers)
+    elif args.cmd == "slice":
+        t = q.slice(args.view, args.start, args.end, args.tickers, args.columns)
+    else:
+        t = q.leaderboard(args.by, args.n, args.kind)
+    print(t.to_pandas().to_string(index=False))
@@ -1,21 +1,25 @@
 # scripts/report.py
-import pathlib, pandas as pd, matplotlib.pyplot as plt
-from src.quant_trader.simulation.metrics import summarize
+import sys, argparse, pathlib
+sys.path.append(str(pathlib.Path(__file__).resolve().parents[1]))
+
+DEFAULT_STORE = "outputs/experiments"  # = io.experiments.DEFAULT_ROOT
 
 def collect_backtests(folder: pathlib.Path, prefix: str):
-    files = sorted(folder.glob(f"{prefix}*.parquet"), key=lambda x: x.stat().st_mtime)
-    return files
+    return sorted(folder.glob(f"{prefix}*.parquet"))
 
-def plot_all(backtests, out_path: pathlib.Path, title: str):
+def plot_runs(store, runs, out_path: pathlib.Path, title: str):
+    """
+    Equity curves for the selected runs only (one projected read of the returns table).
+    """
+    import matplotlib.pyplot as plt
+    rets = store.returns(runs["run_id"], columns=["date", "equity"])
+    names = dict(zip(runs["run_id"], runs["name"]))
     plt.figure(figsize=(10,6))
-    for f in backtests:
-        df = pd.read_parquet(f)
-        if "equity" not in df.columns:
-            continue
-        plt.plot(df["date"], df["equity"], lw=1.8, label=f.stem)
+    for rid, df in rets.groupby("run_id", sort=False):
+        plt.plot(df["date"], df["equity"], lw=1.8, label=names.get(rid, rid))
     plt.title(title)
     plt.xlabel("Date")
-    plt.ylabel("Equity ($)")
+    plt.ylabel("Equity")
     plt.legend()
     plt.grid(True, alpha=0.3)
     plt.tight_layout()
@@ -24,35 +28,38 @@ def plot_all(backtests, out_path: pathlib.Path, title: str):
     print(f"[plot] Saved comparison → {out_path}")
 
 if __name__ == "__main__":
-    out_bt = pathlib.Path("outputs/backtests")
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--store", default=DEFAULT_STORE)
+    ap.add_argument("--backtests", default="outputs/backtests", help="legacy per-run files to import once")
+    ap.add_argument("--top", type=int, default=10, help="runs per kind to list and plot")
+    ap.add_argument("--by", default="Sharpe")
+    args = ap.parse_args()
+
+    from src.quant_trader.io.experiments import ExperimentStore
+
     out_plots = pathlib.Path("outputs/plots")
     out_plots.mkdir(parents=True, exist_ok=True)
+    store = ExperimentStore(args.store)
 
-    if not out_bt.exists():
-        print("[report] No backtest directory found.")
-        raise SystemExit(0)
+    out_bt = pathlib.Path(args.backtests)
+    if out_bt.exists():
+        for kind in ("vec", "exact"):
+            added = store.ingest_files(collect_backtests(out_bt, f"{kind}_"), kind=kind)
+            if added:
+                print(f"[report] Imported {len(added)} {kind} backtests into {args.store}")
+    store.compact()
 
-    # === Vectorized Backtests ===
-    vec_files = collect_backtests(out_bt, "vec_")
-    if vec_files:
-        print(f"[report] Found {len(vec_files)} vectorized backtests")
-        for f in vec_files:
-            df = pd.read_parquet(f)
-            print(f"→ {f.name}")
-            print(summarize(df))
-        plot_all(vec_files, out_plots / "vec_comparison.png", "Vectorized Backtests")
-    else:
-        print("[report] No vectorized backtests found.")
-
-    # === Exact Backtests ===
-    ex_files = collect_backtests(out_bt, "exact_")
-    if ex_files:
-        print(f"[report] Found {len(ex_files)} exact backtests")
-        for f in ex_files:
-            df = pd.read_parquet(f)
-            print(f"→ {f.name}")
-            print(summarize(df.rename(columns={"equity":"_"}).assign(ret_port=df["ret_port"])))
-        plot_all(ex_files, out_plots / "exact_comparison.png", "Exact Backtests")
-    else:
-        print("[report] No exact backtests found.")
+    runs = store.runs()
+    if runs.empty:
+        print("[report] No runs found.")
+        raise SystemExit(0)
 
+    for kind, title in (("vec", "Vectorized Backtests"), ("exact", "Exact Backtests")):
+        n_kind = int((runs["kind"] == kind).sum())
+        if not n_kind:
+            print(f"[report] No {kind} runs found.")
+            continue
+        top = store.top(args.top, by=args.by, kind=kind)
+        print(f"[report] {n_kind} {kind} runs; top {len(top)} by {args.by}:")
+        print(top[["name", "CAGR", "Sharpe", "MaxDD", "N"]].to_string(index=False))
+        plot_runs(store, top, out_plots / f"{kind}_comparison.png", f"{title} (top {len(top)} by {args.by})")
@@ -5,22 +5,28 @@ repo = pathlib.Path(__file__).resolve().parents[1]
 sys.path.append(str(repo))
 
 from pathlib import Path
-import pandas as pd
-
-from dotenv import load_dotenv
-load_dotenv()  # loads variables from .env into os.environ
-
-from src.quant_trader.utils.config import load_config
-from src.quant_trader.io.loaders import fetch_all
-from src.quant_trader.features.feature_set import build_feature_matrix
-from src.quant_trader.modeling.baselines import run_baseline
-from src.quant_trader.simulation.vectorized import long_only_topk
-from src.quant_trader.simulation.exact import run_exact_long_only_topk
-from src.quant_trader.simulation.metrics import summarize
 
 
 def main(cfg_path: str, k: int, threshold: float | None, file_mode: bool):
+    # heavy imports live here so `--help` / bad arguments exit fast
+    import pandas as pd
+    from dotenv import load_dotenv
+    from src.quant_trader.utils.config import load_config
+    from src.quant_trader.io.loaders import fetch_all
+    from src.quant_trader.features.feature_set import build_feature_matrix
+    from src.quant_trader.modeling.baselines import run_baseline
+    from src.quant_trader.simulation.vectorized import long_only_topk
+    from src.quant_trader.simulation.exact import run_exact_long_only_topk
+    from src.quant_trader.simulation.metrics import summarize
+    from src.quant_trader.io.exchange import StageExchange
+    from src.quant_trader.io.quality import check_prices
+    from src.quant_trader.io.universe import universe_from_config
+    from src.quant_trader.io.experiments import ExperimentStore
+    from src.quant_trader.utils.time import calendar_from_config
+
+    load_dotenv()  # loads variables from .env into os.environ
     cfg = load_config(cfg_path)
+    universe = universe_from_config(cfg)   # None: static ticker list
 
     proc_dir = Path("data/processed")
     out_pred = Path("outputs/predictions")
@@ -29,56 +35,71 @@ def main(cfg_path: str, k: int, threshold: float | None, file_mode: bool):
     out_pred.mkdir(parents=True, exist_ok=True)
     out_bt.mkdir(parents=True, exist_ok=True)
 
-    # 1) DATA (Parquet + incremental loads)
-    prices_path = proc_dir / "prices.parquet"
-
-    if file_mode and prices_path.exists():
-        df = pd.read_parquet(prices_path)
-        print(f"[data] using existing {prices_path} rows={len(df)}")
-    else:
-        df_new = fetch_all(cfg)
-        if prices_path.exists():
-            df_old = pd.read_parquet(prices_path)
-            df = pd.concat([df_old, df_new], ignore_index=True)
-            df = df.drop_duplicates(subset=["ticker", "date"]).sort_values(["ticker", "date"])
+    # Stages hand Arrow tables to each other in memory; Parquet files are written
+    # by a background thread and are all on disk when the block exits.
+    with StageExchange() as ex:
+        # 1) DATA (Parquet + incremental loads)
+        prices_path = proc_dir / "prices.parquet"
+
+        if file_mode and prices_path.exists():
+            df = pd.read_parquet(prices_path)
+            print(f"[data] using existing {prices_path} rows={len(df)}")
         else:
-            df = df_new
-
-        df.to_parquet(prices_path, index=False)
-        print(f"[data] updated {prices_path} rows={len(df)}")
-
-    # 2) FEATURES
-    X, y, meta = build_feature_matrix(df, cfg)
-    feat = X.copy(); feat["target"] = y; feat = feat.reset_index()
-    (proc_dir / "features.parquet").write_bytes(feat.to_parquet(index=False) or b"")
-    print(f"[features] saved {proc_dir/'features.parquet'} rows={len(feat)}")
-
-    # 3) MODEL (baseline DT) -> predictions
-    metrics = run_baseline(
-        features_path=str(proc_dir / "features.parquet"),
-        out_path=str(out_pred / "baseline.parquet"),
-        max_depth=3,
-        test_quantile=0.80,
-        random_state=cfg.get("project", {}).get("seed", 42),
-    )
-    print("[model]", metrics)
-
-    # 4) SIMS (vectorized + exact)
-    preds = pd.read_parquet(out_pred / "baseline.parquet")
-
-    vec = long_only_topk(preds, k=k, threshold=threshold)
-    vec_path = out_bt / f"vec_k{k}_thr{('none' if threshold is None else f'{threshold:.0e}')}.parquet"
-    vec.to_parquet(vec_path, index=False)
-    print("[sim vec]", summarize(vec), "->", vec_path)
-
-    ex = run_exact_long_only_topk(
-        preds, k=k, initial_capital=100_000.0,
-        slippage_bps=5.0, commission_per_trade=0.0,
-        threshold=threshold,
-    )
-    ex_path = out_bt / f"exact_k{k}_thr{('none' if threshold is None else f'{threshold:.0e}')}.parquet"
-    ex.to_parquet(ex_path, index=False)
-    print("[sim exact]", summarize(ex.rename(columns={"equity":"_"}).assign(ret_port=ex["ret_port"])), "->", ex_path)
+            df_old = pd.read_parquet(prices_path) if prices_path.exists() else None
+            df_new = fetch_all(cfg, existing=df_old)   # new bars (full history for restated tickers)
+            if df_old is not None:
+                df = pd.concat([df_old, df_new], ignore_index=True)
+                df = df.drop_duplicates(subset=["ticker", "date"], keep="last").sort_values(["ticker", "date"])
+            else:
+                df = df_new
+
+            df, _ = check_prices(df, cfg)
+            ex.put("prices", df, path=prices_path)
+            print(f"[data] updated {prices_path} rows={len(df)}")
+
+        # 2) FEATURES
+        X, y, meta = build_feature_matrix(df, cfg, universe=universe)
+        feat = X.copy(); feat["target"] = y; feat = feat.reset_index()
+        ex.put("features", feat, path=proc_dir / "features.parquet")
+        print(f"[features] saving {proc_dir/'features.parquet'} rows={len(feat)}")
+
+        # 3) MODEL (baseline DT) -> predictions
+        metrics, preds_table = run_baseline(
+            features_path=ex.get("features"),
+            out_path=None,
+            max_depth=3,
+            test_quantile=0.80,
+            random_state=cfg.get("project", {}).get("seed", 42),
+            return_predictions=True,
+        )
+        ex.put("predictions", preds_table, path=out_pred / "baseline.parquet")
+        print("[model]", metrics)
+
+        # 4) SIMS (vectorized + exact)
+        preds = ex.get_pandas("predictions")
+
+        vec = long_only_topk(preds, k=k, threshold=threshold, universe=universe,
+                             calendar=calendar_from_config(cfg))
+        vec_path = out_bt / f"vec_k{k}_thr{('none' if threshold is None else f'{threshold:.0e}')}.parquet"
+        ex.put("vec", vec, path=vec_path)
+        print("[sim vec]", summarize(vec), "->", vec_path)
+
+        ex_df = run_exact_long_only_topk(
+            preds, k=k, initial_capital=100_000.0,
+            slippage_bps=5.0, commission_per_trade=0.0,
+            threshold=threshold, universe=universe,
+        )
+        ex_path = out_bt / f"exact_k{k}_thr{('none' if threshold is None else f'{threshold:.0e}')}.parquet"
+        ex.put("exact", ex_df, path=ex_path)
+        print("[sim exact]", summarize(ex_df.rename(columns={"equity":"_"}).assign(ret_port=ex_df["ret_port"])), "->", ex_path)
+
+        # one stored run per config name: re-runs replace it in the experiment store
+        # (after flush: the stored file mtimes keep report.py's ingest from re-importing them)
+        ex.flush()
+        store = ExperimentStore()
+        run_params = {"k": k, "threshold": threshold, "source": "run_pipeline"}
+        store.record(vec, kind="vec", name=vec_path.stem, params=run_params, replace=True, source_file=vec_path)
+        store.record(ex_df, kind="exact", name=ex_path.stem, params=run_params, replace=True, source_file=ex_path)
 
     print("Pipeline complete.")
 
@@ -1,2 +1,48 @@
-# Placeholder for cron/TaskScheduler integration
-print("Use cron/GitHub Actions to call scripts/run_pipeline.py on schedule.")
+# scripts/schedule_job.py
+import sys, argparse, pathlib
+repo = pathlib.Path(__file__).resolve().parents[1]
+sys.path.append(str(repo))
+
+from src.quant_trader.utils.config import load_config
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Run pipeline stages on cron schedules (configs/schedule.yaml)")
+    ap.add_argument("--config", default="configs/base.yaml", help="project.timezone, notifications")
+    ap.add_argument("--schedule", default="configs/schedule.yaml")
+    ap.add_argument("--list", action="store_true", help="print the next run time of every job and exit")
+    ap.add_argument("--history", action="store_true", help="print the run-history summary and exit")
+    ap.add_argument("--run-now", nargs="*", metavar="JOB", help="run these jobs once (respecting limits) and exit")
+    args = ap.parse_args()
+
+    from src.quant_trader.automation.cron import Scheduler
+    from src.quant_trader.automation.notifier import notifier_from_config
+
+    cfg = load_config(args.config)
+    tz = (cfg.get("project", {}) or {}).get("timezone", "UTC")
+    notifier = None if (args.list or args.history) else notifier_from_config(cfg)
+    sched = Scheduler.from_config(load_config(args.schedule), tz=tz, notifier=notifier)
+
+    if args.list:
+        for name, when in sorted(sched.next_run.items(), key=lambda kv: kv[1]):
+            print(f"{name:<20} {when.isoformat()}")
+    elif args.history:
+        for row in sched.history.summary():
+            print(row)
+    elif args.run_now is not None:
+        now = sched.clock.now()
+        for name in args.run_now or list(sched.jobs):
+            sched.next_run[name] = now
+        sched.tick()
+        sched.wait()
+        for row in sched.history.rows()[-len(args.run_now or sched.jobs):]:
+            print(row)
+    else:
+        print(f"[schedule] {len(sched.jobs)} jobs in {tz}; Ctrl-C to stop")
+        try:
+            sched.run()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            sched.shutdown(wait=False)
+    if notifier is not None:
+        notifier.close()
@@ -1,40 +1,120 @@
 # scripts/simulate.py
-import sys, argparse, pathlib, pandas as pd
+import sys, argparse, pathlib
 repo = pathlib.Path(__file__).resolve().parents[1]
 sys.path.append(str(repo))
 
 from pathlib import Path
 from src.quant_trader.utils.config import load_config
-from src.quant_trader.simulation.vectorized import long_only_topk
-from src.quant_trader.simulation.exact import run_exact_long_only_topk
-from src.quant_trader.simulation.metrics import summarize
 
 if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--config", default="configs/base.yaml")
     ap.add_argument("--k", type=int, default=5)
     ap.add_argument("--threshold", type=float, default=None)
+    ap.add_argument("--preds", default="outputs/predictions/baseline.parquet",
+                    help="predictions to trade (e.g. outputs/predictions/online.parquet)")
+    ap.add_argument("--strategy", default="configs/strategy.yaml", help="simulation.cost_model settings")
+    ap.add_argument("--regime", action="store_true",
+                    help="only trade names in strategies.regime_filtered.regimes (features/market_regime.py)")
+    ap.add_argument("--no-notify", action="store_true", help="skip trade notifications (config: notifications)")
     args = ap.parse_args()
 
+    import pandas as pd
+    from src.quant_trader.simulation.vectorized import long_only_topk, weighted_returns
+    from src.quant_trader.simulation.exact import run_exact_long_only_topk
+    from src.quant_trader.simulation.metrics import summarize
+    from src.quant_trader.simulation.costs import cost_model_from_config
+    from src.quant_trader.io.experiments import ExperimentStore
+    from src.quant_trader.io.universe import universe_from_config
+    from src.quant_trader.utils.time import calendar_from_config
+
     cfg = load_config(args.config)
-    out_pred = Path("outputs/predictions")
+    universe = universe_from_config(cfg)
+    notifier = None
+    if not args.no_notify:
+        from src.quant_trader.automation.notifier import notifier_from_config, trade_messages
+        notifier = notifier_from_config(cfg)
     out_bt = Path("outputs/backtests"); out_bt.mkdir(parents=True, exist_ok=True)
 
-    preds = pd.read_parquet(out_pred / "baseline.parquet")
+    preds = pd.read_parquet(Path(args.preds))
+
+    strat_cfg = (load_config(args.strategy) or {}) if Path(args.strategy).exists() else {}
+    sim_cfg = strat_cfg.get("simulation", {})
+    topk_cfg = (strat_cfg.get("strategies") or {}).get("long_only_topk", {})
+    sizing = topk_cfg.get("position_sizing", "equal")
+    flat_costs = (sim_cfg.get("cost_model") or {}).get("type", "flat") == "flat"
+    prices = None
+    if not flat_costs or sizing != "equal":
+        prices = pd.read_parquet(Path("data/processed/prices.parquet"))
+    cost_model = None if flat_costs else cost_model_from_config(prices, sim_cfg)
+    if args.regime:
+        from src.quant_trader.features.market_regime import build_regime_features, filter_by_regime
+        if prices is None:
+            prices = pd.read_parquet(Path("data/processed/prices.parquet"))
+        reg_cfg = (strat_cfg.get("strategies") or {}).get("regime_filtered", {}) or {}
+        preds = filter_by_regime(preds, build_regime_features(prices, strat_cfg.get("regime")),
+                                 reg_cfg.get("regimes", []))
+    weights = None
+    if sizing != "equal":
+        from src.quant_trader.simulation.portfolio import build_weights  # scipy only when needed
+        eligible = preds if universe is None else universe.filter(preds)
+        weights = build_weights(eligible, prices, method=sizing, k=args.k, threshold=args.threshold,
+                                **(topk_cfg.get("sizing") or {}))
 
     # Vectorized
-    vec = long_only_topk(preds, k=args.k, threshold=args.threshold)
+    if weights is None:
+        vec = long_only_topk(preds, k=args.k, threshold=args.threshold, universe=universe,
+                             calendar=calendar_from_config(cfg))
+    else:
+        vec = weighted_returns(preds, weights)
     vec_path = out_bt / f"vec_k{args.k}_thr{('none' if args.threshold is None else f'{args.threshold:.0e}')}.parquet"
     vec.to_parquet(vec_path, index=False)
     print("[sim vec]", summarize(vec), "->", vec_path)
+    run_params = {"k": args.k, "threshold": args.threshold, "position_sizing": sizing,
+                  "cost_model": (sim_cfg.get("cost_model") or {}).get("type", "flat"),
+                  "rebalance": sim_cfg.get("rebalance", "daily"),
+                  "accounting": sim_cfg.get("accounting", "target")}
+    store = ExperimentStore()
+    store.record(vec, kind="vec", name=vec_path.stem, params=run_params, replace=True, source_file=vec_path)
 
     # Exact
-    ex = run_exact_long_only_topk(
-        preds, k=args.k,
-        initial_capital=100_000.0,
-        slippage_bps=5.0, commission_per_trade=0.0,
-        threshold=args.threshold,
-    )
+    exact_kw = dict(k=args.k, initial_capital=100_000.0, slippage_bps=5.0, commission_per_trade=0.0,
+                    threshold=args.threshold, cost_model=cost_model, weights=weights, universe=universe)
+    if sim_cfg.get("accounting", "target") == "holdings":
+        from src.quant_trader.simulation.holdings import run_holdings_topk
+        ex = run_holdings_topk(preds, rebalance=sim_cfg.get("rebalance", "daily"),
+                               drift_threshold=float(sim_cfg.get("drift_threshold", 0.05)), **exact_kw)
+    else:
+        ex = run_exact_long_only_topk(preds, **exact_kw)
     ex_path = out_bt / f"exact_k{args.k}_thr{('none' if args.threshold is None else f'{args.threshold:.0e}')}.parquet"
     ex.to_parquet(ex_path, index=False)
     print("[sim exact]", summarize(ex.rename(columns={"equity":"_"}).assign(ret_port=ex["ret_port"])), "->", ex_path)
+    store.record(ex, kind="exact", name=ex_path.stem, params=run_params, replace=True, source_file=ex_path)
+
+    risk_cfg = strat_cfg.get("risk") or {}
+    if risk_cfg:
+        from src.quant_trader.simulation.risk import benchmark_returns, factor_returns, rolling_risk
+        prices_path = Path("data/processed/prices.parquet")
+        bench_tickers = (strat_cfg.get("benchmarks") or {}).get("tickers") or cfg.get("data", {}).get("benchmarks", [])
+        bench = benchmark_returns(str(prices_path), bench_tickers) if prices_path.exists() else None
+        factors = None
+        if risk_cfg.get("factors") and prices_path.exists():
+            if prices is None:
+                prices = pd.read_parquet(prices_path, columns=["ticker", "date", "close", "volume"])
+            mkt = bench[bench_tickers[0]] if bench is not None and bench_tickers and bench_tickers[0] in bench else None
+            factors = factor_returns(prices, market=mkt)
+        R = pd.DataFrame({"vec": vec.set_index("date")["ret_port"], "exact": ex.set_index("date")["ret_port"]})
+        risk = rolling_risk(R, window=int(risk_cfg.get("window", 63)), alpha=float(risk_cfg.get("alpha", 0.05)),
+                            benchmarks=bench, factors=factors, min_periods=risk_cfg.get("min_periods"))
+        # not a backtest: kept out of outputs/backtests, which QueryLayer reads as runs
+        out_risk = Path("outputs/risk"); out_risk.mkdir(parents=True, exist_ok=True)
+        risk_path = out_risk / f"risk_k{args.k}_thr{('none' if args.threshold is None else f'{args.threshold:.0e}')}.parquet"
+        risk.to_parquet(risk_path, index=False)
+        print("[sim risk]", risk.groupby("series").last().drop(columns="date").round(4).to_dict("index"),
+              "->", risk_path)
+
+    if notifier is not None:
+        # trades of the latest rebalance only; earlier rows were announced by earlier runs
+        since = ex["date"].iloc[-2] if len(ex) > 1 else None
+        notifier.notify_all(trade_messages(ex, since=since))
+        notifier.close()
@@ -17,15 +17,12 @@ def maybe_benchmark() -> pd.DataFrame:
     p = Path("data/processed/prices.parquet")
     if not p.exists():
         return pd.DataFrame()
-    df = pd.read_parquet(p)
-    df["date"] = pd.to_datetime(df["date"])
-    spy = df[df["ticker"] == "SPY"].sort_values("date").copy()
-    if spy.empty:
+    # only the SPY rows / close column are read
+    from src.quant_trader.simulation.risk import benchmark_returns
+    bench = benchmark_returns(str(p), ["SPY"], forward=False)
+    if bench.empty:
         return pd.DataFrame()
-
-    import numpy as np
-    spy["ret_bench"] = np.log(1.0 + spy["close"].pct_change())
-    return spy[["date", "ret_bench"]]
+    return bench["SPY"].rename("ret_bench").rename_axis("date").reset_index()
 
 
 def main(k: int, threshold: float | None):
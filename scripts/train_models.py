@@ -3,21 +3,21 @@ import sys, argparse, pathlib, yaml
 repo = pathlib.Path(__file__).resolve().parents[1]
 sys.path.append(str(repo))
 
-from dotenv import load_dotenv
-load_dotenv()  # loads variables from .env into os.environ
-
 from pathlib import Path
 from src.quant_trader.utils.config import load_config
-from src.quant_trader.modeling.baselines import run_baseline
 
 
-def load_model_params(models_yaml: str) -> dict:
+def load_model_params(models_yaml: str, model: str = "decision_tree") -> dict:
     p = Path(models_yaml)
     if not p.exists():
         # Safe defaults if models.yaml is missing
-        return {"max_depth": 3, "min_samples_leaf": 1}
+        return {"max_depth": 3, "min_samples_leaf": 1} if model == "decision_tree" else {}
     with p.open("r", encoding="utf-8") as f:
         data = yaml.safe_load(f) or {}
+    if model != "decision_tree":
+        # first value of each search list under models.<model>
+        m = (data.get("models", {}) or {}).get(model, {}) or {}
+        return {k: v[0] if isinstance(v, list) else v for k, v in m.items() if k not in ("use", "params_space")}
     dt = (data.get("models", {}) or {}).get("decision_tree", {}) or {}
     return {
         "max_depth": int(dt.get("max_depth", 3)) if not isinstance(dt.get("max_depth"), list) else int(dt.get("max_depth")[0]),
@@ -29,12 +29,91 @@ if __name__ == "__main__":
     ap = argparse.ArgumentParser()
     ap.add_argument("--config", default="configs/base.yaml")
     ap.add_argument("--models", default="configs/models.yaml", help="Model config with tuned params")
+    ap.add_argument("--online", action="store_true", help="incremental update of the persisted online model (models.yaml: online)")
+    ap.add_argument("--full-refit", action="store_true", help="with --online: refit on all history now")
+    ap.add_argument("--partition", choices=["pooled", "ticker", "cluster"], default=None,
+                    help="one model per partition, fit in a process pool (models.yaml: partitioned)")
+    ap.add_argument("--workers", type=int, default=None, help="with --partition: processes (default: config / CPU count)")
+    ap.add_argument("--ensemble", action="store_true",
+                    help="score every model in models.yaml: ensemble and write the blends")
     args = ap.parse_args()
 
+    from dotenv import load_dotenv
+    load_dotenv()  # loads variables from .env into os.environ
+
     cfg = load_config(args.config)
     proc_dir = Path("data/processed")
     out_pred = Path("outputs/predictions"); out_pred.mkdir(parents=True, exist_ok=True)
 
+    if args.online:
+        from src.quant_trader.modeling.online import update_online
+        ocfg = {}
+        if Path(args.models).exists():
+            ocfg = (load_config(args.models) or {}).get("online", {}) or {}
+        method = ocfg.get("method", "sgd")
+        metrics = update_online(
+            features_path=str(proc_dir / "features.parquet"),
+            out_path=ocfg.get("predictions", str(out_pred / "online.parquet")),
+            state_dir=ocfg.get("state_dir", "outputs/models/online"),
+            method=method,
+            params=ocfg.get(method),
+            full_refit=args.full_refit,
+            full_refit_every=ocfg.get("full_refit_every", 20),
+            drift_window_days=ocfg.get("drift_window_days", 60),
+            test_quantile=0.80,
+            random_state=cfg.get("project", {}).get("seed", 42),
+        )
+        print("[train online]", metrics)
+        raise SystemExit(0)
+
+    from src.quant_trader.io.universe import universe_from_config
+
+    if args.partition:
+        from src.quant_trader.modeling.partitioned import train_partitioned
+        pcfg = {}
+        if Path(args.models).exists():
+            pcfg = (load_config(args.models) or {}).get("partitioned", {}) or {}
+        model = pcfg.get("model", "decision_tree")
+        params = load_model_params(args.models, model)
+        metrics, timings = train_partitioned(
+            features_path=str(proc_dir / "features.parquet"),
+            by=args.partition,
+            out_path=str(out_pred / "partitioned_{by}.parquet"),
+            clusters=(cfg.get("data", {}) or {}).get("sectors"),
+            model=model,
+            params=params,
+            test_quantile=0.80,
+            random_state=cfg.get("project", {}).get("seed", 42),
+            max_workers=args.workers or pcfg.get("max_workers"),
+            min_train_rows=int(pcfg.get("min_train_rows", 50)),
+            universe=universe_from_config(cfg),
+        )
+        print("[train partitioned]", metrics)
+        print(timings.sort_values("fit_s", ascending=False).head(10).to_string(index=False))
+        raise SystemExit(0)
+
+    if args.ensemble:
+        from src.quant_trader.modeling.ensemble import BLENDS, DEFAULT_CACHE_DIR, run_ensemble
+        ecfg = {}
+        if Path(args.models).exists():
+            ecfg = (load_config(args.models) or {}).get("ensemble", {}) or {}
+        metrics, _ = run_ensemble(
+            features_path=str(proc_dir / "features.parquet"),
+            out_dir=str(out_pred),
+            models=ecfg.get("models"),
+            blends=ecfg.get("blends", BLENDS),
+            test_quantile=0.80,
+            n_folds=int(ecfg.get("n_folds", 4)),
+            random_state=cfg.get("project", {}).get("seed", 42),
+            cache_dir=ecfg.get("cache_dir", DEFAULT_CACHE_DIR),
+            universe=universe_from_config(cfg),
+        )
+        print("[train ensemble]")
+        print(metrics.drop(columns=["detail"]).to_string(index=False))
+        raise SystemExit(0)
+
+    from src.quant_trader.modeling.baselines import run_baseline
+
     # Read tuned params (Optuna writes winners as scalars into configs/models.yaml)
     params = load_model_params(args.models)
     max_depth = params["max_depth"]
@@ -49,6 +128,7 @@ if __name__ == "__main__":
         min_samples_leaf=min_samples_leaf,
         test_quantile=0.80,
         random_state=cfg.get("project", {}).get("seed", 42),
+        universe=universe_from_config(cfg),
     )
     print("[train]", metrics)
 
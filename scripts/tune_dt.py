@@ -3,25 +3,32 @@ import sys, argparse, pathlib, shutil
 repo = pathlib.Path(__file__).resolve().parents[1]
 sys.path.append(str(repo))
 
-import optuna
-import pandas as pd
 import yaml
-from sklearn.tree import DecisionTreeRegressor
-from sklearn.metrics import mean_squared_error
 
-from src.quant_trader.modeling.datasets import make_splits
 from src.quant_trader.utils.config import load_config
 
 
-def objective(trial, feat_path: pathlib.Path):
-    df = pd.read_parquet(feat_path)
+def load_dataset(prices_path: pathlib.Path, features: list[str], test_quantile: float = 0.80,
+                 targets: dict | None = None) -> dict:
+    """
+    Request `features` (+ target) by name from the lazy feature store once,
+    then split by date for every trial to reuse.
+    """
+    import numpy as np
+    from src.quant_trader.features.lazy import load_features
+    from src.quant_trader.modeling.datasets import time_split
 
-    # minimal feature set; extend if you add more engineered features
-    X = df[["ret_1d", "rsi_14"]]
-    y = df["target"]
-    meta = df[["ticker", "date"]]
+    df = load_features(str(prices_path), [*features, "target"], targets=targets)
+    df = df.dropna(subset=[*features, "target"])
+    order, n_train, _ = time_split(df["date"].to_numpy(dtype="datetime64[ns]"), test_quantile)
+    X = df[features].to_numpy(dtype=np.float32)[order]
+    y = df["target"].to_numpy(dtype=np.float64)[order]
+    return {"X_train": X[:n_train], "y_train": y[:n_train], "X_test": X[n_train:], "y_test": y[n_train:]}
 
-    ds = make_splits(X, y, meta, cfg=None, test_quantile=0.80)
+
+def objective(trial, ds: dict):
+    from sklearn.tree import DecisionTreeRegressor
+    from sklearn.metrics import mean_squared_error
 
     # search space
     max_depth = trial.suggest_int("max_depth", 2, 12)
@@ -72,14 +79,20 @@ if __name__ == "__main__":
     ap.add_argument("--config", default="configs/base.yaml")
     ap.add_argument("--models", default="configs/models.yaml")
     ap.add_argument("--n-trials", type=int, default=30)
+    ap.add_argument("--features", nargs="+", default=["ret_1d", "rsi_14"],
+                    help="Feature names resolved by the lazy feature store (e.g. ret_5d bb_width_20)")
     args = ap.parse_args()
 
     cfg = load_config(args.config)
-    feat_path = pathlib.Path("data/processed/features.parquet")
-    assert feat_path.exists(), "Run feature building first (e.g., `make run` once)."
+    prices_path = pathlib.Path(cfg.get("data", {}).get("processed_parquet_path", "data/processed/prices.parquet"))
+    assert prices_path.exists(), "Fetch prices first (e.g., `make data` once)."
+
+    import optuna
+    targets = (load_config(args.models) or {}).get("targets") if pathlib.Path(args.models).exists() else None
+    ds = load_dataset(prices_path, args.features, targets=targets)
 
     study = optuna.create_study(direction="minimize")
-    study.optimize(lambda t: objective(t, feat_path), n_trials=args.n_trials)
+    study.optimize(lambda t: objective(t, ds), n_trials=args.n_trials)
 
     print("Best params:", study.best_params)
     print("Best MSE:", study.best_value)
@@ -0,0 +1,4 @@
+# src/quant_trader/__main__.py
+from src.quant_trader.cli import main
+
+raise SystemExit(main())
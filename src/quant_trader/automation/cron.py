@@ -1 +1,374 @@
-# Helpers for scheduling (cron examples, GitHub Actions)
+# src/quant_trader/automation/cron.py
+"""
+In-process scheduler for pipeline stages.
+
+    sched = Scheduler.from_config(load_config("configs/schedule.yaml"), tz="America/Toronto")
+    sched.run()
+
+- Jobs fire on 5-field cron expressions ("m h dom mon dow") evaluated in the
+  project timezone (configs/base.yaml::project.timezone), DST-aware.
+- At most `max_workers` runs at once; `group_limits` caps runs per group, e.g.
+  {"fetch": 3, "features": 1} lets providers download concurrently while feature
+  builds are serialized. Runs wait in a queue until their group has room.
+- A job that is still running when it fires again is skipped (recorded as
+  "skipped"), unless allow_overlap is set.
+- Command jobs get hard timeouts (the subprocess is killed); callable jobs get soft
+  ones (recorded as "timeout" when they finish late). Failed attempts are retried
+  `retries` times after `retry_delay` seconds.
+- Every attempt is recorded in a SQLite run-history table with its duration.
+- With a Notifier, final failures/timeouts and runs far slower than the job's
+  history are queued as notifications (delivered off the job thread).
+- Time comes from a Clock; FakeClock makes the whole thing deterministic in tests.
+"""
+from __future__ import annotations
+import sqlite3
+import subprocess
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Callable
+from zoneinfo import ZoneInfo
+
+from src.quant_trader.automation.notifier import Notifier, failure_message, timing_anomaly
+from src.quant_trader.utils.logging import logger
+
+_FIELDS = [("minute", 0, 59), ("hour", 0, 23), ("day", 1, 31), ("month", 1, 12), ("weekday", 0, 7)]
+
+
+# ---- cron expressions ---------------------------------------------------------------
+
+def _parse_field(spec: str, lo: int, hi: int, name: str) -> frozenset[int]:
+    out: set[int] = set()
+    for part in spec.split(","):
+        rng, _, step = part.partition("/")
+        if rng == "*":
+            a, b = lo, hi
+        elif "-" in rng:
+            a, b = (int(x) for x in rng.split("-", 1))
+        else:
+            a = b = int(rng)
+            if step:
+                b = hi
+        if not (lo <= a <= hi and lo <= b <= hi and a <= b):
+            raise ValueError(f"cron {name} out of range: {part!r}")
+        out.update(range(a, b + 1, int(step) if step else 1))
+    if name == "weekday":           # 0 and 7 are both Sunday
+        out = {0 if v == 7 else v for v in out}
+    return frozenset(out)
+
+
+@dataclass(frozen=True)
+class CronExpr:
+    minute: frozenset[int]
+    hour: frozenset[int]
+    day: frozenset[int]
+    month: frozenset[int]
+    weekday: frozenset[int]           # 0 = Sunday
+    any_day: bool = True              # dom == "*"
+    any_weekday: bool = True          # dow == "*"
+
+    @classmethod
+    def parse(cls, expr: str) -> "CronExpr":
+        parts = expr.split()
+        if len(parts) != 5:
+            raise ValueError(f"cron expression needs 5 fields (m h dom mon dow): {expr!r}")
+        sets = [_parse_field(p, lo, hi, name) for p, (name, lo, hi) in zip(parts, _FIELDS)]
+        return cls(*sets, any_day=parts[2] == "*", any_weekday=parts[4] == "*")
+
+    def _day_ok(self, d: datetime) -> bool:
+        dom = d.day in self.day
+        dow = (d.isoweekday() % 7) in self.weekday
+        if self.any_day or self.any_weekday:
+            return dom and dow
+        return dom or dow                      # both restricted: either matches (classic cron)
+
+    def next_after(self, after: datetime, tz: ZoneInfo) -> datetime:
+        """
+        First matching wall-clock minute strictly after `after` (aware), as an aware
+        datetime in `tz`. Wall times skipped by a DST jump never fire; repeated ones fire once.
+        """
+        t = after.astimezone(tz).replace(second=0, microsecond=0, tzinfo=None) + timedelta(minutes=1)
+        limit = t + timedelta(days=366 * 5)
+        while t < limit:
+            if t.month not in self.month:
+                t = (t.replace(day=1, hour=0, minute=0) + timedelta(days=32)).replace(day=1)
+                continue
+            if not self._day_ok(t):
+                t = t.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if t.hour not in self.hour:
+                t = t.replace(minute=0) + timedelta(hours=1)
+                continue
+            if t.minute not in self.minute:
+                t += timedelta(minutes=1)
+                continue
+            local = t.replace(tzinfo=tz)
+            # nonexistent wall time (spring forward): the UTC round trip moves it
+            if local.astimezone(timezone.utc).astimezone(tz).replace(tzinfo=None) == t:
+                return local
+            t += timedelta(minutes=1)
+        raise ValueError("cron expression never matches")
+
+
+# ---- clocks -------------------------------------------------------------------------
+
+class Clock:
+    def now(self) -> datetime:
+        return datetime.now(timezone.utc)
+
+    def sleep(self, seconds: float) -> None:
+        time.sleep(max(seconds, 0.0))
+
+
+class FakeClock(Clock):
+    """
+    Manually advanced clock: sleep() advances time instead of blocking.
+    """
+
+    def __init__(self, start: datetime):
+        self._now = start
+        self._lock = threading.Lock()
+
+    def now(self) -> datetime:
+        with self._lock:
+            return self._now
+
+    def sleep(self, seconds: float) -> None:
+        self.advance(seconds)
+
+    def advance(self, seconds: float) -> None:
+        with self._lock:
+            self._now += timedelta(seconds=max(seconds, 0.0))
+
+
+# ---- history --------------------------------------------------------------------------
+
+class RunHistory:
+    """
+    SQLite table of job attempts: job, scheduled_for, started_at, finished_at,
+    duration_s, attempt, status (ok | failed | timeout | skipped), error.
+    """
+
+    def __init__(self, path: str | Path = ":memory:"):
+        if str(path) != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._con = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock:
+            self._con.execute("""
+                create table if not exists runs (
+                    job text, scheduled_for text, started_at text, finished_at text,
+                    duration_s real, attempt integer, status text, error text)""")
+            self._con.commit()
+
+    def record(self, job: str, scheduled_for: datetime, started_at: datetime, finished_at: datetime,
+               attempt: int, status: str, error: str | None = None) -> None:
+        with self._lock:
+            self._con.execute(
+                "insert into runs values (?, ?, ?, ?, ?, ?, ?, ?)",
+                (job, scheduled_for.isoformat(), started_at.isoformat(), finished_at.isoformat(),
+                 (finished_at - started_at).total_seconds(), attempt, status, error))
+            self._con.commit()
+
+    def rows(self, job: str | None = None) -> list[dict]:
+        q = "select * from runs" + (" where job = ?" if job else "") + " order by rowid"
+        with self._lock:
+            cur = self._con.execute(q, (job,) if job else ())
+            cols = [c[0] for c in cur.description]
+            return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+    def summary(self) -> list[dict]:
+        """
+        Per job: attempts, status counts, mean/max duration of completed attempts.
+        """
+        with self._lock:
+            cur = self._con.execute("""
+                select job, count(*) as attempts,
+                       sum(status = 'ok') as ok, sum(status = 'failed') as failed,
+                       sum(status = 'timeout') as timeout, sum(status = 'skipped') as skipped,
+                       avg(case when status != 'skipped' then duration_s end) as mean_s,
+                       max(duration_s) as max_s, max(started_at) as last_started
+                from runs group by job order by job""")
+            cols = [c[0] for c in cur.description]
+            return [dict(zip(cols, r)) for r in cur.fetchall()]
+
+
+# ---- jobs & scheduler ---------------------------------------------------------------------
+
+@dataclass
+class Job:
+    name: str
+    cron: str
+    fn: Callable[[], object] | None = None      # callable job (soft timeout)
+    command: list[str] | None = None            # subprocess job (hard timeout)
+    group: str | None = None
+    timeout: float | None = None
+    retries: int = 0
+    retry_delay: float = 0.0
+    allow_overlap: bool = False
+    expr: CronExpr = field(init=False)
+
+    def __post_init__(self):
+        if (self.fn is None) == (self.command is None):
+            raise ValueError(f"job {self.name!r}: give exactly one of fn / command")
+        self.expr = CronExpr.parse(self.cron)
+
+
+class Scheduler:
+    def __init__(self, jobs: list[Job], tz: str = "UTC", max_workers: int = 4,
+                 group_limits: dict[str, int] | None = None, clock: Clock | None = None,
+                 history: RunHistory | None = None, notifier: Notifier | None = None):
+        self.jobs = {j.name: j for j in jobs}
+        self.tz = ZoneInfo(tz)
+        self.max_workers = int(max_workers)
+        self.group_limits = dict(group_limits or {})
+        self.clock = clock or Clock()
+        self.history = history or RunHistory()
+        self.notifier = notifier
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="job")
+        self._lock = threading.Lock()
+        self._pending: deque[tuple[Job, datetime]] = deque()
+        self._running: dict[str, int] = {}           # job -> active runs
+        self._group_running: dict[str, int] = {}
+        self._futures: list = []
+        now = self.clock.now()
+        self.next_run = {j.name: j.expr.next_after(now, self.tz) for j in jobs}
+
+    @classmethod
+    def from_config(cls, cfg: dict, tz: str = "UTC", clock: Clock | None = None,
+                    notifier: Notifier | None = None) -> "Scheduler":
+        """
+        Build from configs/schedule.yaml: {scheduler: {max_workers, group_limits, history}, jobs: {name: {...}}}.
+        """
+        scfg = cfg.get("scheduler", {}) or {}
+        jobs = [Job(name=name, **spec) for name, spec in (cfg.get("jobs", {}) or {}).items()]
+        hist = scfg.get("history")
+        return cls(jobs, tz=scfg.get("timezone", tz), max_workers=scfg.get("max_workers", 4),
+                   group_limits=scfg.get("group_limits"), clock=clock,
+                   history=RunHistory(hist) if hist else None, notifier=notifier)
+
+    # ---- dispatch ----------------------------------------------------------------------
+
+    def tick(self) -> list[str]:
+        """
+        Queue every job that is due, then start queued runs that fit the limits.
+        Returns the names of runs started.
+        """
+        now = self.clock.now()
+        with self._lock:
+            for name, job in self.jobs.items():
+                due = self.next_run[name]
+                if due > now:
+                    continue
+                self.next_run[name] = job.expr.next_after(now, self.tz)
+                busy = self._running.get(name, 0) or any(j.name == name for j, _ in self._pending)
+                if busy and not job.allow_overlap:
+                    logger.info("scheduler: %s still running, skipping %s", name, due.isoformat())
+                    self.history.record(name, due, now, now, 0, "skipped", "previous run still active")
+                    continue
+                self._pending.append((job, due))
+            return self._dispatch()
+
+    def _dispatch(self) -> list[str]:
+        started, waiting = [], deque()
+        active = sum(self._running.values())
+        while self._pending:
+            job, due = self._pending.popleft()
+            limit = self.group_limits.get(job.group) if job.group else None
+            if active >= self.max_workers or (limit is not None and self._group_running.get(job.group, 0) >= limit):
+                waiting.append((job, due))
+                continue
+            self._running[job.name] = self._running.get(job.name, 0) + 1
+            if job.group:
+                self._group_running[job.group] = self._group_running.get(job.group, 0) + 1
+            active += 1
+            self._futures.append(self._pool.submit(self._execute, job, due))
+            started.append(job.name)
+        self._pending = waiting
+        return started
+
+    def _execute(self, job: Job, due: datetime) -> None:
+        try:
+            for attempt in range(1, job.retries + 2):
+                t0 = self.clock.now()
+                status, error = self._attempt(job)
+                t1 = self.clock.now()
+                if status == "ok":
+                    self._check_timing(job, (t1 - t0).total_seconds())
+                self.history.record(job.name, due, t0, t1, attempt, status, error)
+                if status == "ok":
+                    break
+                logger.warning("scheduler: %s attempt %d %s: %s", job.name, attempt, status, error)
+                if attempt == job.retries + 1 and self.notifier is not None:
+                    self.notifier.notify(failure_message(job.name, f"{status}: {error}", attempt))
+                if attempt <= job.retries and job.retry_delay:
+                    self.clock.sleep(job.retry_delay)
+        finally:
+            with self._lock:
+                self._running[job.name] -= 1
+                if job.group:
+                    self._group_running[job.group] -= 1
+                self._dispatch()            # a slot freed up: start waiting runs
+
+    def _check_timing(self, job: Job, duration_s: float) -> None:
+        if self.notifier is None:
+            return
+        past = [r["duration_s"] for r in self.history.rows(job.name) if r["status"] == "ok"]
+        msg = timing_anomaly(job.name, duration_s, past[-50:])
+        if msg is not None:
+            self.notifier.notify(msg)
+
+    def _attempt(self, job: Job) -> tuple[str, str | None]:
+        t0 = time.monotonic()
+        try:
+            if job.command is not None:
+                subprocess.run(job.command, check=True, timeout=job.timeout, capture_output=True, text=True)
+            else:
+                job.fn()
+        except subprocess.TimeoutExpired:
+            return "timeout", f"killed after {job.timeout}s"
+        except subprocess.CalledProcessError as e:
+            return "failed", (e.stderr or "").strip()[-500:] or f"exit code {e.returncode}"
+        except Exception as e:
+            return "failed", f"{type(e).__name__}: {e}"
+        if job.timeout is not None and time.monotonic() - t0 > job.timeout:
+            return "timeout", f"finished after the {job.timeout}s limit"
+        return "ok", None
+
+    # ---- loop ------------------------------------------------------------------------
+
+    def wait(self) -> None:
+        """
+        Block until every started run (including runs they released) has finished.
+        """
+        while True:
+            with self._lock:
+                futs = [f for f in self._futures if not f.done()]
+                self._futures = futs
+                idle = not futs and not self._pending
+            if idle:
+                return
+            for f in futs:
+                f.result()
+
+    def run(self, until: datetime | None = None, poll: float = 30.0) -> None:
+        """
+        Tick until `until` (forever if None), sleeping to the next due time (at most `poll` s).
+        """
+        while until is None or self.clock.now() < until:
+            self.tick()
+            nxt = min(self.next_run.values(), default=None)
+            now = self.clock.now()
+            gap = poll if nxt is None else min(poll, max((nxt - now).total_seconds(), 0.0))
+            if until is not None:
+                gap = min(gap, max((until - now).total_seconds(), 0.0))
+            self.clock.sleep(gap if gap > 0 else 0.001)
+
+    def shutdown(self, wait: bool = True) -> None:
+        if wait:
+            self.wait()
+        self._pool.shutdown(wait=wait)
@@ -0,0 +1,491 @@
+# src/quant_trader/automation/daemon.py
+"""
+Persistent local worker: keeps the price panel, feature columns and the fitted
+model in memory between pipeline invocations.
+
+    python -m src.quant_trader daemon serve --port 8765
+    python -m src.quant_trader daemon call simulate k=10
+    python -m src.quant_trader daemon call append --bars new_bars.parquet
+
+Commands (JSON over HTTP POST /<command> on 127.0.0.1; GET only answers / and
+/status, so a browser prefetch or a link can never change state):
+  status                      panel size, last date, features, model, uptime
+  append   bars=[{...}]       validate (io.quality, data.quality) and add bars; quarantined
+                              bars are dropped; features are updated incrementally in memory
+                              (FeatureStore.append), the model is kept and only
+                              predictions are refreshed
+  features names=[...]        recompute features (optionally switch the feature set, refits)
+  fit      max_depth=..       refit the model (defaults from configs/models.yaml)
+  score    date=.. top=..     predictions for the latest (or given) date, best first
+  simulate k=.. threshold=..  Top-K backtest of the out-of-sample predictions (memoized)
+  reload   code=false         re-read models.yaml (targets, model params), base.yaml (seed)
+                              and strategy.yaml (simulation defaults), then refit;
+                              code=true restarts the process
+  shutdown
+
+A POST must be `Content-Type: application/json`, which a cross-origin page cannot
+send without a CORS preflight this server never answers. Commands that change state
+(append, features, fit, reload, shutdown) also need the shared token in the
+X-Daemon-Token header: $QT_DAEMON_TOKEN, or else a random one the server writes to
+outputs/daemon/token (mode 0600) at startup, which `call` reads.
+
+Config files and src/**/*.py are watched: a config change reloads in place, a code
+change finishes the current request and re-executes the process (appended bars are
+persisted first, so nothing is lost).
+"""
+from __future__ import annotations
+import hmac
+import json
+import os
+import secrets
+import sys
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import yaml
+
+from src.quant_trader.features.lazy import FeatureStore, DEFAULT_CACHE_DIR
+from src.quant_trader.io.quality import quality_settings, validate_appended
+from src.quant_trader.modeling.baselines import FEATURES
+from src.quant_trader.modeling.datasets import time_split
+from src.quant_trader.simulation.exact import run_exact_long_only_topk
+from src.quant_trader.simulation.metrics import summarize
+from src.quant_trader.simulation.vectorized import TopKPivot, long_only_topk
+from src.quant_trader.utils.logging import logger
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+BAR_COLUMNS = ["ticker", "date", "open", "high", "low", "close", "adj_close", "volume"]
+TOKEN_ENV = "QT_DAEMON_TOKEN"
+TOKEN_HEADER = "X-Daemon-Token"
+DEFAULT_TOKEN_FILE = "outputs/daemon/token"
+MUTATING = ("append", "features", "fit", "reload", "shutdown")
+
+
+def _read_yaml(path: str | Path | None) -> dict:
+    p = Path(path) if path else None
+    return (yaml.safe_load(p.read_text(encoding="utf-8")) or {}) if p is not None and p.exists() else {}
+
+
+def server_token(token: str | None = None, token_file: str | Path = DEFAULT_TOKEN_FILE) -> str:
+    """
+    The token mutating commands must carry: `token`, else $QT_DAEMON_TOKEN, else a
+    fresh random one written to token_file (owner read/write only) for local clients.
+    """
+    token = token or os.getenv(TOKEN_ENV)
+    if token:
+        return token
+    token = secrets.token_urlsafe(32)
+    p = Path(token_file)
+    p.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(p, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(token)
+    return token
+
+
+def client_token(token_file: str | Path = DEFAULT_TOKEN_FILE) -> str | None:
+    # $QT_DAEMON_TOKEN, else the file a local daemon wrote at startup
+    if os.getenv(TOKEN_ENV):
+        return os.getenv(TOKEN_ENV)
+    p = Path(token_file)
+    return p.read_text(encoding="utf-8").strip() if p.exists() else None
+
+
+def _model_params(models_yaml: str | Path) -> dict:
+    # decision_tree params from configs/models.yaml (first value of a search list)
+    data = _read_yaml(models_yaml)
+    dt = (data.get("models", {}) or {}).get("decision_tree", {}) or {}
+    first = lambda v, d: int(v[0] if isinstance(v, list) else v) if v is not None else d  # noqa: E731
+    return {"max_depth": first(dt.get("max_depth"), 3), "min_samples_leaf": first(dt.get("min_samples_leaf"), 1)}
+
+
+def _jsonable(obj):
+    if isinstance(obj, pd.DataFrame):
+        return [_jsonable(r) for r in obj.to_dict(orient="records")]
+    if isinstance(obj, dict):
+        return {k: _jsonable(v) for k, v in obj.items()}
+    if isinstance(obj, (list, tuple)):
+        return [_jsonable(v) for v in obj]
+    if isinstance(obj, (pd.Timestamp, np.datetime64)):
+        return pd.Timestamp(obj).isoformat()
+    if isinstance(obj, np.generic):
+        obj = obj.item()
+    if isinstance(obj, float) and not np.isfinite(obj):
+        return None
+    return obj
+
+
+class Worker:
+    """
+    In-memory pipeline state. Every command is a method returning a JSON-able result.
+    """
+
+    def __init__(self, prices_path: str = "data/processed/prices.parquet",
+                 features: list[str] | None = None, target: str = "target",
+                 models_yaml: str = "configs/models.yaml", test_quantile: float = 0.8,
+                 random_state: int = 42, cache_dir: str | None = DEFAULT_CACHE_DIR, persist: bool = True,
+                 config_path: str | None = None, strategy_path: str | None = None):
+        self.prices_path = Path(prices_path)
+        self.features = list(features or FEATURES)
+        self.target = target
+        self.models_yaml = models_yaml
+        self.config_path = config_path
+        self.strategy_path = strategy_path
+        self.test_quantile = test_quantile
+        self._default_seed = random_state
+        self.persist = persist
+        self.started = time.time()
+        self.version = 0                      # bumped whenever data or model change
+        self._sim_memo: dict[tuple, dict] = {}
+        self._preds: pd.DataFrame | None = None
+        self._pivot: TopKPivot | None = None   # date x ticker view of _preds, shared by every K
+        targets = self._read_configs()
+        # first load may reuse the disk cache; "target" follows models.yaml::targets
+        self.store = FeatureStore(str(self.prices_path), cache_dir, targets)
+        self._warm()
+        self.fit()
+
+    # ---- state ------------------------------------------------------------------
+
+    def _read_configs(self) -> dict:
+        """
+        Seed and quality thresholds (base.yaml project.seed, data.quality) and
+        simulation defaults (strategy.yaml simulation); returns models.yaml targets.
+        """
+        base, strat = _read_yaml(self.config_path), _read_yaml(self.strategy_path)
+        self.random_state = int((base.get("project") or {}).get("seed", self._default_seed))
+        self.quality = quality_settings(base)
+        sim = strat.get("simulation") or {}
+        self.sim_defaults = {"initial_capital": float(sim.get("initial_capital", 100_000.0)),
+                             "slippage_bps": float(sim.get("slippage_bps", 5.0))}
+        return dict(_read_yaml(self.models_yaml).get("targets") or {})
+
+    def _warm(self) -> None:
+        for name in [*self.features, self.target]:
+            self.store.column(name)
+
+    def _changed(self) -> None:
+        self.version += 1
+        self._preds = None
+        self._pivot = None
+        self._sim_memo.clear()
+
+    def _matrix(self) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        X = np.column_stack([self.store.column(c) for c in self.features]).astype(np.float32)
+        y = self.store.column(self.target)
+        ok = np.isfinite(X).all(axis=1)
+        return X, y, ok
+
+    # ---- commands -----------------------------------------------------------------
+
+    def status(self) -> dict:
+        p = self.store.prices
+        return {
+            "rows": len(p),
+            "tickers": int(p["ticker"].nunique()),
+            "last_date": p["date"].max() if len(p) else None,
+            "features": self.features,
+            "target": self.target,
+            "model": self.model_info,
+            "version": self.version,
+            "uptime_s": round(time.time() - self.started, 1),
+            "pid": os.getpid(),
+        }
+
+    def fit(self, max_depth: int | None = None, min_samples_leaf: int | None = None) -> dict:
+        from sklearn.tree import DecisionTreeRegressor
+
+        params = _model_params(self.models_yaml)
+        if max_depth is not None:
+            params["max_depth"] = int(max_depth)
+        if min_samples_leaf is not None:
+            params["min_samples_leaf"] = int(min_samples_leaf)
+        X, y, ok = self._matrix()
+        rows = np.flatnonzero(ok & np.isfinite(y))
+        dates = self.store.prices["date"].to_numpy(dtype="datetime64[ns]")
+        order, n_train, cutoff = time_split(dates[rows], self.test_quantile)
+        train = rows[order[:n_train]]
+        t0 = time.perf_counter()
+        self.model = DecisionTreeRegressor(random_state=self.random_state, **params).fit(X[train], y[train])
+        self.cutoff = cutoff
+        self.model_info = {**params, "n_train": int(n_train), "cutoff": pd.Timestamp(cutoff),
+                           "fit_s": round(time.perf_counter() - t0, 4)}
+        self._changed()
+        return self.model_info
+
+    def append(self, bars: list[dict]) -> dict:
+        new = pd.DataFrame(bars)
+        missing = {"ticker", "date", "close"} - set(new.columns)
+        if missing:
+            raise ValueError(f"bars missing columns: {sorted(missing)}")
+        new = new[[c for c in BAR_COLUMNS if c in new.columns]]
+        new = new.assign(date=pd.to_datetime(new["date"])).drop_duplicates(["ticker", "date"], keep="last")
+        t0 = time.perf_counter()
+        # same checks as download_data / run_pipeline, on the bars plus each ticker's recent tail
+        n_in = len(new)
+        new, rep = validate_appended(self.store.prices, new, **self.quality)
+        if not rep.ok:
+            logger.warning("daemon: append quality: %s", rep.summary())
+        if new.empty:
+            return {"appended": 0, "quarantined": n_in, "rows": len(self.store.prices)}
+        # spliced in memory: only each ticker's trailing window is recomputed
+        self.store = self.store.append(new)
+        self._warm()
+        self._changed()
+        if self.persist:
+            self.flush()
+        return {"appended": len(new), "quarantined": n_in - len(new), "rows": len(self.store.prices),
+                "features_s": round(time.perf_counter() - t0, 4)}
+
+    def features_cmd(self, names: list[str] | None = None) -> dict:
+        t0 = time.perf_counter()
+        if names:
+            self.features = list(names)
+        self.store = FeatureStore(self.store.prices, cache_dir=None, targets=self.store.targets)
+        self._warm()
+        info = self.fit() if names else None
+        self._changed()
+        return {"features": self.features, "seconds": round(time.perf_counter() - t0, 4), "fit": info}
+
+    def predictions(self) -> pd.DataFrame:
+        """
+        Out-of-sample predictions (rows after the fit cutoff), refreshed lazily after appends.
+        """
+        if self._preds is None:
+            X, y, ok = self._matrix()
+            dates = self.store.prices["date"].to_numpy(dtype="datetime64[ns]")
+            rows = np.flatnonzero(ok & (dates > np.datetime64(self.cutoff, "ns")))
+            self._preds = pd.DataFrame({
+                "ticker": self.store.prices["ticker"].to_numpy()[rows],
+                "date": dates[rows],
+                "y_true": y[rows],
+                "y_pred": self.model.predict(X[rows]) if rows.size else np.zeros(0),
+            })
+        return self._preds
+
+    def score(self, date: str | None = None, top: int | None = None) -> list[dict]:
+        X, _, ok = self._matrix()
+        p = self.store.prices
+        dates = p["date"].to_numpy(dtype="datetime64[ns]")
+        if date is None:
+            is_last = np.r_[p["ticker"].to_numpy()[1:] != p["ticker"].to_numpy()[:-1], True]
+            rows = np.flatnonzero(is_last & ok)
+        else:
+            rows = np.flatnonzero((dates == np.datetime64(pd.Timestamp(date), "ns")) & ok)
+        out = pd.DataFrame({"ticker": p["ticker"].to_numpy()[rows], "date": dates[rows],
+                            "y_pred": self.model.predict(X[rows]) if rows.size else np.zeros(0)})
+        out = out.sort_values("y_pred", ascending=False, kind="stable")
+        return _jsonable(out.head(top) if top else out)
+
+    def simulate(self, k: int = 5, threshold: float | None = None, holding_days: int = 1,
+                 exact: bool = False, initial_capital: float | None = None,
+                 slippage_bps: float | None = None) -> dict:
+        # capital / slippage default to strategy.yaml simulation settings
+        initial_capital = self.sim_defaults["initial_capital"] if initial_capital is None else float(initial_capital)
+        slippage_bps = self.sim_defaults["slippage_bps"] if slippage_bps is None else float(slippage_bps)
+        key = (int(k), threshold, int(holding_days), bool(exact), float(initial_capital), float(slippage_bps))
+        if key not in self._sim_memo:
+            preds = self.predictions()
+            if exact:
+                ex = run_exact_long_only_topk(preds, k=int(k), initial_capital=initial_capital,
+                                              slippage_bps=slippage_bps, threshold=threshold,
+                                              holding_days=int(holding_days))
+                m = summarize(ex, 252 / int(holding_days))
+                m["final_equity"] = float(ex["equity"].iloc[-1]) if len(ex) else initial_capital
+            else:
+                if self._pivot is None:
+                    self._pivot = TopKPivot.from_preds(preds)
+                m = summarize(long_only_topk(preds, k=int(k), threshold=threshold, holding_days=int(holding_days),
+                                             pivot=self._pivot), 252 / int(holding_days))
+            self._sim_memo[key] = m
+        return {**self._sim_memo[key], "version": self.version}
+
+    def reload(self) -> dict:
+        """
+        Re-read models.yaml (targets; model params are read by fit), base.yaml and
+        strategy.yaml, rebuild the target column if the targets changed, and refit.
+        """
+        targets = self._read_configs()
+        if targets != self.store.targets:
+            self.store = FeatureStore(self.store.prices, cache_dir=None, targets=targets)
+            self._warm()
+        return {"fit": self.fit(), "targets": self.store.targets, "random_state": self.random_state,
+                "simulation": self.sim_defaults}
+
+    def flush(self) -> None:
+        """
+        Write the in-memory panel back to prices_path (atomic replace). The store
+        only holds the price columns, so every other column of the file (e.g. FRED
+        macro series from merge_prices_and_macro) is carried over by (ticker, date),
+        and file rows the store dropped (no close) are kept.
+        """
+        out = self.store.prices
+        if self.prices_path.exists():
+            old = pd.read_parquet(self.prices_path)
+            old["date"] = pd.to_datetime(old["date"])
+            extra = [c for c in old.columns if c not in out.columns]
+            if extra:
+                out = out.merge(old[["ticker", "date", *extra]], on=["ticker", "date"], how="left")
+            key_old = pd.MultiIndex.from_frame(old[["ticker", "date"]])
+            rest = old[~key_old.isin(pd.MultiIndex.from_frame(out[["ticker", "date"]]))]
+            if len(rest):
+                out = pd.concat([out, rest], ignore_index=True).sort_values(["ticker", "date"], kind="stable")
+            out = out[[*old.columns, *[c for c in out.columns if c not in old.columns]]]
+        self.prices_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.prices_path.with_suffix(".parquet.tmp")
+        pq.write_table(pa.Table.from_pandas(out, preserve_index=False), tmp)
+        os.replace(tmp, self.prices_path)
+
+
+# ---- server -------------------------------------------------------------------------
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "WorkerServer"
+
+    def _reply(self, code: int, payload: dict) -> None:
+        body = json.dumps(_jsonable(payload)).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        # read-only: commands that change state (append, fit, reload, shutdown, ...) need POST
+        cmd = self.path.strip("/").split("?")[0] or "status"
+        if cmd != "status":
+            self.send_response(405)
+            self.send_header("Allow", "POST")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._reply(200, {"ok": True, "result": self.server.dispatch("status", {})})
+
+    def do_POST(self):
+        cmd = self.path.strip("/").split("?")[0] or "status"
+        n = int(self.headers.get("Content-Length") or 0)
+        ctype = (self.headers.get("Content-Type") or "").split(";")[0].strip().lower()
+        if ctype != "application/json":
+            # simple cross-origin requests (text/plain, forms) are turned away before the body is read
+            self._reply(415, {"ok": False, "error": "Content-Type must be application/json"})
+            return
+        if cmd in MUTATING and not hmac.compare_digest(self.headers.get(TOKEN_HEADER) or "", self.server.token):
+            self._reply(403, {"ok": False, "error": f"{cmd!r} needs the daemon token ({TOKEN_HEADER} header)"})
+            return
+        try:
+            params = json.loads(self.rfile.read(n) or b"{}")
+            t0 = time.perf_counter()
+            result = self.server.dispatch(cmd, params)
+            self._reply(200, {"ok": True, "result": result, "ms": round(1000 * (time.perf_counter() - t0), 3)})
+        except Exception as e:  # report to the client, keep serving
+            self._reply(400, {"ok": False, "error": f"{type(e).__name__}: {e}"})
+
+    def log_message(self, fmt, *args):
+        logger.debug("daemon: " + fmt, *args)
+
+
+class WorkerServer(HTTPServer):
+    """
+    Single-threaded HTTP server around a Worker: commands run one at a time, so the
+    worker needs no locks. Watches `watch_files` between requests. `token` guards the
+    mutating commands (see server_token).
+    """
+
+    def __init__(self, worker: Worker, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 config_files: list[str] | None = None, code_dirs: list[str] | None = None,
+                 token: str | None = None):
+        super().__init__((host, port), _Handler)
+        self.worker = worker
+        self.token = server_token(token)
+        self.timeout = 1.0
+        self.stop: str | None = None      # None | "shutdown" | "restart"
+        self.config_files = [Path(p) for p in (config_files or [worker.models_yaml])]
+        self.code_dirs = [Path(p) for p in (code_dirs or [])]
+        self._mtimes = self._snapshot()
+
+    def _snapshot(self) -> dict[Path, float]:
+        files = list(self.config_files)
+        for d in self.code_dirs:
+            files += list(d.rglob("*.py"))
+        return {f: f.stat().st_mtime for f in files if f.exists()}
+
+    def check_changes(self) -> None:
+        now = self._snapshot()
+        changed = {f for f in now.keys() | self._mtimes.keys() if now.get(f) != self._mtimes.get(f)}
+        self._mtimes = now
+        if any(f.suffix == ".py" for f in changed):
+            logger.info("daemon: code changed (%s), restarting", ", ".join(sorted(map(str, changed))))
+            self.stop = "restart"
+        elif changed:
+            logger.info("daemon: config changed, reloading")
+            self.worker.reload()
+
+    def dispatch(self, cmd: str, params: dict):
+        w = self.worker
+        if cmd == "shutdown":
+            self.stop = "shutdown"
+            return {"stopping": True}
+        if cmd == "reload":
+            if params.get("code"):
+                self.stop = "restart"
+                return {"restarting": True}
+            return w.reload()
+        handlers = {"status": w.status, "append": w.append, "features": w.features_cmd, "fit": w.fit,
+                    "score": w.score, "simulate": w.simulate}
+        if cmd not in handlers:
+            raise KeyError(f"unknown command {cmd!r}; expected one of {sorted([*handlers, 'reload', 'shutdown'])}")
+        return handlers[cmd](**params)
+
+    def serve_until_stopped(self) -> str:
+        while self.stop is None:
+            self.handle_request()       # returns after one request or `timeout`
+            if self.stop is None:
+                self.check_changes()
+        self.server_close()
+        return self.stop
+
+
+def serve(worker: Worker, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+          config_files: list[str] | None = None, code_dirs: list[str] | None = None,
+          token: str | None = None) -> None:
+    """
+    Run until `shutdown`; on a code change, persist and re-exec the same command line.
+    """
+    server = WorkerServer(worker, host, port, config_files, code_dirs, token)
+    logger.info("daemon: serving on http://%s:%d (pid %d)", host, server.server_address[1], os.getpid())
+    reason = server.serve_until_stopped()
+    if reason == "restart":
+        if worker.persist:
+            worker.flush()
+        os.execv(sys.executable, [sys.executable, *sys.orig_argv[1:]])
+
+
+# ---- client -------------------------------------------------------------------------
+
+def call(cmd: str, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, timeout: float = 60.0,
+         token: str | None = None, **params):
+    """
+    Send one command to a running daemon and return its result (RuntimeError on failure).
+    token: defaults to client_token() ($QT_DAEMON_TOKEN or the daemon's token file).
+    """
+    headers = {"Content-Type": "application/json"}
+    token = token or client_token()
+    if token:
+        headers[TOKEN_HEADER] = token
+    req = urllib.request.Request(f"http://{host}:{port}/{cmd}", data=json.dumps(_jsonable(params)).encode(),
+                                 headers=headers, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=timeout) as r:
+            payload = json.loads(r.read())
+    except urllib.error.HTTPError as e:
+        payload = json.loads(e.read() or b"{}")
+    if not payload.get("ok"):
+        raise RuntimeError(payload.get("error", "daemon error"))
+    return payload["result"]
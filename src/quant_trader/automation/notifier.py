@@ -1 +1,269 @@
-# Optional Telegram/email notifications for new trades or failures
+# src/quant_trader/automation/notifier.py
+"""
+Non-blocking notifications for new trades, pipeline failures and timing anomalies.
+
+    notifier = notifier_from_config(load_config("configs/schedule.yaml"))
+    notifier.notify_all(trade_messages(exact_df))     # returns immediately
+    ...
+    notifier.close()                                  # flush on shutdown
+
+notify() only puts the message on an in-memory queue. A background thread groups
+messages into batches (up to `batch_size` or `flush_interval` seconds) and hands
+each batch to every backend, at most `max_batches_per_minute` per backend (token
+bucket; excess batches wait and keep absorbing new messages). Backend errors are
+logged, never raised into the caller. If the queue is full, new messages are
+dropped and counted (`stats["dropped"]`), so the critical path never blocks.
+
+Backends (anything with send(list[Message])):
+  FileBackend     JSON lines appended to a file
+  WebhookBackend  one JSON POST per batch
+  SMTPBackend     one e-mail per batch (smtp_factory is injectable for tests)
+"""
+from __future__ import annotations
+import json
+import os
+import queue
+import smtplib
+import threading
+import time
+import urllib.request
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from email.message import EmailMessage
+from pathlib import Path
+from typing import Callable, Iterable
+
+from src.quant_trader.utils.logging import logger
+
+
+@dataclass
+class Message:
+    kind: str                         # trade | failure | timing | info
+    title: str
+    body: str = ""
+    level: str = "info"               # info | warning | error
+    data: dict = field(default_factory=dict)
+    ts: str = field(default_factory=lambda: datetime.now(timezone.utc).isoformat(timespec="seconds"))
+
+
+# ---- backends ---------------------------------------------------------------------------
+
+class FileBackend:
+    def __init__(self, path: str | Path = "outputs/notifications.jsonl"):
+        self.path = Path(path)
+
+    def send(self, batch: list[Message]) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self.path.open("a", encoding="utf-8") as f:
+            for m in batch:
+                f.write(json.dumps(asdict(m), default=str) + "\n")
+
+
+class WebhookBackend:
+    def __init__(self, url: str, timeout: float = 10.0, headers: dict | None = None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = {"Content-Type": "application/json", **(headers or {})}
+
+    def send(self, batch: list[Message]) -> None:
+        body = json.dumps({"messages": [asdict(m) for m in batch]}, default=str).encode()
+        req = urllib.request.Request(self.url, data=body, headers=self.headers, method="POST")
+        with urllib.request.urlopen(req, timeout=self.timeout) as r:
+            r.read()
+
+
+class SMTPBackend:
+    def __init__(self, host: str, port: int, sender: str, recipients: list[str],
+                 username: str | None = None, password_env: str | None = None, starttls: bool = False,
+                 timeout: float = 10.0, smtp_factory: Callable[..., smtplib.SMTP] = smtplib.SMTP):
+        self.host, self.port = host, int(port)
+        self.sender, self.recipients = sender, list(recipients)
+        self.username, self.password_env, self.starttls = username, password_env, starttls
+        self.timeout = timeout
+        self.smtp_factory = smtp_factory
+
+    def send(self, batch: list[Message]) -> None:
+        msg = EmailMessage()
+        worst = "error" if any(m.level == "error" for m in batch) else \
+            "warning" if any(m.level == "warning" for m in batch) else "info"
+        msg["Subject"] = f"[quant_trader {worst}] " + (batch[0].title if len(batch) == 1 else f"{len(batch)} notifications")
+        msg["From"] = self.sender
+        msg["To"] = ", ".join(self.recipients)
+        msg.set_content("\n\n".join(f"[{m.ts}] {m.level.upper()} {m.kind}: {m.title}\n{m.body}".rstrip() for m in batch))
+        with self.smtp_factory(self.host, self.port, timeout=self.timeout) as smtp:
+            if self.starttls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, os.getenv(self.password_env or "", ""))
+            smtp.send_message(msg)
+
+
+BACKENDS = {"file": FileBackend, "webhook": WebhookBackend, "smtp": SMTPBackend}
+
+
+# ---- notifier -----------------------------------------------------------------------------
+
+class Notifier:
+    def __init__(self, backends: list, batch_size: int = 20, flush_interval: float = 2.0,
+                 max_batches_per_minute: float = 30.0, max_queue: int = 10_000):
+        self.backends = list(backends)
+        self.batch_size = int(batch_size)
+        self.flush_interval = float(flush_interval)
+        self.rate = float(max_batches_per_minute) / 60.0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._tokens = {id(b): 1.0 for b in self.backends}
+        self._last = time.monotonic()
+        self._stop = threading.Event()
+        self.stats = {"queued": 0, "dropped": 0, "sent": 0, "batches": 0, "errors": 0}
+        self._stats_lock = threading.Lock()       # updated from caller threads and the sender thread
+        self._thread = threading.Thread(target=self._loop, name="notifier", daemon=True)
+        self._thread.start()
+
+    def notify(self, msg: Message) -> bool:
+        """
+        Enqueue without blocking; False (and counted) if the queue is full.
+        """
+        try:
+            self._queue.put_nowait(msg)
+            self._count("queued")
+            return True
+        except queue.Full:
+            self._count("dropped")
+            return False
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def notify_all(self, msgs: Iterable[Message]) -> None:
+        for m in msgs:
+            self.notify(m)
+
+    def close(self, timeout: float = 10.0) -> None:
+        """
+        Deliver what is queued (rate limits still apply, up to `timeout`) and stop.
+        """
+        self._stop.set()
+        self._thread.join(timeout)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    # ---- worker --------------------------------------------------------------------------
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        dt, self._last = now - self._last, now
+        for k in self._tokens:
+            self._tokens[k] = min(1.0, self._tokens[k] + dt * self.rate)
+
+    def _loop(self) -> None:
+        pending: list[Message] = []
+        deadline = None
+        while True:
+            stopping = self._stop.is_set()
+            timeout = 0.05 if stopping else (max(deadline - time.monotonic(), 0.0) if deadline else 0.25)
+            try:
+                pending.append(self._queue.get(timeout=timeout))
+                deadline = deadline or time.monotonic() + self.flush_interval
+                while len(pending) < self.batch_size:
+                    pending.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+            due = pending and (len(pending) >= self.batch_size or stopping or time.monotonic() >= deadline)
+            if due:
+                pending = self._deliver(pending)
+                deadline = time.monotonic() + self.flush_interval if pending else None
+            if stopping and not pending and self._queue.empty():
+                return
+
+    def _deliver(self, pending: list[Message]) -> list[Message]:
+        # returns what is left for later (batches above the rate limit)
+        self._refill()
+        batch, rest = pending[:self.batch_size], pending[self.batch_size:]
+        ready = [b for b in self.backends if self._tokens[id(b)] >= 1.0]
+        if not ready:
+            time.sleep(min(0.05, 1.0 / max(self.rate, 1e-9)))
+            return pending
+        for b in ready:
+            self._tokens[id(b)] -= 1.0
+            try:
+                b.send(batch)
+            except Exception as e:
+                self._count("errors")
+                logger.warning("notifier: %s failed: %s", type(b).__name__, e)
+        with self._stats_lock:
+            self.stats["batches"] += 1
+            self.stats["sent"] += len(batch)
+        return rest
+
+
+def notifier_from_config(cfg: dict | None) -> Notifier | None:
+    """
+    Build from a `notifications:` block ({batch_size, flush_interval, max_batches_per_minute,
+    backends: [{type: file|webhook|smtp, ...}]}); None when no backend is configured.
+    """
+    ncfg = dict((cfg or {}).get("notifications") or {})
+    specs = ncfg.pop("backends", None) or []
+    if not specs:
+        return None
+    backends = []
+    for spec in specs:
+        spec = dict(spec)
+        kind = spec.pop("type")
+        if kind not in BACKENDS:
+            raise ValueError(f"Unknown notification backend {kind!r}; expected one of {sorted(BACKENDS)}")
+        backends.append(BACKENDS[kind](**spec))
+    return Notifier(backends, **ncfg)
+
+
+# ---- message builders ------------------------------------------------------------------------
+
+def trade_messages(exact: "pd.DataFrame", since=None) -> list[Message]:
+    """
+    One message per date whose `positions` differ from the previous row of
+    run_exact_long_only_topk's output (buys and sells), optionally only after `since`.
+    """
+    out = []
+    prev: set[str] = set()
+    for date, pos, equity in zip(exact["date"], exact["positions"], exact["equity"]):
+        cur = set(filter(None, str(pos or "").split(",")))
+        buys, sells = sorted(cur - prev), sorted(prev - cur)
+        prev = cur
+        if not (buys or sells) or (since is not None and date <= since):
+            continue
+        day = str(date)[:10]
+        out.append(Message(
+            kind="trade", title=f"{day}: buy {', '.join(buys) or '-'} / sell {', '.join(sells) or '-'}",
+            body=f"holdings: {', '.join(sorted(cur)) or '(cash)'}; equity {equity:,.2f}",
+            data={"date": day, "buy": buys, "sell": sells, "equity": float(equity)},
+        ))
+    return out
+
+
+def failure_message(job: str, error: str | None, attempt: int | None = None) -> Message:
+    return Message(kind="failure", level="error", title=f"{job} failed" + (f" (attempt {attempt})" if attempt else ""),
+                   body=error or "", data={"job": job, "attempt": attempt})
+
+
+def timing_anomaly(job: str, duration_s: float, history_s: list[float], z: float = 3.0,
+                   min_history: int = 5) -> Message | None:
+    """
+    Message when `duration_s` is above median + z * 1.4826 * MAD of earlier durations
+    (robust to the occasional slow run already in the history).
+    """
+    hist = sorted(h for h in history_s if h is not None)
+    if len(hist) < min_history:
+        return None
+    med = hist[len(hist) // 2] if len(hist) % 2 else 0.5 * (hist[len(hist) // 2 - 1] + hist[len(hist) // 2])
+    dev = sorted(abs(h - med) for h in hist)
+    mad = dev[len(dev) // 2] if len(dev) % 2 else 0.5 * (dev[len(dev) // 2 - 1] + dev[len(dev) // 2])
+    limit = med + z * max(1.4826 * mad, 0.05 * med, 1e-3)
+    if duration_s <= limit:
+        return None
+    return Message(kind="timing", level="warning", title=f"{job} took {duration_s:.1f}s (usual {med:.1f}s)",
+                   body=f"above the {limit:.1f}s anomaly threshold over {len(hist)} earlier runs",
+                   data={"job": job, "duration_s": duration_s, "median_s": med, "limit_s": limit})
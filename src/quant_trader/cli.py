@@ -0,0 +1,62 @@
+# src/quant_trader/cli.py
+"""
+Single command-line entry point:
+
+    python -m src.quant_trader <command> [args...]
+    python -m src.quant_trader simulate --k 10
+
+Each command runs the matching scripts/ module with the remaining arguments.
+Nothing heavy is imported here: pandas, sklearn, optuna, matplotlib, ... are
+loaded only by the command that needs them, so `--help` and light commands
+(predict, query) start fast. `scripts/bench_importtime.py` measures this.
+"""
+from __future__ import annotations
+import argparse
+import runpy
+import sys
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[2]
+
+COMMANDS = {
+    "fetch": ("scripts.download_data", "download prices (+ FRED macro) into data/processed"),
+    "features": ("scripts.build_features", "build data/processed/features.parquet"),
+    "train": ("scripts.train_models", "fit the baseline model and write predictions"),
+    "tune": ("scripts.tune_dt", "Optuna search for the decision tree"),
+    "simulate": ("scripts.simulate", "vectorized + exact Top-K simulations"),
+    "report": ("scripts.report", "summaries and plots from the experiment store"),
+    "predict": ("scripts.predict", "print the latest predictions"),
+    "query": ("scripts.query", "SQL over data/processed and outputs (DuckDB)"),
+    "pipeline": ("scripts.run_pipeline", "end-to-end: data, features, model, simulations"),
+    "daemon": ("scripts.daemon", "persistent worker (serve) and its client (call)"),
+    "schedule": ("scripts.schedule_job", "run pipeline stages on cron schedules"),
+}
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(
+        prog="quant_trader",
+        description="Quant trading pipeline. Run `quant_trader <command> --help` for command options.",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n" + "\n".join(f"  {c:<10} {h}" for c, (_, h) in COMMANDS.items()),
+    )
+    ap.add_argument("command", choices=COMMANDS, metavar="command")
+    return ap
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else list(argv)
+    # only the first token is ours; everything after it belongs to the command
+    cmd = build_parser().parse_args(argv[:1]).command
+    if str(REPO) not in sys.path:
+        sys.path.insert(0, str(REPO))
+    sys.argv = [f"quant_trader {cmd}", *argv[1:]]
+    try:
+        runpy.run_module(COMMANDS[cmd][0], run_name="__main__", alter_sys=True)
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else (0 if e.code is None else 1)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
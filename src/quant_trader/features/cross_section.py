@@ -0,0 +1,108 @@
+# src/quant_trader/features/cross_section.py
+"""
+Cross-sectional (per-date) transforms on a date x ticker matrix.
+
+Every function takes a 2D float array M with dates on axis 0 and tickers on axis 1
+(NaN = missing / not in universe) and works on all dates at once, instead of
+`groupby("date").transform(...)` on a long frame.
+"""
+from __future__ import annotations
+import numpy as np
+
+
+def cs_rank(M: np.ndarray, pct: bool = True) -> np.ndarray:
+    """
+    NaN-aware rank across tickers for every date (ties get the average rank,
+    like `pandas.rank(method="average")`). With pct=True ranks are divided by
+    the number of valid names on that date, giving values in (0, 1].
+    """
+    M = np.asarray(M, dtype=np.float64)
+    T, N = M.shape
+    if M.size == 0:
+        return M.copy()
+
+    order = np.argsort(M, axis=1, kind="stable")  # NaN sorts last
+    S = np.take_along_axis(M, order, axis=1)
+    valid = ~np.isnan(S)
+    n_valid = valid.sum(axis=1, keepdims=True)
+
+    # tie groups within each sorted row: first/last position of every run
+    pos = np.broadcast_to(np.arange(N), (T, N))
+    new_run = np.ones((T, N), dtype=bool)
+    new_run[:, 1:] = S[:, 1:] != S[:, :-1]
+    run_start = np.maximum.accumulate(np.where(new_run, pos, 0), axis=1)
+    run_end_flag = np.ones((T, N), dtype=bool)
+    run_end_flag[:, :-1] = new_run[:, 1:]
+    run_end = np.minimum.accumulate(np.where(run_end_flag, pos, N - 1)[:, ::-1], axis=1)[:, ::-1]
+
+    r_sorted = 0.5 * (run_start + run_end) + 1.0
+    if pct:
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r_sorted = r_sorted / n_valid
+    r_sorted[~valid] = np.nan
+
+    out = np.empty_like(r_sorted)
+    np.put_along_axis(out, order, r_sorted, axis=1)
+    return out
+
+
+def cs_zscore(M: np.ndarray, min_count: int = 2, ddof: int = 1) -> np.ndarray:
+    """
+    Per-date z-score across tickers, ignoring NaN. Dates with fewer than
+    `min_count` valid names (or zero dispersion) are NaN.
+    """
+    M = np.asarray(M, dtype=np.float64)
+    valid = ~np.isnan(M)
+    n = valid.sum(axis=1, keepdims=True)
+    X = np.where(valid, M, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mu = X.sum(axis=1, keepdims=True) / n
+        dev = np.where(valid, M - mu, 0.0)
+        sd = np.sqrt((dev * dev).sum(axis=1, keepdims=True) / (n - ddof))
+        Z = (M - mu) / np.where(sd > 0, sd, np.nan)
+    Z[(n < max(min_count, ddof + 1)).ravel(), :] = np.nan
+    return Z
+
+
+def cs_quantile_bucket(M: np.ndarray, n_buckets: int = 5) -> np.ndarray:
+    """
+    Per-date quantile bucket 1..n_buckets (n_buckets = highest values), NaN kept.
+    """
+    P = cs_rank(M, pct=True)
+    return np.clip(np.ceil(P * n_buckets), 1, n_buckets)
+
+
+def market_demean(M: np.ndarray) -> np.ndarray:
+    """
+    Subtract the per-date cross-sectional mean (equal-weight market) from each name.
+    """
+    M = np.asarray(M, dtype=np.float64)
+    valid = ~np.isnan(M)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mu = np.where(valid, M, 0.0).sum(axis=1, keepdims=True) / valid.sum(axis=1, keepdims=True)
+    return M - mu
+
+
+def group_demean(M: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """
+    Subtract the per-date mean of each group (e.g. sector) from its members.
+
+    groups: int codes per ticker, shape (n_tickers,) or (n_dates, n_tickers)
+            for time-varying membership; negative codes = no group (result NaN).
+    """
+    M = np.asarray(M, dtype=np.float64)
+    T, N = M.shape
+    G = np.broadcast_to(np.asarray(groups, dtype=np.int64), (T, N))
+    n_groups = int(G.max()) + 1 if G.size else 0
+    if n_groups <= 0:
+        return np.full_like(M, np.nan)
+
+    ok = ~np.isnan(M) & (G >= 0)
+    key = np.arange(T)[:, None] * n_groups + np.where(G >= 0, G, 0)
+    sums = np.bincount(key[ok], weights=M[ok], minlength=T * n_groups)
+    cnts = np.bincount(key[ok], minlength=T * n_groups)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / cnts
+    out = M - means[key]
+    out[G < 0] = np.nan
+    return out
@@ -3,6 +3,18 @@ from __future__ import annotations
 import numpy as np
 import pandas as pd
 
+from src.quant_trader.features.cross_section import (
+    cs_rank, cs_zscore, cs_quantile_bucket, market_demean, group_demean,
+)
+from src.quant_trader.features.market_regime import build_regime_features
+from src.quant_trader.features.targets import forward_targets, target_column
+from src.quant_trader.utils.panel import Panel
+from src.quant_trader.utils.time import calendar_from_config
+
+# regime columns used as model features by default (levels like high_252 are not)
+REGIME_FEATURES = ["dist_52w_high", "dist_52w_low", "rvol_pct", "high_volatility", "near_52w_low",
+                   "breadth_above_sma200", "adv_decl"]
+
 def _compute_rsi_wilder(close: pd.Series, window: int = 14) -> pd.Series:
     """
     RSI using Wilder's smoothing (EMA with alpha=1/window).
@@ -20,17 +32,69 @@ def _compute_rsi_wilder(close: pd.Series, window: int = 14) -> pd.Series:
     rsi = 100.0 - (100.0 / (1.0 + rs))
     return rsi
 
-def build_feature_matrix(df_prices: pd.DataFrame, cfg: dict):
+def add_cross_sectional_features(out: pd.DataFrame, fcfg: dict, sectors: dict | None = None,
+                                 calendar=None) -> pd.DataFrame:
+    """
+    Per-date cross-sectional transforms of every return column ('ret_*') in `out`
+    (long frame with 'ticker' and 'date' columns), computed on a date x ticker matrix:
+      <col>_cs_rank   percentile rank across tickers
+      <col>_cs_z      cross-sectional z-score
+      <col>_q         quantile bucket 1..n       (features.momentum_quantiles)
+      <col>_mkt_dm    minus equal-weight market  (features.breadth.market)
+      <col>_sec_dm    minus sector mean          (features.breadth.sector + sectors map)
+    calendar (utils.time.TradingCalendar) codes the dates by session id (Panel.from_long).
+    """
+    ret_cols = [c for c in out.columns if c.startswith("ret_")]
+    if out.empty or not ret_cols:
+        return out
+
+    breadth = fcfg.get("breadth", {}) or {}
+    n_q = fcfg.get("momentum_quantiles")
+    panel = Panel.from_long(out["date"].values, out["ticker"].values, calendar)
+
+    sec_codes = None
+    if breadth.get("sector") and sectors:
+        labels = pd.Series(panel.tickers.map(lambda t: sectors.get(t)))
+        sec_codes = pd.factorize(labels)[0]  # unknown sector -> -1
+
+    new = {}
+    for c in ret_cols:
+        M = panel.pivot(out[c].values)
+        new[f"{c}_cs_rank"] = panel.unpivot(cs_rank(M))
+        new[f"{c}_cs_z"] = panel.unpivot(cs_zscore(M))
+        if n_q:
+            new[f"{c}_q"] = panel.unpivot(cs_quantile_bucket(M, int(n_q)))
+        if breadth.get("market"):
+            new[f"{c}_mkt_dm"] = panel.unpivot(market_demean(M))
+        if sec_codes is not None:
+            new[f"{c}_sec_dm"] = panel.unpivot(group_demean(M, sec_codes))
+
+    return out.assign(**new)
+
+def build_feature_matrix(df_prices: pd.DataFrame, cfg: dict, universe=None):
     """
     Inputs:
       df_prices: tidy long OHLCV with columns:
                  ['ticker','date','open','high','low','close','adj_close','volume']
-      cfg: (unused here, but kept for consistency)
+      cfg: optional 'features' section (configs/features.yaml) enables cross-sectional
+           columns via add_cross_sectional_features; 'data.sectors' maps ticker -> sector;
+           optional 'targets' section (configs/models.yaml) picks the target:
+           horizon_days (1), type (regression|classification), horizons, label_threshold;
+           'features.regime' adds market-regime columns (features/market_regime.py),
+           computed on the full panel: `columns` picks them (default REGIME_FEATURES),
+           the other keys are build_regime_features parameters
+      universe: optional io.universe.Universe; rows where the ticker was not a member
+           that date are dropped after the per-ticker features (so rolling windows still
+           see the full history) and before the cross-sectional ones
 
     Output:
-      X: DataFrame with index [ticker, date] and columns ['ret_1d','rsi_14']
-      y: Series 'target' = next-day ret_1d (aligned with X index)
-      meta: dict with 'index' (MultiIndex)
+      X: DataFrame with index [ticker, date] and every non-label column: 'ret_1d',
+         'rsi_14', the regime columns (features.regime) and the cross-sectional ones
+         (<ret col>_cs_rank / _cs_z / _q / _mkt_dm / _sec_dm) when cfg['features'] is given;
+         'close', 'target' and the fwd_* columns are left out
+      y: Series 'target' = forward log return over horizon_days (default: next-day
+         ret_1d), or its up/down label for classification (aligned with X index)
+      meta: dict with 'index' (MultiIndex) and 'targets' (every fwd_* column)
     """
     if df_prices is None or df_prices.empty:
         X = pd.DataFrame(columns=["ret_1d", "rsi_14"])
@@ -46,23 +110,43 @@ def build_feature_matrix(df_prices: pd.DataFrame, cfg: dict):
         .copy()
     )
 
+    # Forward targets for all horizons in one vectorized pass over the sorted rows
+    tcfg = (cfg or {}).get("targets") or {}
+    horizons = {int(h) for h in tcfg.get("horizons", [])} | {int(tcfg.get("horizon_days", 1))}
+    gid = pd.factorize(df["ticker"].to_numpy())[0]
+    tgt = forward_targets(np.log(df["close"].to_numpy(dtype=np.float64)), gid, horizons,
+                          float(tcfg.get("label_threshold", 0.0)))
+    df = df.assign(target=tgt[target_column(tcfg)], **tgt)
+
     def per_ticker(g: pd.DataFrame) -> pd.DataFrame:
         g = g.copy()
         # 1-day log return
         g["ret_1d"] = np.log(g["close"]).diff()
         # RSI(14) via Wilder's smoothing
         g["rsi_14"] = _compute_rsi_wilder(g["close"], window=14)
-        # Target is next-day ret_1d
-        g["target"] = g["ret_1d"].shift(-1)
-        # Drop warmup rows (where RSI is NaN) and last row (target NaN)
-        g = g.dropna(subset=["rsi_14"]).iloc[:-1] if len(g) > 0 else g
+        # Drop warmup rows (where RSI is NaN) and the last horizon_days rows (target NaN)
+        g = g.dropna(subset=["rsi_14", "target"])
         return g
 
     out = df.groupby("ticker", group_keys=False).apply(per_ticker)
+    fcfg = (cfg or {}).get("features") or {}
+    rcfg = fcfg.get("regime")
+    if rcfg:
+        rcfg = rcfg if isinstance(rcfg, dict) else {}
+        cols = list(rcfg.get("columns") or REGIME_FEATURES)
+        reg = build_regime_features(df_prices, {"regime": rcfg})
+        reg = reg[["ticker", "date", *cols]].assign(date=lambda d: pd.to_datetime(d["date"]))
+        out = out.merge(reg.astype({c: float for c in cols}), on=["ticker", "date"], how="left")
+    if universe is not None:
+        out = universe.filter(out)
+    if fcfg:
+        out = add_cross_sectional_features(out, fcfg, (cfg.get("data", {}) or {}).get("sectors"),
+                                           calendar_from_config(cfg))
     out = out.set_index(["ticker", "date"]).sort_index()
 
-    X = out[["ret_1d", "rsi_14"]].copy()
+    fwd_cols = list(tgt)
+    X = out.drop(columns=["close", "target", *fwd_cols]).copy()
     y = out["target"].copy()
-    meta = {"index": X.index}
+    meta = {"index": X.index, "targets": out[fwd_cols].copy()}
 
     return X, y, meta
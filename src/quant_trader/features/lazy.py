@@ -0,0 +1,311 @@
+# src/quant_trader/features/lazy.py
+"""
+Lazy, on-demand feature columns with per-column disk memoization.
+
+    store = FeatureStore("data/processed/prices.parquet")
+    df = store.get(["ret_5d", "rsi_14", "bb_width_20", "target"])
+
+"target" is an alias of the configured training label (targets.target_column of
+the `targets` section, default fwd_ret_1d = next-day ret_1d), the same column
+build_feature_matrix calls target.
+
+Only the requested columns and their dependencies are computed. Every computed
+column is written to `<cache_dir>/<name>/<key>.parquet`, where the key hashes the
+column name, the formula version, the price inputs it depends on and the `targets`
+settings it reads (label_threshold for fwd_up_*), so later runs (and other
+experiments) reuse it until the underlying prices or those settings change.
+"""
+from __future__ import annotations
+import hashlib
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.quant_trader.features import ta_core as ta
+from src.quant_trader.features.targets import forward_targets, target_column
+
+_CACHE_VERSION = "1"
+DEFAULT_CACHE_DIR = "data/interim/feature_cache"
+PRICE_COLUMNS = ["open", "high", "low", "close", "adj_close", "volume"]
+
+
+@dataclass
+class FeatureSpec:
+    pattern: str                                  # regex with named int groups
+    inputs: list[str]                             # raw price columns used directly
+    deps: Callable[..., list[str]]                # params -> feature dependencies
+    compute: Callable[..., np.ndarray]            # (store, **params) -> values
+    settings: list[str]                           # `targets` keys the formula reads (part of the cache key)
+
+
+REGISTRY: list[FeatureSpec] = []
+
+
+def register(pattern: str, inputs: list[str] | None = None, deps: Callable[..., list[str]] | None = None,
+             settings: list[str] | None = None):
+    """
+    Decorator adding a feature family to the registry, e.g. register(r"sma_(?P<n>\\d+)").
+    """
+    def wrap(fn):
+        REGISTRY.append(FeatureSpec(pattern, list(inputs or []), deps or (lambda **_: []), fn, list(settings or [])))
+        return fn
+    return wrap
+
+
+# ---- feature families -------------------------------------------------------
+
+@register(r"log_close", inputs=["close"])
+def _log_close(fs):
+    return np.log(fs.raw("close"))
+
+
+@register(r"ret_(?P<n>\d+)d", deps=lambda n: ["log_close"])
+def _ret(fs, n):
+    lc = fs.column("log_close")
+    return lc - ta.group_shift(lc, fs.gid, n)
+
+
+@register(r"vol_(?P<n>\d+)d", deps=lambda n: ["ret_1d"])
+def _vol(fs, n):
+    return ta.group_rolling_std(fs.column("ret_1d"), fs.gid, n)
+
+
+@register(r"rsi_(?P<n>\d+)", inputs=["close"])
+def _rsi(fs, n):
+    return ta.rsi_wilder(fs.raw("close"), fs.gid, n)
+
+
+@register(r"sma_(?P<n>\d+)", inputs=["close"])
+def _sma(fs, n):
+    return ta.group_rolling_mean(fs.raw("close"), fs.gid, n)
+
+
+@register(r"std_(?P<n>\d+)", inputs=["close"])
+def _std(fs, n):
+    return ta.group_rolling_std(fs.raw("close"), fs.gid, n)
+
+
+@register(r"ema_(?P<n>\d+)", inputs=["close"])
+def _ema(fs, n):
+    return ta.group_ewm_mean(fs.raw("close"), fs.gid, 2.0 / (n + 1), min_periods=n)
+
+
+@register(r"bb_width_(?P<n>\d+)", deps=lambda n: [f"sma_{n}", f"std_{n}"])
+def _bb_width(fs, n, n_std: float = 2.0):
+    # (upper - lower) / middle band
+    return 2.0 * n_std * fs.column(f"std_{n}") / fs.column(f"sma_{n}")
+
+
+@register(r"fwd_ret_(?P<h>\d+)d", deps=lambda h: ["log_close"])
+def _fwd_ret(fs, h):
+    return forward_targets(fs.column("log_close"), fs.gid, [h])[f"fwd_ret_{h}d"]
+
+
+@register(r"fwd_mdd_(?P<h>\d+)d", deps=lambda h: ["log_close"])
+def _fwd_mdd(fs, h):
+    return forward_targets(fs.column("log_close"), fs.gid, [h])[f"fwd_mdd_{h}d"]
+
+
+@register(r"fwd_up_(?P<h>\d+)d", deps=lambda h: [f"fwd_ret_{h}d"], settings=["label_threshold"])
+def _fwd_up(fs, h):
+    # same rule as forward_targets: up when fwd_ret > targets.label_threshold
+    r = fs.column(f"fwd_ret_{h}d")
+    thr = float(fs.targets.get("label_threshold", 0.0))
+    return np.where(np.isnan(r), np.nan, (r > thr).astype(np.float64))
+
+
+def resolve(name: str) -> tuple[FeatureSpec, dict]:
+    for spec in REGISTRY:
+        m = re.fullmatch(spec.pattern, name)
+        if m:
+            return spec, {k: int(v) for k, v in m.groupdict().items()}
+    raise KeyError(f"Unknown feature: {name!r}")
+
+
+# ---- store -------------------------------------------------------------------
+
+class FeatureStore:
+    """
+    Lazily computes named feature columns for a price panel.
+
+    prices: tidy long DataFrame or path to prices.parquet; rows are sorted by
+            (ticker, date) once and every column is aligned to that order.
+    cache_dir: on-disk memo (None disables it).
+    targets: configs/models.yaml::targets; picks the column the "target" alias reads.
+    """
+
+    def __init__(self, prices: pd.DataFrame | str, cache_dir: str | None = DEFAULT_CACHE_DIR,
+                 targets: dict | None = None):
+        if isinstance(prices, (str, Path)):
+            cols = [c for c in ["ticker", "date", *PRICE_COLUMNS] if c in pq.read_schema(prices).names]
+            prices = pd.read_parquet(prices, columns=cols)
+        self._set_prices(_sorted_prices(prices), cache_dir, targets)
+
+    def _set_prices(self, df: pd.DataFrame, cache_dir, targets: dict | None = None) -> None:
+        # df: cleaned and sorted by (ticker, date) with a RangeIndex
+        self.targets = dict(targets or {})
+        self.target_name = target_column(self.targets)
+        self.prices = df
+        self.gid = pd.factorize(self.prices["ticker"].to_numpy())[0]
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._memo: dict[str, np.ndarray] = {}
+        self._raw_hash: dict[str, str] = {}
+        self.stats = {"computed": [], "loaded": []}
+
+    @classmethod
+    def _from_sorted(cls, df: pd.DataFrame, cache_dir=None, targets: dict | None = None) -> "FeatureStore":
+        fs = cls.__new__(cls)
+        fs._set_prices(df, cache_dir, targets)
+        return fs
+
+    def append(self, bars: pd.DataFrame, tail: int = 512) -> "FeatureStore":
+        """
+        New in-memory store (no disk cache) with `bars` added, carrying over every
+        memoized column.
+
+        When each bar is later than its ticker's last date (the live case), rows are
+        spliced in without re-sorting and only the last `tail` rows of each affected
+        ticker are recomputed; the first half of that window is warm-up and keeps its
+        old values. tail is raised to 48x the largest window parameter, so windowed and
+        forward features are exact and recursive ones (EWM, Wilder RSI, alpha >= 1/n)
+        match a full recompute to ~(1-1/n)^(24n) < 1e-10 relative.
+        Corrections, back-fills and new tickers fall back to a full rebuild.
+        """
+        new = _sorted_prices(bars).drop_duplicates(["ticker", "date"], keep="last").reset_index(drop=True)
+        old = self.prices
+        names = list(self._memo)
+        if len(new) == 0:
+            return self
+        g = -np.ones(len(new), dtype=np.int64)
+        if len(old):
+            ends = np.r_[np.flatnonzero(self.gid[1:] != self.gid[:-1]), len(old) - 1]
+            g = pd.Index(old["ticker"].to_numpy()[ends]).get_indexer(new["ticker"].to_numpy())
+        if (g < 0).any() or (new["date"].to_numpy() <= old["date"].to_numpy()[ends][g]).any() \
+                or not set(new.columns) <= set(old.columns):
+            fs = FeatureStore(pd.concat([old, new], ignore_index=True).drop_duplicates(["ticker", "date"], keep="last"),
+                              None, self.targets)
+            for n in names:
+                fs.column(n)
+            return fs
+
+        G = len(ends)
+        add = np.bincount(g, minlength=G)
+        offset = np.cumsum(add) - add                        # new rows inserted before each group
+        old_len = np.diff(np.r_[-1, ends])
+        old_pos = np.arange(len(old)) + offset[self.gid]
+        k = np.arange(len(new)) - np.r_[0, np.cumsum(add)][g]   # position within the ticker's new rows
+        new_pos = ends[g] + offset[g] + 1 + k
+        perm = np.empty(len(old) + len(new), dtype=np.int64)
+        perm[np.r_[old_pos, new_pos]] = np.arange(perm.size)
+        both = pd.concat([old, new.reindex(columns=old.columns)], ignore_index=True)
+        fs = FeatureStore._from_sorted(both.take(perm).reset_index(drop=True), None, self.targets)
+
+        windows = [v for n in names for v in resolve(n)[1].values()]
+        tail = max(tail, 48 * max(windows, default=0))
+        # recompute block per affected ticker: last `tail` old rows + its new rows
+        hit = np.flatnonzero(add)
+        keep_old = np.minimum(old_len[hit], tail)
+        block_end = ends[hit] + offset[hit] + add[hit]          # inclusive, in the new layout
+        block_len = keep_old + add[hit]
+        idx = np.repeat(block_end - block_len + 1, block_len) + _ranges(block_len)
+        warm = np.where(old_len[hit] > tail, tail // 2, 0)    # leading rows that keep their old values
+        replace = _ranges(block_len) >= np.repeat(warm, block_len)
+        sub = FeatureStore._from_sorted(fs.prices.take(idx).reset_index(drop=True), None, self.targets)
+        for n in names:
+            col = np.empty(perm.size)
+            col[old_pos] = self._memo[n]
+            col[idx[replace]] = sub.column(n)[replace]
+            fs._memo[n] = col
+        return fs
+
+    # raw inputs
+    def raw(self, col: str) -> np.ndarray:
+        return self.prices[col].to_numpy(dtype=np.float64)
+
+    def _hash_raw(self, col: str) -> str:
+        if col not in self._raw_hash:
+            h = pd.util.hash_pandas_object(self.prices[["ticker", "date", col]], index=False)
+            self._raw_hash[col] = hashlib.blake2b(h.to_numpy().tobytes(), digest_size=16).hexdigest()
+        return self._raw_hash[col]
+
+    def _inputs(self, name: str) -> list[str]:
+        spec, params = resolve(name)
+        cols = set(spec.inputs)
+        for d in spec.deps(**params):
+            cols |= set(self._inputs(d))
+        return sorted(cols)
+
+    def _settings(self, name: str) -> list[str]:
+        spec, params = resolve(name)
+        keys = set(spec.settings)
+        for d in spec.deps(**params):
+            keys |= set(self._settings(d))
+        return sorted(keys)
+
+    def cache_key(self, name: str) -> str:
+        parts = [_CACHE_VERSION, name] + [f"{c}:{self._hash_raw(c)}" for c in self._inputs(name)]
+        parts += [f"{k}={float(self.targets.get(k, 0.0))!r}" for k in self._settings(name)]
+        return hashlib.blake2b("|".join(parts).encode(), digest_size=12).hexdigest()
+
+    def _cache_path(self, name: str) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / name / f"{self.cache_key(name)}.parquet"
+
+    def column(self, name: str) -> np.ndarray:
+        """
+        Values of one feature aligned to self.prices rows (memoized in memory and on disk).
+        """
+        if name == "target":
+            return self.column(self.target_name)
+        if name in self._memo:
+            return self._memo[name]
+
+        path = self._cache_path(name)
+        if path is not None and path.exists():
+            values = pq.read_table(path).column(0).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+            self.stats["loaded"].append(name)
+        else:
+            spec, params = resolve(name)
+            values = np.asarray(spec.compute(self, **params), dtype=np.float64)
+            self.stats["computed"].append(name)
+            if path is not None:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                pq.write_table(pa.table({name: values}), path)
+
+        self._memo[name] = values
+        return values
+
+    def get(self, names: list[str]) -> pd.DataFrame:
+        """
+        DataFrame ['ticker','date', *names] for every price row (NaN during warm-up).
+        """
+        out = self.prices[["ticker", "date"]].copy()
+        for n in names:
+            out[n] = self.column(n)
+        return out
+
+
+def _sorted_prices(prices: pd.DataFrame) -> pd.DataFrame:
+    df = prices.dropna(subset=["close"])
+    df = df.assign(date=pd.to_datetime(df["date"])).sort_values(["ticker", "date"], kind="stable")
+    return df.reset_index(drop=True)
+
+
+def _ranges(lengths: np.ndarray) -> np.ndarray:
+    # concatenated arange(n) for each n in lengths
+    lengths = np.asarray(lengths, dtype=np.int64)
+    return np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+
+
+def load_features(prices: pd.DataFrame | str, names: list[str], cache_dir: str | None = DEFAULT_CACHE_DIR,
+                  targets: dict | None = None) -> pd.DataFrame:
+    """
+    One-shot helper: FeatureStore(prices, cache_dir, targets).get(names).
+    """
+    return FeatureStore(prices, cache_dir, targets).get(names)
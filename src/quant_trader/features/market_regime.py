@@ -1 +1,243 @@
+# src/quant_trader/features/market_regime.py
 # Compute volatility regimes, proximity to 52w highs/lows, breadth signals
+from __future__ import annotations
+from collections import deque
+import numpy as np
+import pandas as pd
+
+from src.quant_trader.utils.panel import Panel
+
+REGIME_COLUMNS = [
+    "high_252", "low_252", "dist_52w_high", "dist_52w_low",
+    "near_52w_high", "near_52w_low",
+    "rvol_20", "rvol_pct", "high_volatility",
+    "breadth_above_sma200", "adv_decl", "adv_decl_line",
+]
+
+
+def rolling_extreme_deque(x: np.ndarray, window: int, mode: str = "max", min_periods: int | None = None) -> np.ndarray:
+    """
+    Sliding-window max/min of a 1D series in O(n) with a monotonic deque of indices.
+    NaNs are skipped; output is NaN until `min_periods` valid values are in the window.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    min_periods = window if min_periods is None else min_periods
+    better = (lambda a, b: a >= b) if mode == "max" else (lambda a, b: a <= b)
+    out = np.full(x.shape, np.nan)
+    dq: deque[int] = deque()
+    n_valid = 0
+    for i, v in enumerate(x):
+        if i >= window and not np.isnan(x[i - window]):
+            n_valid -= 1
+        if dq and dq[0] <= i - window:
+            dq.popleft()
+        if not np.isnan(v):
+            n_valid += 1
+            while dq and better(v, x[dq[-1]]):
+                dq.pop()
+            dq.append(i)
+        if dq and n_valid >= min_periods:
+            out[i] = x[dq[0]]
+    return out
+
+
+def rolling_extreme(M: np.ndarray, window: int, mode: str = "max", min_periods: int | None = None) -> np.ndarray:
+    """
+    Sliding-window max/min down axis 0 of a date x ticker matrix, all columns at once.
+
+    Vectorized van Herk/Gil-Werman scheme (the block form of the monotonic-deque
+    sliding extreme): per-block prefix and suffix extremes, then one combine per
+    cell, so the cost is O(n) per column independent of `window`.
+    """
+    M = np.asarray(M, dtype=np.float64)
+    if M.ndim == 1:
+        return rolling_extreme(M[:, None], window, mode, min_periods)[:, 0]
+    min_periods = window if min_periods is None else min_periods
+    T, N = M.shape
+    fill = -np.inf if mode == "max" else np.inf
+    acc = np.maximum if mode == "max" else np.minimum
+
+    n_blocks = -(-T // window)
+    P = np.full((n_blocks * window, N), fill)
+    P[:T] = np.where(np.isnan(M), fill, M)
+    B = P.reshape(n_blocks, window, N)
+    prefix = acc.accumulate(B, axis=1).reshape(-1, N)
+    suffix = acc.accumulate(B[:, ::-1], axis=1)[:, ::-1].reshape(-1, N)
+
+    out = np.full((T, N), np.nan)
+    if T >= window:
+        # window [t-w+1, t] = suffix at its start combined with prefix at its end
+        out[window - 1:] = acc(suffix[: T - window + 1], prefix[window - 1: T])
+    # leading partial windows are prefixes of the first block
+    head = min(window - 1, T)
+    out[:head] = prefix[:head]
+
+    cnt = np.cumsum(~np.isnan(M), axis=0)
+    cnt[window:] = cnt[window:] - cnt[:-window]
+    out[(cnt < max(min_periods, 1)) | ~np.isfinite(out)] = np.nan
+    return out
+
+
+def rolling_mean(M: np.ndarray, window: int) -> np.ndarray:
+    """
+    Trailing mean down axis 0 (NaN unless the full window is valid), via cumulative sums.
+    """
+    M = np.asarray(M, dtype=np.float64)
+    valid = ~np.isnan(M)
+    cs = np.cumsum(np.where(valid, M, 0.0), axis=0)
+    cn = np.cumsum(valid, axis=0)
+    cs[window:] = cs[window:] - cs[:-window]
+    cn[window:] = cn[window:] - cn[:-window]
+    out = cs / window
+    out[cn < window] = np.nan
+    return out
+
+
+def rolling_std(M: np.ndarray, window: int, ddof: int = 1) -> np.ndarray:
+    """
+    Trailing standard deviation down axis 0 via rolling sums of x and x^2.
+    """
+    M = np.asarray(M, dtype=np.float64)
+    valid = ~np.isnan(M)
+    X = np.where(valid, M, 0.0)
+    s1, s2, cn = np.cumsum(X, axis=0), np.cumsum(X * X, axis=0), np.cumsum(valid, axis=0)
+    for a in (s1, s2, cn):
+        a[window:] = a[window:] - a[:-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (s2 - s1 * s1 / cn) / (cn - ddof)
+    out = np.sqrt(np.clip(var, 0.0, None))
+    out[cn < window] = np.nan
+    return out
+
+
+def expanding_percentile(M: np.ndarray, min_periods: int = 60) -> np.ndarray:
+    """
+    Percentile of each value within its own column's history up to that date
+    (no look-ahead): the share of the column's valid values so far that are <= it.
+
+    Values are ranked once per column (max rank for ties, so rank <= r means
+    value <= x). Dates are then taken in blocks of ~2 sqrt(T): a cumulative count
+    table cum[r, col] of the earlier blocks' ranks answers the history part with
+    one gather, and a (block x block) comparison covers the block itself, so every
+    step is vectorized over all columns.
+    """
+    M = np.asarray(M, dtype=np.float64)
+    if M.ndim == 1:
+        return expanding_percentile(M[:, None], min_periods)[:, 0]
+    T, N = M.shape
+    valid = ~np.isnan(M)
+    rank = np.where(valid, pd.DataFrame(M).rank(method="max").to_numpy(), 0).astype(np.int64)
+    seen = np.cumsum(valid, axis=0)
+
+    B = max(16, 2 * int(np.sqrt(T)))
+    lower = np.tril(np.ones((B, B), dtype=bool))[:, :, None]
+    cum = np.zeros((T + 1, N), dtype=np.int32)           # earlier values with rank <= r, per column
+    count = np.zeros((T, N), dtype=np.int64)
+    cols = np.broadcast_to(np.arange(N), (B, N))
+    for s in range(0, T, B):
+        Rb, Vb = rank[s:s + B], valid[s:s + B]
+        n = len(Rb)
+        within = ((Rb[None, :, :] <= Rb[:, None, :]) & Vb[None, :, :] & lower[:n, :n]).sum(axis=1)
+        count[s:s + n] = np.take_along_axis(cum, Rb, axis=0) + within
+        hist = np.bincount(Rb[Vb] * N + cols[:n][Vb], minlength=(T + 1) * N).reshape(T + 1, N)
+        cum += np.cumsum(hist, axis=0, dtype=np.int32)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        out = count / seen
+    out[~valid | (seen < max(min_periods, 1))] = np.nan
+    return out
+
+
+def build_regime_features(df_prices: pd.DataFrame, cfg: dict | None = None) -> pd.DataFrame:
+    """
+    Regime and breadth columns for every (ticker, date) in df_prices.
+
+    Inputs:
+      df_prices: tidy long prices with ['ticker','date','close']
+      cfg: optional 'regime' section:
+           window_52w (252), near_pct (0.05), vol_window (20),
+           vol_pct (0.8), vol_min_periods (60), sma_breadth (200)
+
+    Output: long DataFrame ['ticker','date', *REGIME_COLUMNS], joinable to the
+    feature matrix on [ticker, date]. Breadth columns are market-wide (same value
+    for every ticker on a date).
+    """
+    rcfg = (cfg or {}).get("regime", cfg or {}) or {}
+    w52 = int(rcfg.get("window_52w", 252))
+    near = float(rcfg.get("near_pct", 0.05))
+    vol_w = int(rcfg.get("vol_window", 20))
+    vol_q = float(rcfg.get("vol_pct", 0.8))
+    vol_min = int(rcfg.get("vol_min_periods", 60))
+    sma_w = int(rcfg.get("sma_breadth", 200))
+
+    if df_prices is None or df_prices.empty:
+        return pd.DataFrame(columns=["ticker", "date", *REGIME_COLUMNS])
+
+    df = df_prices[["ticker", "date", "close"]].dropna()
+    panel = Panel.from_long(df["date"].values, df["ticker"].values)
+    C = panel.pivot(df["close"].values)
+
+    # 52-week highs/lows (min_periods=1 so recent listings still get levels)
+    hi = rolling_extreme(C, w52, "max", min_periods=1)
+    lo = rolling_extreme(C, w52, "min", min_periods=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        d_hi = C / hi - 1.0
+        d_lo = C / lo - 1.0
+
+    # realized volatility and its own historical percentile
+    with np.errstate(invalid="ignore", divide="ignore"):
+        R = np.diff(np.log(C), axis=0, prepend=np.nan)
+    rvol = rolling_std(R, vol_w) * np.sqrt(252)
+    rvol_pct = expanding_percentile(rvol, vol_min)
+
+    # market breadth across the whole panel
+    sma = rolling_mean(C, sma_w)
+    has_sma = ~np.isnan(sma) & ~np.isnan(C)
+    above = (C > sma) & has_sma
+    n_sma = has_sma.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        breadth = np.where(n_sma > 0, above.sum(axis=1) / n_sma, np.nan)
+    n_ret = (~np.isnan(R)).sum(axis=1)
+    adv, dec = (R > 0).sum(axis=1), (R < 0).sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        ad = np.where(n_ret > 0, (adv - dec) / n_ret, np.nan)
+    ad_line = np.cumsum(adv - dec)
+
+    u = panel.unpivot
+    out = pd.DataFrame({
+        "ticker": panel.tickers.values[panel.col],
+        "date": panel.dates.values[panel.row],
+        "high_252": u(hi),
+        "low_252": u(lo),
+        "dist_52w_high": u(d_hi),
+        "dist_52w_low": u(d_lo),
+        "near_52w_high": u(d_hi >= -near),
+        "near_52w_low": u(d_lo <= near),
+        "rvol_20": u(rvol),
+        "rvol_pct": u(rvol_pct),
+        "high_volatility": u(rvol_pct >= vol_q),
+        "breadth_above_sma200": breadth[panel.row],
+        "adv_decl": ad[panel.row],
+        "adv_decl_line": ad_line[panel.row].astype(float),
+    })
+    return out.sort_values(["ticker", "date"]).reset_index(drop=True)
+
+
+def filter_by_regime(preds: pd.DataFrame, regimes: pd.DataFrame, names: list[str]) -> pd.DataFrame:
+    """
+    Keep prediction rows whose (ticker, date) is in ANY of the boolean regimes `names`
+    (e.g. configs/strategy.yaml::regime_filtered.regimes). The result can be passed
+    straight to long_only_topk / run_exact_long_only_topk.
+    """
+    if preds.empty or not names:
+        return preds
+    missing = [n for n in names if n not in regimes.columns]
+    if missing:
+        raise KeyError(f"Unknown regime(s): {missing}")
+    flags = regimes[["ticker", "date"]].assign(
+        _keep=regimes[names].fillna(False).astype(bool).any(axis=1)
+    )
+    flags["date"] = pd.to_datetime(flags["date"])
+    p = preds.assign(date=pd.to_datetime(preds["date"]))
+    merged = p.merge(flags, on=["ticker", "date"], how="left")
+    return merged[merged["_keep"].fillna(False).astype(bool)].drop(columns="_keep").reset_index(drop=True)
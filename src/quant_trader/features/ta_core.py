@@ -1 +1,110 @@
+# src/quant_trader/features/ta_core.py
 # Vectorized TA indicators go here (RSI, MACD, Bollinger, etc.)
+"""
+Indicators on a long array sorted by (ticker, date).
+
+`gid` is the int group (ticker) code of every row, non-decreasing. Windows never
+cross a group boundary: rolling/shift results are computed on the whole array at
+once with cumulative sums and masked where the window would reach into the
+previous ticker.
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+
+def group_position(gid: np.ndarray) -> np.ndarray:
+    """
+    0-based position of each row inside its group.
+    """
+    gid = np.asarray(gid)
+    n = gid.size
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    starts = np.flatnonzero(np.r_[True, gid[1:] != gid[:-1]])
+    lens = np.diff(np.r_[starts, n])
+    return np.arange(n) - np.repeat(starts, lens)
+
+
+def group_shift(x: np.ndarray, gid: np.ndarray, n: int) -> np.ndarray:
+    """
+    Per-group shift (positive n = lag, negative n = lead); NaN across boundaries.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    out = np.full_like(x, np.nan)
+    if n == 0:
+        return x.copy()
+    if abs(n) >= x.size:
+        return out
+    gid = np.asarray(gid)
+    if n > 0:
+        same = gid[n:] == gid[:-n]
+        out[n:] = np.where(same, x[:-n], np.nan)
+    else:
+        m = -n
+        same = gid[:-m] == gid[m:]
+        out[:-m] = np.where(same, x[m:], np.nan)
+    return out
+
+
+def group_rolling_sum(x: np.ndarray, gid: np.ndarray, window: int, min_periods: int | None = None) -> np.ndarray:
+    """
+    Trailing per-group rolling sum (NaN skipped); NaN until `min_periods` valid rows.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    min_periods = window if min_periods is None else min_periods
+    valid = ~np.isnan(x)
+    cs = np.r_[0.0, np.cumsum(np.where(valid, x, 0.0))]
+    cn = np.r_[0, np.cumsum(valid)]
+    pos = group_position(gid)
+    hi = np.arange(1, x.size + 1)
+    lo = hi - np.minimum(pos + 1, window)  # clip window start at the group start
+    s = cs[hi] - cs[lo]
+    c = cn[hi] - cn[lo]
+    s[c < max(min_periods, 1)] = np.nan
+    return s
+
+
+def group_rolling_mean(x: np.ndarray, gid: np.ndarray, window: int, min_periods: int | None = None) -> np.ndarray:
+    min_periods = window if min_periods is None else min_periods
+    valid = (~np.isnan(np.asarray(x, dtype=np.float64))).astype(np.float64)
+    s = group_rolling_sum(x, gid, window, min_periods)
+    c = group_rolling_sum(valid, gid, window, 1)
+    return s / c
+
+
+def group_rolling_std(x: np.ndarray, gid: np.ndarray, window: int, min_periods: int | None = None, ddof: int = 1) -> np.ndarray:
+    x = np.asarray(x, dtype=np.float64)
+    min_periods = window if min_periods is None else min_periods
+    c = group_rolling_sum((~np.isnan(x)).astype(np.float64), gid, window, 1)
+    # center on the group mean to keep the x^2 sums well conditioned
+    mu = pd.Series(x).groupby(np.asarray(gid)).transform("mean").to_numpy()
+    d = x - mu
+    s1 = group_rolling_sum(d, gid, window, min_periods)
+    s2 = group_rolling_sum(d * d, gid, window, min_periods)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        var = (s2 - s1 * s1 / c) / (c - ddof)
+    return np.sqrt(np.clip(var, 0.0, None))
+
+
+def group_ewm_mean(x: np.ndarray, gid: np.ndarray, alpha: float, min_periods: int = 0, adjust: bool = False) -> np.ndarray:
+    """
+    Per-group exponentially weighted mean (pandas' grouped EWM kernel).
+    """
+    s = pd.Series(np.asarray(x, dtype=np.float64))
+    out = s.groupby(np.asarray(gid), sort=False).ewm(alpha=alpha, adjust=adjust, min_periods=min_periods).mean()
+    return out.reset_index(level=0, drop=True).sort_index().to_numpy()
+
+
+def rsi_wilder(close: np.ndarray, gid: np.ndarray, window: int = 14) -> np.ndarray:
+    """
+    RSI with Wilder's smoothing, identical to feature_set._compute_rsi_wilder per ticker.
+    """
+    delta = np.asarray(close, dtype=np.float64) - group_shift(close, gid, 1)
+    gain = np.where(np.isnan(delta), np.nan, np.clip(delta, 0.0, None))
+    loss = np.where(np.isnan(delta), np.nan, -np.clip(delta, None, 0.0))
+    avg_gain = group_ewm_mean(gain, gid, 1 / window, min_periods=window)
+    avg_loss = group_ewm_mean(loss, gid, 1 / window, min_periods=window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rs = avg_gain / np.where(avg_loss == 0, np.nan, avg_loss)
+    return 100.0 - (100.0 / (1.0 + rs))
@@ -0,0 +1,97 @@
+# src/quant_trader/features/targets.py
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+DEFAULT_HORIZONS = (1, 5, 10, 21)
+
+
+def rows_remaining(gid: np.ndarray) -> np.ndarray:
+    """
+    Number of rows after each row within its group (0 on a ticker's last row).
+    """
+    gid = np.asarray(gid)
+    n = gid.size
+    if n == 0:
+        return np.zeros(0, dtype=np.int64)
+    ends = np.r_[np.flatnonzero(gid[1:] != gid[:-1]), n - 1]  # last row of each group
+    lens = np.diff(np.r_[-1, ends])
+    return np.repeat(ends, lens) - np.arange(n)
+
+
+def forward_targets(log_close: np.ndarray, gid: np.ndarray,
+                    horizons=DEFAULT_HORIZONS, label_threshold: float = 0.0) -> dict[str, np.ndarray]:
+    """
+    Forward targets for every horizon in one pass over a (ticker, date)-sorted array.
+
+      fwd_ret_{h}d  log(close[t+h] / close[t])
+      fwd_mdd_{h}d  max drawdown of the close path over (t, t+h] (<= 0), peak
+                    starting at the entry close
+      fwd_up_{h}d   1.0 if fwd_ret_{h}d > label_threshold else 0.0
+
+    Rows whose horizon runs past the ticker's last row are NaN. Log returns are
+    differences of log closes (= cumulative sums of ret_1d), taken for all
+    horizons in one gather; one rows-remaining array masks group boundaries, so
+    no per-ticker shift/rolling calls are needed. Only the drawdown walks the
+    path one day at a time (its running peak depends on every close in between).
+    """
+    lc = np.asarray(log_close, dtype=np.float64)
+    n = lc.size
+    horizons = sorted({int(h) for h in horizons})
+    rem = rows_remaining(gid)
+    idx = np.arange(n)
+    out: dict[str, np.ndarray] = {}
+    if n == 0:
+        for h in horizons:
+            for p in ("fwd_ret", "fwd_mdd", "fwd_up"):
+                out[f"{p}_{h}d"] = np.zeros(0)
+        return out
+
+    # forward returns for every horizon at once: differences of log closes
+    H = np.asarray(horizons, dtype=np.int64)
+    ok = rem[:, None] >= H[None, :]
+    ret = np.where(ok, lc[np.minimum(idx[:, None] + H[None, :], n - 1)] - lc[:, None], np.nan)
+
+    # drawdowns need the running peak along the path, so they walk it day by day
+    mdd_at: dict[int, np.ndarray] = {}
+    peak = lc.copy()
+    mdd = np.zeros(n)
+    want = set(horizons)
+    for j in range(1, max(horizons) + 1):
+        nxt = lc[np.minimum(idx + j, n - 1)]
+        peak = np.maximum(peak, nxt)
+        mdd = np.minimum(mdd, nxt - peak)
+        if j in want:
+            mdd_at[j] = mdd.copy()
+
+    for i, h in enumerate(horizons):
+        out[f"fwd_ret_{h}d"] = ret[:, i]
+        out[f"fwd_mdd_{h}d"] = np.where(ok[:, i], np.expm1(mdd_at[h]), np.nan)
+        out[f"fwd_up_{h}d"] = np.where(ok[:, i], (ret[:, i] > label_threshold).astype(np.float64), np.nan)
+    return out
+
+
+def build_targets(df_prices: pd.DataFrame, horizons=DEFAULT_HORIZONS, label_threshold: float = 0.0) -> pd.DataFrame:
+    """
+    Long DataFrame ['ticker','date', fwd_ret_*, fwd_mdd_*, fwd_up_*] from tidy prices.
+    """
+    df = (
+        df_prices[["ticker", "date", "close"]]
+        .dropna()
+        .assign(date=lambda d: pd.to_datetime(d["date"]))
+        .sort_values(["ticker", "date"], kind="stable")
+        .reset_index(drop=True)
+    )
+    gid = pd.factorize(df["ticker"].to_numpy())[0]
+    cols = forward_targets(np.log(df["close"].to_numpy(dtype=np.float64)), gid, horizons, label_threshold)
+    return df[["ticker", "date"]].assign(**cols)
+
+
+def target_column(targets_cfg: dict | None) -> str:
+    """
+    Name of the training target for configs/models.yaml::targets
+    (type: regression|classification, horizon_days: h).
+    """
+    tcfg = targets_cfg or {}
+    h = int(tcfg.get("horizon_days", 1))
+    return f"fwd_up_{h}d" if tcfg.get("type") == "classification" else f"fwd_ret_{h}d"
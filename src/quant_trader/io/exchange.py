@@ -0,0 +1,106 @@
+# src/quant_trader/io/exchange.py
+"""
+In-process hand-off of stage outputs as Arrow tables, persisted in the background.
+
+    with StageExchange() as ex:
+        ex.put("features", feat, path="data/processed/features.parquet")
+        m, preds = run_baseline(ex.get("features"), out_path=None, return_predictions=True)
+        ex.put("predictions", preds, path="outputs/predictions/baseline.parquet")
+        frame = ex.get_pandas("predictions")       # converted once, shared by every consumer
+    # leaving the block waits for the Parquet files (and re-raises a failed write)
+
+put() keeps the table in memory and queues the Parquet write on a single writer
+thread, so the next stage starts right away on the same buffers instead of
+re-reading and re-decoding the file. Writes go to a temporary file and are
+renamed into place, so readers never see a half-written file.
+"""
+from __future__ import annotations
+import os
+import queue
+import threading
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+
+class StageExchange:
+    def __init__(self, compression: str = "snappy"):
+        self.compression = compression
+        self._tables: dict[str, pa.Table] = {}
+        self._frames: dict[str, pd.DataFrame] = {}
+        self._queue: queue.Queue = queue.Queue()
+        self._errors: list[tuple[Path, BaseException]] = []
+        self._writer = threading.Thread(target=self._write_loop, name="parquet-writer", daemon=True)
+        self._writer.start()
+
+    def put(self, name: str, data: pa.Table | pd.DataFrame, path: str | Path | None = None) -> pa.Table:
+        """
+        Publish a stage output (DataFrames are converted once, without the index);
+        with `path`, also persist it asynchronously.
+        """
+        table = data if isinstance(data, pa.Table) else pa.Table.from_pandas(data, preserve_index=False)
+        self._tables[name] = table
+        self._frames.pop(name, None)
+        if isinstance(data, pd.DataFrame):
+            self._frames[name] = data
+        if path is not None:
+            self._queue.put((table, Path(path)))
+        return table
+
+    def get(self, name: str) -> pa.Table:
+        return self._tables[name]
+
+    def get_pandas(self, name: str) -> pd.DataFrame:
+        """
+        The stage output as a DataFrame (the frame that was put, or one conversion, cached).
+        """
+        if name not in self._frames:
+            self._frames[name] = self._tables[name].to_pandas()
+        return self._frames[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._tables
+
+    # ---- persistence ---------------------------------------------------------------
+
+    def _write_loop(self) -> None:
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                table, path = item
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f".{path.name}.tmp")
+                pq.write_table(table, tmp, compression=self.compression)
+                os.replace(tmp, path)
+            except BaseException as e:
+                self._errors.append((item[1], e))
+            finally:
+                self._queue.task_done()
+
+    def flush(self) -> None:
+        """
+        Block until every queued write has finished; raise if any failed.
+        """
+        self._queue.join()
+        if self._errors:
+            path, err = self._errors[0]
+            self._errors.clear()
+            raise OSError(f"Background Parquet write to {path} failed: {err}") from err
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            if self._writer.is_alive():
+                self._queue.put(None)
+                self._writer.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,204 @@
+# src/quant_trader/io/experiments.py
+"""
+Experiment store: one table of run metadata + summary metrics and one long table
+of per-run returns, so reports never reopen per-run backtest files.
+
+    store = ExperimentStore("outputs/experiments")
+    store.record(port, kind="vec", params={"k": 5})      # from a simulation
+    store.runs()                                         # metrics, no returns read
+    store.returns(store.top(10, by="Sharpe")["run_id"])  # only the selected runs
+
+Layout:
+    <root>/runs/*.parquet     run_id, name, kind, created_at, params (JSON), CAGR, Sharpe, MaxDD, N
+    <root>/returns/*.parquet  run_id, date, ret_port, equity
+
+Each record() writes one small part file per table (safe for parallel sweeps);
+compact() rewrites each table into a single file. record(replace=True) keeps one
+run per name (re-runs of the same config overwrite it), and ingest_files()
+re-imports a file whose modification time changed.
+"""
+from __future__ import annotations
+import json
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+from src.quant_trader.simulation.metrics import summarize
+
+DEFAULT_ROOT = "outputs/experiments"
+RETURN_COLUMNS = ["date", "ret_port", "equity"]
+METRICS = ["CAGR", "Sharpe", "MaxDD", "N"]
+
+
+def _read_dir(path: Path, columns: list[str] | None = None, filter=None) -> pa.Table | None:
+    files = sorted(str(p) for p in path.glob("*.parquet")) if path.exists() else []
+    if not files:
+        return None
+    return ds.dataset(files, format="parquet").to_table(columns=columns, filter=filter)
+
+
+class ExperimentStore:
+    def __init__(self, root: str | Path = DEFAULT_ROOT):
+        self.root = Path(root)
+        self.runs_dir = self.root / "runs"
+        self.returns_dir = self.root / "returns"
+
+    # ---- writing ---------------------------------------------------------------
+
+    def record(self, port: pd.DataFrame, kind: str, params: dict | None = None,
+               name: str | None = None, run_id: str | None = None,
+               periods_per_year: int | float = 252, replace: bool = False,
+               source_file: str | Path | None = None) -> str:
+        """
+        Append one run. port: ['date','ret_port'] (+ optional 'equity').
+        Metrics are computed here, once; returns the run_id.
+        replace=True drops earlier runs with the same name once this one is written.
+        source_file: the backtest file `port` was written to; its mtime is stored so
+        ingest_files() leaves this run (and its params) alone until the file changes.
+        """
+        run_id = run_id or uuid.uuid4().hex[:12]
+        if source_file is not None:
+            params = {**(params or {}), "mtime_ns": Path(source_file).stat().st_mtime_ns}
+            params.setdefault("source", str(source_file))
+        old = []
+        if replace and name and self.runs_dir.exists():
+            runs = self.runs(columns=["run_id", "name"])
+            old = runs.loc[runs["name"] == name, "run_id"].tolist()
+        m = summarize(port, periods_per_year)
+        meta = {
+            "run_id": run_id,
+            "name": name or run_id,
+            "kind": kind,
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "params": json.dumps(params or {}, sort_keys=True, default=str),
+            **{k: float(m[k]) if k != "N" else int(m[k]) for k in METRICS},
+        }
+        n = len(port)
+        ret = port["ret_port"].to_numpy(dtype=np.float64) if n else np.zeros(0)
+        eq = port["equity"].to_numpy(dtype=np.float64) if "equity" in port else np.exp(np.cumsum(ret))
+        rets = pa.table({
+            "run_id": pa.array([run_id] * n, pa.string()),
+            "date": pa.array(pd.to_datetime(port["date"]).to_numpy() if n else np.zeros(0, "datetime64[ns]")),
+            "ret_port": ret,
+            "equity": eq,
+        })
+        self.runs_dir.mkdir(parents=True, exist_ok=True)
+        self.returns_dir.mkdir(parents=True, exist_ok=True)
+        # returns first: a run row only appears once its returns are on disk
+        pq.write_table(rets, self.returns_dir / f"part-{run_id}.parquet")
+        pq.write_table(pa.Table.from_pylist([meta]), self.runs_dir / f"part-{run_id}.parquet")
+        if old:
+            self.drop(old)
+        return run_id
+
+    def drop(self, run_ids) -> None:
+        """
+        Remove runs and their returns: part files are deleted, compacted files
+        rewritten without those rows (run rows first, so no run is left without returns).
+        """
+        ids = set(run_ids)
+        for d in (self.runs_dir, self.returns_dir):
+            for p in sorted(d.glob("*.parquet")) if d.exists() else []:
+                if p.stem.startswith("part-"):
+                    if p.stem[5:] in ids:
+                        p.unlink()
+                    continue
+                t = pq.read_table(p)
+                keep = pc.invert(pc.is_in(t.column("run_id"), pa.array(list(ids), pa.string())))
+                if pc.all(keep).as_py():
+                    continue
+                tmp = d / f"_drop-{uuid.uuid4().hex[:8]}.tmp"
+                pq.write_table(t.filter(keep), tmp)
+                tmp.replace(p)
+
+    def ingest_files(self, files, kind: str | None = None) -> list[str]:
+        """
+        Import legacy per-run backtest parquet files (outputs/backtests/*.parquet),
+        each read once with only the return columns. Runs are matched by name
+        (= file stem): unchanged files are skipped, files rewritten since their
+        import (different mtime) replace the stored run. A run stored without a
+        file mtime (recorded directly) is kept unless the file is newer than it.
+        """
+        known = {}
+        if self.runs_dir.exists():
+            runs = self.runs(columns=["name", "params", "created_at"])
+            created = pd.to_datetime(runs["created_at"], utc=True).astype("int64") + 1_000_000_000  # second precision
+            mtimes = [json.loads(p).get("mtime_ns") for p in runs["params"]]     # a list: ints stay exact next to None
+            known = dict(zip(runs["name"], zip(mtimes, created)))
+        added = []
+        for f in map(Path, files):
+            mtime = f.stat().st_mtime_ns
+            if f.stem in known:
+                stored, created_ns = known[f.stem]
+                if stored == mtime or (stored is None and mtime <= created_ns):
+                    continue
+            cols = [c for c in RETURN_COLUMNS if c in pq.read_schema(f).names]
+            if "ret_port" not in cols:
+                continue
+            port = pq.read_table(f, columns=cols).to_pandas()
+            k = kind or f.stem.split("_", 1)[0]
+            added.append(self.record(port, kind=k, name=f.stem, params={"source": str(f), "mtime_ns": mtime},
+                                     replace=True))
+        return added
+
+    def compact(self) -> None:
+        """
+        Merge each table's part files into one file.
+        """
+        for d in (self.runs_dir, self.returns_dir):
+            parts = sorted(d.glob("*.parquet")) if d.exists() else []
+            if len(parts) <= 1:
+                continue
+            table = ds.dataset([str(p) for p in parts], format="parquet").to_table()
+            tmp = d / f"_compact-{uuid.uuid4().hex[:8]}.tmp"
+            pq.write_table(table, tmp)
+            for p in parts:
+                p.unlink()
+            tmp.rename(d / "data.parquet")
+
+    # ---- reading -----------------------------------------------------------------
+
+    def runs(self, kind: str | None = None, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Run metadata + metrics (no returns are read).
+        """
+        filt = ds.field("kind") == kind if kind else None
+        if columns is not None and kind and "kind" not in columns:
+            columns = [*columns, "kind"]
+        t = _read_dir(self.runs_dir, columns, filt)
+        if t is None:
+            return pd.DataFrame(columns=columns or ["run_id", "name", "kind", "created_at", "params", *METRICS])
+        return t.to_pandas()
+
+    def top(self, n: int = 10, by: str = "Sharpe", kind: str | None = None, ascending: bool = False) -> pd.DataFrame:
+        runs = self.runs(kind)
+        return runs.sort_values(by, ascending=ascending, kind="stable").head(n).reset_index(drop=True)
+
+    def returns(self, run_ids, columns: list[str] | None = None) -> pd.DataFrame:
+        """
+        Long ['run_id', *columns] returns for the selected runs only.
+        """
+        cols = ["run_id", *(columns or RETURN_COLUMNS)]
+        ids = list(run_ids)
+        t = _read_dir(self.returns_dir, cols, ds.field("run_id").isin(ids)) if ids else None
+        if t is None:
+            return pd.DataFrame(columns=cols)
+        return t.to_pandas()
+
+    def return_matrix(self, run_ids, column: str = "ret_port") -> pd.DataFrame:
+        """
+        date x run_id matrix of one return column (NaN where a run has no row),
+        e.g. a whole sweep for simulation.risk.rolling_risk.
+        """
+        ids = list(run_ids)
+        long = self.returns(ids, columns=["date", column])
+        if long.empty:
+            return pd.DataFrame(columns=ids, index=pd.DatetimeIndex([], name="date"))
+        M = long.pivot_table(index="date", columns="run_id", values=column, aggfunc="last")
+        return M.reindex(columns=[i for i in ids if i in M.columns]).sort_index()
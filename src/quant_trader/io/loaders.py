@@ -1,21 +1,171 @@
 # --- Add near the top of the file (after other imports) ---
 import os
 import time
+import importlib
+import numpy as np
 import pandas as pd
 from typing import Optional
+from src.quant_trader.utils.logging import logger
 
-#  optional dependencies once (avoids Pylance "unresolved import" noise)
-try:
-    from fredapi import Fred  # type: ignore
-    _HAVE_FREDAPI = True
-except Exception:
-    _HAVE_FREDAPI = False
 
-try:
-    from pandas_datareader import data as pdr  # type: ignore
-    _HAVE_PDR = True
-except Exception:
-    _HAVE_PDR = False
+def _optional(module: str, attr: Optional[str] = None):
+    """
+    Import an optional dependency on first use (None if it is not installed), so
+    importing this module never pays for fredapi / pandas_datareader when FRED is off.
+    """
+    try:
+        mod = importlib.import_module(module)
+    except Exception:
+        return None
+    return getattr(mod, attr, None) if attr else mod
+
+
+PRICE_COLUMNS = ["ticker", "date", "open", "high", "low", "close", "adj_close", "volume"]
+_YAHOO_FIELDS = {"Open": "open", "High": "high", "Low": "low", "Close": "close",
+                 "Adj Close": "adj_close", "Volume": "volume"}
+
+
+def yfinance_transport(tickers: list[str], start: Optional[str], end: Optional[str]) -> pd.DataFrame:
+    """
+    Default Yahoo transport: one yfinance bulk request for `tickers`.
+    Returns the wide frame (date index, (field, ticker) columns); `end` is exclusive.
+    """
+    yf = _optional("yfinance")
+    if yf is None:
+        raise RuntimeError("Yahoo source selected but yfinance is not installed: pip install yfinance")
+    return yf.download(tickers, start=start, end=end, group_by="column", auto_adjust=False,
+                       actions=False, progress=False, threads=False)
+
+
+class RecordedTransport:
+    """
+    Replays a wide multi-ticker frame recorded to Parquet (tests / offline runs):
+
+        RecordedTransport.record(yfinance_transport, tickers, start, end, "tests/fixtures/yahoo.parquet")
+        _download_yahoo(tickers, start, end, transport=RecordedTransport("tests/fixtures/yahoo.parquet"))
+
+    Calls return only the requested tickers and dates in [start, end), like the live source.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.wide = pd.read_parquet(path)
+        self.calls: list[tuple[list[str], Optional[str], Optional[str]]] = []
+
+    @staticmethod
+    def record(transport, tickers: list[str], start: Optional[str], end: Optional[str], path: str) -> pd.DataFrame:
+        wide = transport(tickers, start, end)
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        wide.to_parquet(path)
+        return wide
+
+    def __call__(self, tickers: list[str], start: Optional[str], end: Optional[str]) -> pd.DataFrame:
+        self.calls.append((list(tickers), start, end))
+        w = self.wide
+        idx = pd.to_datetime(w.index)
+        keep = idx >= pd.Timestamp(start) if start else idx.notna()
+        if end:
+            keep &= idx < pd.Timestamp(end)
+        cols = w.columns.get_level_values(1).isin(tickers)
+        return w.loc[keep, cols]
+
+
+def _wide_to_long(wide: pd.DataFrame, tickers: list[str]) -> pd.DataFrame:
+    """
+    Wide Yahoo frame -> tidy long PRICE_COLUMNS with one stack (no per-ticker loop).
+    Accepts (field, ticker) or (ticker, field) column levels, or flat field columns
+    for a single ticker. Rows without a close (ticker not trading yet) are dropped.
+    """
+    if wide is None or wide.empty:
+        return pd.DataFrame(columns=PRICE_COLUMNS)
+    if not isinstance(wide.columns, pd.MultiIndex):
+        wide = pd.concat({tickers[0]: wide}, axis=1, names=["ticker", "field"])
+    lvl = 0 if set(wide.columns.get_level_values(0)) & set(_YAHOO_FIELDS) else 1
+    long = wide.stack(level=1 - lvl, future_stack=True)          # index (date, ticker), columns = fields
+    long = long.rename(columns=_YAHOO_FIELDS).reindex(columns=PRICE_COLUMNS[2:])
+    long.index = long.index.set_names(["date", "ticker"])
+    long = long.dropna(subset=["close"]).reset_index()
+    dates = pd.to_datetime(long["date"])
+    if dates.dt.tz is not None:
+        dates = dates.dt.tz_localize(None)
+    long["date"] = dates.dt.normalize()
+    long["adj_close"] = long["adj_close"].fillna(long["close"])
+    long[PRICE_COLUMNS[2:]] = long[PRICE_COLUMNS[2:]].astype("float64")
+    return long[PRICE_COLUMNS]
+
+
+def _download_yahoo(tickers: list[str], start: Optional[str], end: Optional[str],
+                    chunk_size: int = 50, max_workers: int = 4, transport=None,
+                    retries: int = 2, retry_delay: float = 2.0,
+                    since: Optional[dict] = None) -> pd.DataFrame:
+    """
+    Bulk Yahoo prices: tickers are requested `chunk_size` at a time, `max_workers`
+    chunks concurrently, each wide result reshaped to tidy long in one stack.
+    Returns ['ticker','date','open','high','low','close','adj_close','volume'].
+
+    since: {ticker: last date already stored} -> only later bars are requested
+           (tickers sharing a start date are batched together; others use `start`).
+    transport(tickers, start, end) -> wide frame; defaults to yfinance_transport.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    transport = transport or yfinance_transport
+    stop = pd.Timestamp(end) if end is not None else pd.Timestamp.today().normalize() + pd.Timedelta(days=1)
+    groups: dict[Optional[str], list[str]] = {}
+    for t in dict.fromkeys(tickers):
+        last = (since or {}).get(t)
+        s = (pd.Timestamp(last) + pd.Timedelta(days=1)).strftime("%Y-%m-%d") if last is not None else start
+        if s is not None and pd.Timestamp(s) >= stop:
+            continue                                  # already up to date
+        groups.setdefault(s, []).append(t)
+    jobs = [(g[i:i + chunk_size], s) for s, g in groups.items() for i in range(0, len(g), max(int(chunk_size), 1))]
+    if not jobs:
+        return pd.DataFrame(columns=PRICE_COLUMNS)
+
+    def fetch(job):
+        chunk, s = job
+        for attempt in range(retries + 1):
+            try:
+                return _wide_to_long(transport(chunk, s, end), chunk)
+            except Exception:
+                if attempt == retries:
+                    raise
+                time.sleep(retry_delay * (attempt + 1))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(int(max_workers), len(jobs)))) as pool:
+        parts = [p for p in pool.map(fetch, jobs) if not p.empty]
+    if not parts:
+        return pd.DataFrame(columns=PRICE_COLUMNS)
+    df = pd.concat(parts, ignore_index=True)
+    return df.sort_values(["ticker", "date"], kind="stable").reset_index(drop=True)
+
+
+def last_dates(prices: Optional[pd.DataFrame]) -> dict:
+    """
+    {ticker: last stored date} of a long price frame (input for `since`).
+    """
+    if prices is None or prices.empty:
+        return {}
+    return pd.to_datetime(prices["date"]).groupby(prices["ticker"]).max().to_dict()
+
+
+def restated_tickers(stored: pd.DataFrame, fetched: pd.DataFrame, rtol: float = 1e-6) -> list[str]:
+    """
+    Tickers whose re-fetched bars disagree with the stored ones on close or adj_close.
+    Yahoo restates that history after splits and dividends, so a mismatch on the
+    overlapping bar means the stored history is stale and has to be re-fetched whole.
+    """
+    if stored is None or stored.empty or fetched.empty:
+        return []
+    cols = ["ticker", "date", "close", "adj_close"]
+    a = stored[cols].assign(date=lambda d: pd.to_datetime(d["date"]))
+    b = fetched[cols].assign(date=lambda d: pd.to_datetime(d["date"]))
+    m = a.merge(b, on=["ticker", "date"], suffixes=("_old", "_new"))
+    diff = pd.Series(False, index=m.index)
+    for c in ("close", "adj_close"):
+        old, new = m[f"{c}_old"].to_numpy(dtype=float), m[f"{c}_new"].to_numpy(dtype=float)
+        diff |= ~np.isclose(old, new, rtol=rtol, atol=0.0, equal_nan=True)
+    return sorted(m.loc[diff, "ticker"].unique())
 
 
 def _download_alpha_vantage(tickers: list[str], api_key: str, outputsize: str = "compact") -> pd.DataFrame:
@@ -80,7 +230,8 @@ def _download_fred(series_ids: list[str], api_key: Optional[str], start: Optiona
     out: list[pd.DataFrame] = []
 
     # Try fredapi first
-    if _HAVE_FREDAPI:
+    Fred = _optional("fredapi", "Fred")
+    if Fred is not None:
         try:
             fred = Fred(api_key=api_key)
             for sid in series_ids:
@@ -98,7 +249,8 @@ def _download_fred(series_ids: list[str], api_key: Optional[str], start: Optiona
             pass
 
     # Fallback: pandas_datareader
-    if not out and _HAVE_PDR:
+    pdr = _optional("pandas_datareader.data") if not out else None
+    if pdr is not None:
         for sid in series_ids:
             df = pdr.DataReader(sid, "fred", start=start, end=end)
             # df index is DATE; column name = sid
@@ -147,11 +299,18 @@ def merge_prices_and_macro(prices: pd.DataFrame, macro: pd.DataFrame) -> pd.Data
     return merged
 
 
-def fetch_all(cfg: dict) -> pd.DataFrame:
+def fetch_all(cfg: dict, existing: Optional[pd.DataFrame] = None, transport=None) -> pd.DataFrame:
     """
     Unified data fetcher:
       - Prices from Yahoo (default) or Alpha Vantage (if enabled)
       - Optional FRED macro merge (if enabled)
+
+    With `existing` prices, Yahoo fetches each ticker from its last stored date on
+    (sources.yahoo.incremental, default true). That overlapping bar is compared with
+    the stored one: when its close/adj_close was restated (split, dividend) the
+    ticker's full history is re-fetched and returned, otherwise only the later bars
+    are. Callers merge the result with keep="last" on (ticker, date).
+    `transport` overrides the Yahoo transport (e.g. RecordedTransport).
     """
     start = cfg.get("data", {}).get("start_date")
     end = cfg.get("data", {}).get("end_date")
@@ -163,8 +322,28 @@ def fetch_all(cfg: dict) -> pd.DataFrame:
 
     # 1) Prices
     if use_yahoo and tickers:
-        # assumes your existing _download_yahoo(...) is defined elsewhere in this file
-        df_prices = _download_yahoo(tickers, start, end)  # type: ignore[name-defined]
+        y_cfg = cfg.get("sources", {}).get("yahoo", {}) or {}
+        incremental = y_cfg.get("incremental", True) and existing is not None and not existing.empty
+        kwargs = dict(chunk_size=int(y_cfg.get("chunk_size", 50)),
+                      max_workers=int(y_cfg.get("max_workers", 4)),
+                      retries=int(y_cfg.get("retries", 2)),
+                      transport=transport)
+        if incremental:
+            last = last_dates(existing)
+            # start one bar early: the overlapping bar tells whether history was restated
+            since = {t: d - pd.Timedelta(days=1) for t, d in last.items()}
+            df_prices = _download_yahoo(tickers, start, end, since=since, **kwargs)
+            stale = restated_tickers(existing, df_prices)
+            seen = df_prices["ticker"].map(last)
+            df_prices = df_prices[seen.isna() | (pd.to_datetime(df_prices["date"]) > seen)]
+            if stale:
+                logger.warning(f"[data] restated history for {stale}; re-fetching them in full")
+                df_prices = pd.concat([df_prices[~df_prices["ticker"].isin(stale)],
+                                       _download_yahoo(stale, start, end, **kwargs)], ignore_index=True)
+                df_prices = df_prices.sort_values(["ticker", "date"], kind="stable")
+            df_prices = df_prices.reset_index(drop=True)
+        else:
+            df_prices = _download_yahoo(tickers, start, end, **kwargs)
     elif use_av and tickers:
         av_cfg = cfg.get("sources", {}).get("alpha_vantage", {})
         api_key = os.getenv(av_cfg.get("api_key_env", "ALPHAVANTAGE_API_KEY"), "")
@@ -173,7 +352,7 @@ def fetch_all(cfg: dict) -> pd.DataFrame:
         outputsize = av_cfg.get("outputsize", "compact")
         df_prices = _download_alpha_vantage(tickers, api_key, outputsize=outputsize)
     else:
-        df_prices = pd.DataFrame(columns=["ticker", "date", "open", "high", "low", "close", "adj_close", "volume"])
+        df_prices = pd.DataFrame(columns=PRICE_COLUMNS)
 
     # 2) Macro (FRED)
     if use_fred:
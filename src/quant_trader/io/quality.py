@@ -0,0 +1,275 @@
+# src/quant_trader/io/quality.py
+"""
+Data-quality checks for long price frames (['ticker','date','open','high','low','close',
+'adj_close','volume']), run before anything takes np.log(close).
+
+    rep = validate_prices(df, **cfg["data"]["quality"])
+    print(rep.summary())
+    df = rep.clean(df)            # drop quarantined rows
+    bars, rep = validate_appended(stored, bars)   # upserts: new bars + each ticker's tail
+
+One vectorized pass over the (ticker, date)-sorted arrays; every row gets a bit
+flag per failed check (`rep.flags`, aligned with the input rows):
+
+  duplicate    repeated (ticker, date) (the first occurrence is kept)
+  nonpositive  missing / zero / negative open, high, low or close
+  ohlc         high below open/close/low, or low above open/close/high
+  outlier      |log return| more than `return_z` robust sigmas from the ticker's median
+  split        outlier whose close ratio is a common split factor while adj_close moved normally
+  gap          more than `max_gap_bdays` business days missing before the bar
+  stale        close unchanged for `stale_run` or more consecutive bars
+  volume       negative/missing volume, or log volume more than `volume_z` robust sigmas off
+
+Robust sigmas are per-ticker interquartile ranges / 1.349, taken from one sort of
+a (ticker code + value) key, so no per-ticker Python loop runs anywhere.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+CHECKS = ("duplicate", "nonpositive", "ohlc", "outlier", "split", "gap", "stale", "volume")
+BIT = {name: np.uint16(1 << i) for i, name in enumerate(CHECKS)}
+DEFAULT_QUARANTINE = ("duplicate", "nonpositive", "ohlc")
+_SPLIT_RATIOS = np.log([2.0, 3.0, 4.0, 5.0, 8.0, 10.0, 1.5, 20.0])
+
+
+@dataclass
+class QualityReport:
+    flags: np.ndarray          # uint16 bit flags per input row (see CHECKS)
+    quarantine: np.ndarray     # bool per input row
+    counts: dict               # check -> flagged rows
+    by_ticker: pd.DataFrame    # per ticker: rows, missing_bdays and flagged rows per check
+    n_rows: int
+
+    def has(self, check: str) -> np.ndarray:
+        return (self.flags & BIT[check]) != 0
+
+    def clean(self, df: pd.DataFrame) -> pd.DataFrame:
+        return df[~self.quarantine] if self.quarantine.any() else df
+
+    @property
+    def ok(self) -> bool:
+        return not self.quarantine.any()
+
+    def summary(self) -> str:
+        parts = [f"{c}={n}" for c, n in self.counts.items() if n]
+        return (f"{self.n_rows} rows, {int(self.quarantine.sum())} quarantined"
+                + (f"; {', '.join(parts)}" if parts else "; no issues"))
+
+
+def _group_quantiles(values: np.ndarray, codes: np.ndarray, n_groups: int,
+                     qs: tuple[float, ...]) -> tuple[np.ndarray, ...]:
+    """
+    Per-group quantiles of `values` (NaN ignored) with one np.sort: each value is
+    offset by 10_000 * group code, so sorting groups the rows and orders them within
+    the group at once (values are clipped to +-100, which the checks never reach;
+    NaNs sort last in their group).
+    """
+    ok = np.isfinite(values)
+    key = codes.astype(np.float64) * 10_000.0 + np.where(ok, np.clip(values, -100.0, 100.0), 999.0)
+    key.sort()
+    size = np.bincount(codes, minlength=n_groups)
+    n_ok = np.bincount(codes, weights=ok, minlength=n_groups).astype(np.int64)
+    start = np.r_[0, np.cumsum(size)[:-1]]
+    base = np.arange(n_groups) * 10_000.0
+    out = []
+    for q in qs:
+        pos = q * np.maximum(n_ok - 1, 0)
+        lo = start + np.floor(pos).astype(np.int64)
+        hi = start + np.ceil(pos).astype(np.int64)
+        lo_c, hi_c = np.minimum(lo, len(key) - 1), np.minimum(hi, len(key) - 1)
+        val = key[lo_c] + (key[hi_c] - key[lo_c]) * (pos - np.floor(pos)) - base
+        out.append(np.where(n_ok > 0, val, np.nan))
+    return tuple(out)
+
+
+def _robust_z(values: np.ndarray, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    q25, q50, q75 = _group_quantiles(values, codes, n_groups, (0.25, 0.5, 0.75))
+    sigma = (q75 - q25) / 1.349
+    sigma = np.where(sigma > 0, sigma, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (values - q50[codes]) / sigma[codes]
+
+
+def validate_prices(df: pd.DataFrame,
+                    return_z: float = 8.0,
+                    volume_z: float = 8.0,
+                    max_gap_bdays: int = 2,
+                    stale_run: int = 5,
+                    split_tol: float = 0.02,
+                    quarantine: tuple[str, ...] | list[str] = DEFAULT_QUARANTINE,
+                    holidays=None) -> QualityReport:
+    """
+    Run every check in one pass and return a QualityReport (see module docstring).
+    `holidays` (dates) are not counted as missing business days.
+    """
+    bad_q = set(quarantine) - set(CHECKS)
+    if bad_q:
+        raise ValueError(f"Unknown quarantine checks {sorted(bad_q)}; expected a subset of {CHECKS}")
+    n = len(df)
+    if n == 0:
+        return QualityReport(np.zeros(0, np.uint16), np.zeros(0, bool), dict.fromkeys(CHECKS, 0),
+                             pd.DataFrame(columns=["ticker", "rows", "missing_bdays", *CHECKS]), 0)
+
+    # codes in order of appearance: a frame grouped by ticker and sorted by date needs no sort
+    tcodes, tickers = pd.factorize(df["ticker"])
+    codes = tcodes.astype(np.int64)
+    dates = pd.to_datetime(df["date"]).to_numpy(dtype="datetime64[ns]").astype("datetime64[D]")
+    d_int = dates.astype(np.int64)
+    key = (codes << 20) + (d_int - d_int.min())        # < 2**20 days of history
+    presorted = bool(np.all(key[1:] >= key[:-1]))
+    order = np.arange(n) if presorted else np.argsort(key, kind="stable")
+
+    def col(name):
+        if name not in df.columns:
+            return None
+        x = df[name].to_numpy(dtype=np.float64)
+        return x if presorted else x[order]
+
+    c, o, h, lo, v = col("close"), col("open"), col("high"), col("low"), col("volume")
+    adj = col("adj_close")
+    g, d = (codes, dates) if presorted else (codes[order], dates[order])
+    flags = np.zeros(n, dtype=np.uint16)
+
+    def mark(mask: np.ndarray, name: str) -> None:
+        flags[:] |= mask.view(np.uint8) * BIT[name]     # no boolean fancy-indexing
+
+    same = np.r_[False, g[1:] == g[:-1]]               # row continues the previous row's ticker
+
+    # duplicates
+    dup = same & np.r_[False, d[1:] == d[:-1]]
+    mark(dup, "duplicate")
+
+    # price sanity
+    prices = [x for x in (o, h, lo, c) if x is not None]
+    nonpos = np.zeros(n, dtype=bool)
+    for x in prices:
+        nonpos |= ~(x > 0)                             # NaN counts as missing
+    mark(nonpos, "nonpositive")
+    if o is not None and h is not None and lo is not None:
+        tol = 1e-6 * c
+        with np.errstate(invalid="ignore"):
+            bad = (h + tol < np.fmax(np.fmax(o, c), lo)) | (lo - tol > np.fmin(np.fmin(o, c), h))
+        mark(bad & ~nonpos, "ohlc")
+
+    # returns: robust z per ticker, split signature
+    usable = same & ~dup & ~nonpos & np.r_[False, ~nonpos[:-1]]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        lc = np.log(c)
+        r = np.empty(n)
+        r[0] = np.nan
+        np.subtract(lc[1:], lc[:-1], out=r[1:])
+        r[~usable] = np.nan
+    n_groups = len(tickers)
+    z = _robust_z(r, g, n_groups)
+    with np.errstate(invalid="ignore"):
+        outlier = np.abs(z) > return_z
+    if adj is not None:
+        cand = np.flatnonzero(outlier)                 # only the few outliers are tested
+        with np.errstate(invalid="ignore", divide="ignore"):
+            r_adj = np.log(adj[cand]) - np.log(adj[cand - 1])
+            near = np.abs(np.abs(r[cand])[:, None] - _SPLIT_RATIOS[None, :]).min(axis=1) < split_tol
+            split = cand[near & (np.abs(r_adj) < np.abs(r[cand]) / 4)]
+        flags[split] |= BIT["split"]
+        outlier[split] = False
+    mark(outlier, "outlier")
+
+    # gaps (business days missing between consecutive bars of a ticker); only steps
+    # longer than a day, other than Friday -> Monday, need np.busday_count
+    missing = np.zeros(n, dtype=np.int64)
+    d_sorted = d_int if presorted else d_int[order]
+    step = np.r_[0, np.diff(d_sorted)]
+    weekend = (step == 3) & ((d_sorted + 3) % 7 == 0)    # 1970-01-01 was a Thursday
+    idx = np.flatnonzero(same & (step > 1) & ~weekend)
+    hol = np.asarray(pd.to_datetime(holidays).values.astype("datetime64[D]")) if holidays is not None else None
+    kw = {"holidays": hol} if hol is not None else {}
+    missing[idx] = np.maximum(np.busday_count(d[idx - 1], d[idx], **kw) - 1, 0)
+    mark(missing > max_gap_bdays, "gap")
+
+    # stale closes: runs of identical closes
+    eq = same & np.r_[False, c[1:] == c[:-1]]
+    run_id = np.cumsum(~eq)
+    run_len = np.bincount(run_id)[run_id]
+    mark(run_len >= stale_run, "stale")
+
+    # volume
+    if v is not None:
+        vbad = ~(v >= 0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            lv = np.where(vbad, np.nan, np.log1p(v))
+        vz = _robust_z(lv, g, n_groups)
+        with np.errstate(invalid="ignore"):
+            vbad |= np.abs(vz) > volume_z
+        mark(vbad, "volume")
+
+    qmask = np.zeros(n, dtype=bool)
+    for name in quarantine:
+        qmask |= (flags & BIT[name]) != 0
+
+    # back to input row order
+    if presorted:
+        inv = slice(None)
+    else:
+        inv = np.empty(n, dtype=np.int64)
+        inv[order] = np.arange(n)
+    counts, per = {}, {"ticker": np.asarray(tickers), "rows": np.bincount(g, minlength=n_groups),
+                       "missing_bdays": np.bincount(g, weights=missing, minlength=n_groups).astype(np.int64)}
+    for name in CHECKS:
+        hit = (flags & BIT[name]) != 0
+        counts[name] = int(hit.sum())
+        per[name] = np.bincount(g[hit], minlength=n_groups)
+    by_ticker = pd.DataFrame(per).sort_values("ticker", kind="stable").reset_index(drop=True)
+    return QualityReport(flags=flags[inv], quarantine=qmask[inv], counts=counts, by_ticker=by_ticker, n_rows=n)
+
+
+def quality_settings(cfg: dict | None) -> dict:
+    """
+    validate_prices keyword arguments from cfg['data']['quality'], plus the holidays
+    of cfg['project']['calendar'] (exchange holidays are not gaps).
+    """
+    qcfg = dict(((cfg or {}).get("data", {}) or {}).get("quality") or {})
+    if "holidays" not in qcfg and ((cfg or {}).get("project", {}) or {}).get("calendar"):
+        from src.quant_trader.utils.time import calendar_from_config
+        qcfg["holidays"] = calendar_from_config(cfg).holidays
+    return qcfg
+
+
+def validate_appended(history: pd.DataFrame, bars: pd.DataFrame, tail: int = 260,
+                      **kwargs) -> tuple[pd.DataFrame, QualityReport]:
+    """
+    Validate new `bars` for an upsert: they are checked together with the last `tail`
+    stored rows of their tickers (so returns, gaps, stale runs and robust sigmas see
+    recent history) and only the bars can be quarantined. A bar replacing a stored
+    (ticker, date) is checked in place of it, not as a duplicate.
+    Returns (bars kept, report over the checked rows, history first).
+    """
+    if bars.empty:
+        return bars, validate_prices(bars, **kwargs)
+    h = history[history["ticker"].isin(bars["ticker"].unique())]
+    h = h.assign(date=pd.to_datetime(h["date"]))
+    keys = pd.MultiIndex.from_frame(bars[["ticker", "date"]].assign(date=lambda d: pd.to_datetime(d["date"])))
+    h = h[~pd.MultiIndex.from_frame(h[["ticker", "date"]]).isin(keys)]
+    h = h.sort_values(["ticker", "date"], kind="stable").groupby("ticker", sort=False).tail(tail)
+    ctx = pd.concat([h, bars.assign(date=pd.to_datetime(bars["date"]))], ignore_index=True)
+    rep = validate_prices(ctx, **kwargs)
+    q = rep.quarantine[len(h):]
+    return (bars[~q] if q.any() else bars), rep
+
+
+def check_prices(df: pd.DataFrame, cfg: dict | None = None,
+                 report_path: str | None = "outputs/quality/prices_by_ticker.parquet") -> tuple[pd.DataFrame, QualityReport]:
+    """
+    Validate with the thresholds in cfg['data']['quality'] (and the holidays of
+    cfg['project']['calendar']), log the summary, save the
+    per-ticker report (unless report_path is None) and return (rows kept, report).
+    """
+    from pathlib import Path
+    from src.quant_trader.utils.logging import logger
+
+    rep = validate_prices(df, **quality_settings(cfg))
+    (logger.warning if not rep.ok else logger.info)("[quality] %s", rep.summary())
+    if report_path is not None:
+        Path(report_path).parent.mkdir(parents=True, exist_ok=True)
+        rep.by_ticker.to_parquet(report_path, index=False)
+    return rep.clean(df), rep
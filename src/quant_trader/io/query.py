@@ -0,0 +1,168 @@
+# src/quant_trader/io/query.py
+"""
+Optional DuckDB query layer over the project's Parquet files (requires `duckdb`).
+
+Views (registered lazily, nothing is loaded until a query runs):
+  data/processed/<name>.parquet   -> <name>            e.g. prices, features
+  outputs/<dir>/*.parquet         -> <dir with _>       e.g. predictions, backtests,
+                                                         experiments_runs, experiments_returns
+Directory views union files by column name and expose the source file as `filename`.
+
+    q = QueryLayer()
+    q.sql("select ticker, avg(close) from prices where date >= ? group by 1", ["2024-01-01"])
+    q.ticker_stats(start="2023-01-01")
+    q.leaderboard(by="Sharpe", n=20)
+
+Queries run out-of-core in DuckDB (only the referenced columns and matching row
+groups are read) and results come back as Arrow tables. Everything is local/offline.
+"""
+from __future__ import annotations
+import importlib.util
+import re
+from pathlib import Path
+import pyarrow as pa
+
+_HAVE_DUCKDB = importlib.util.find_spec("duckdb") is not None  # imported on first QueryLayer
+
+
+def _ident(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _view_name(parts) -> str:
+    return re.sub(r"\W", "_", "_".join(parts)).lower()
+
+
+def _lit(path: Path) -> str:
+    return "'" + path.as_posix().replace("'", "''") + "'"
+
+
+class QueryLayer:
+    def __init__(self, root: str | Path = ".", data_dir: str = "data/processed", outputs_dir: str = "outputs",
+                 database: str = ":memory:"):
+        if not _HAVE_DUCKDB:
+            raise ImportError("The query layer needs duckdb: pip install duckdb")
+        import duckdb  # type: ignore
+
+        self.root = Path(root)
+        self.con = duckdb.connect(database)
+        self.views: dict[str, str] = {}
+        self._register(self.root / data_dir, self.root / outputs_dir)
+
+    def _register(self, data_dir: Path, outputs_dir: Path) -> None:
+        if data_dir.exists():
+            for f in sorted(data_dir.glob("*.parquet")):
+                self._create(_view_name([f.stem]), f"read_parquet({_lit(f)})")
+        if outputs_dir.exists():
+            dirs = sorted({f.parent for f in outputs_dir.rglob("*.parquet")})
+            for d in dirs:
+                glob = _lit(d / "*.parquet")
+                self._create(_view_name(d.relative_to(outputs_dir).parts),
+                             f"read_parquet({glob}, union_by_name = true, filename = true)")
+
+    def _create(self, name: str, source: str) -> None:
+        self.con.execute(f"create or replace view {_ident(name)} as select * from {source}")
+        self.views[name] = source
+
+    # ---- generic -------------------------------------------------------------
+
+    def sql(self, query: str, params: list | None = None) -> pa.Table:
+        """
+        Run a query (with optional `?` parameters) and return an Arrow table.
+        """
+        res = self.con.execute(query, params or [])
+        return res.to_arrow_table() if hasattr(res, "to_arrow_table") else res.fetch_arrow_table()
+
+    def head(self, view: str, n: int = 10) -> pa.Table:
+        return self.sql(f"select * from {_ident(view)} limit {int(n)}")
+
+    def describe(self, view: str) -> pa.Table:
+        return self.sql(f"describe {_ident(view)}")
+
+    # ---- canned queries ------------------------------------------------------
+
+    def slice(self, view: str = "prices", start: str | None = None, end: str | None = None,
+              tickers: list[str] | None = None, columns: list[str] | None = None) -> pa.Table:
+        """
+        Date-window / ticker slice of a long view, projecting only `columns`.
+        """
+        cols = ", ".join(_ident(c) for c in columns) if columns else "*"
+        where, params = self._filters(start, end, tickers)
+        return self.sql(f"select {cols} from {_ident(view)}{where} order by all", params)
+
+    def ticker_stats(self, start: str | None = None, end: str | None = None,
+                     tickers: list[str] | None = None, view: str = "prices") -> pa.Table:
+        """
+        Per-ticker rows, date range, last close, mean/std of daily log returns
+        (annualized vol) and average dollar volume.
+        """
+        where, params = self._filters(start, end, tickers)
+        return self.sql(f"""
+            with p as (
+                select ticker, date, close, volume,
+                       ln(close / lag(close) over (partition by ticker order by date)) as r
+                from {_ident(view)}{where}
+            )
+            select ticker,
+                   count(*) as n_rows,
+                   min(date) as first_date,
+                   max(date) as last_date,
+                   arg_max(close, date) as last_close,
+                   avg(r) as mean_ret,
+                   stddev_samp(r) * sqrt(252) as ann_vol,
+                   avg(close * volume) as avg_dollar_volume
+            from p group by ticker order by ticker
+        """, params)
+
+    def leaderboard(self, by: str = "Sharpe", n: int = 20, kind: str | None = None) -> pa.Table:
+        """
+        Top-n sweep runs by a metric: from the experiment store when present,
+        otherwise computed in SQL from the per-run backtest files.
+        """
+        if by not in ("CAGR", "Sharpe", "MaxDD", "N"):
+            raise ValueError(f"Unknown metric {by!r}")
+        params: list = []
+        if "experiments_runs" in self.views:
+            where = ""
+            if kind:
+                where, params = " where kind = ?", [kind]
+            return self.sql(f"""
+                select run_id, name, kind, CAGR, Sharpe, MaxDD, N from experiments_runs{where}
+                order by {_ident(by)} desc nulls last limit {int(n)}
+            """, params)
+        if "backtests" not in self.views:
+            raise LookupError("No experiments_runs or backtests view registered")
+        where = ""
+        if kind:
+            where, params = " where starts_with(parse_filename(filename, true), ?)", [f"{kind}_"]
+        return self.sql(f"""
+            with r as (
+                select parse_filename(filename, true) as name, date, ret_port,
+                       sum(ret_port) over w as cum
+                from backtests{where}
+                window w as (partition by filename order by date rows unbounded preceding)
+            ), d as (
+                select name, ret_port, cum, exp(cum - max(cum) over w2) - 1 as dd
+                from r window w2 as (partition by name order by date rows unbounded preceding)
+            )
+            select name,
+                   exp(sum(ret_port) / (count(*) / 252.0)) - 1 as CAGR,
+                   coalesce(avg(ret_port) / nullif(stddev_samp(ret_port), 0) * sqrt(252), 0) as Sharpe,
+                   min(dd) as MaxDD,
+                   count(*) as N
+            from d group by name order by {_ident(by)} desc nulls last limit {int(n)}
+        """, params)
+
+    @staticmethod
+    def _filters(start, end, tickers) -> tuple[str, list]:
+        conds, params = [], []
+        if start is not None:
+            conds.append("date >= cast(? as timestamp)")
+            params.append(str(start))
+        if end is not None:
+            conds.append("date <= cast(? as timestamp)")
+            params.append(str(end))
+        if tickers:
+            conds.append(f"ticker in ({', '.join('?' * len(tickers))})")
+            params.extend(tickers)
+        return (" where " + " and ".join(conds) if conds else ""), params
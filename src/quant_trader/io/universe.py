@@ -0,0 +1,264 @@
+# src/quant_trader/io/universe.py
+"""
+Point-in-time universe membership: which tickers were investable on which dates.
+
+    uni = Universe.load("data/universe/membership.csv")     # or universe_from_config(cfg)
+    mask = uni.compile(dates, tickers)                       # date x ticker bitset
+    keep = mask.rows(df["date"], df["ticker"])               # bool per long row
+    df = df[keep]
+
+Membership is a table of intervals ['ticker','start','end'] (both inclusive; an
+empty end means "still a member"). Files may instead hold events
+['date','ticker','action'] with action add/remove, where a removal takes effect
+on its date (the last investable day is the day before).
+
+`compile` turns the intervals into a packed bitset (np.packbits along tickers,
+one bit per date/ticker) with one difference-array cumsum, so callers filter a
+whole frame or pivot with a single vectorized AND instead of per-row joins.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from pathlib import Path
+import numpy as np
+import pandas as pd
+
+_OPEN = np.iinfo(np.int64).max          # day number of an open-ended interval
+
+
+def _days(values) -> np.ndarray:
+    # dates -> int64 day numbers; NaT -> _OPEN
+    arr = pd.to_datetime(pd.Series(values)).to_numpy(dtype="datetime64[ns]")
+    d = arr.astype("datetime64[D]").astype(np.int64)
+    return np.where(np.isnat(arr), _OPEN, d)
+
+
+@dataclass
+class MembershipMask:
+    """
+    Compiled membership: bit (i, j) is set when tickers[j] is a member on dates[i].
+
+    bits: uint8 (n_dates, ceil(n_tickers / 8)), big-endian bit order within a byte
+    """
+    dates: pd.DatetimeIndex
+    tickers: pd.Index
+    bits: np.ndarray
+
+    def dense(self) -> np.ndarray:
+        """
+        Boolean (n_dates, n_tickers) matrix.
+        """
+        return np.unpackbits(self.bits, axis=1, count=len(self.tickers)).astype(bool)
+
+    def lookup(self, row: np.ndarray, col: np.ndarray) -> np.ndarray:
+        """
+        Membership of (date row, ticker column) code pairs; negative codes are False.
+        """
+        row, col = np.asarray(row, dtype=np.int64), np.asarray(col, dtype=np.int64)
+        ok = (row >= 0) & (col >= 0)
+        r, c = np.where(ok, row, 0), np.where(ok, col, 0)
+        return ok & (((self.bits[r, c >> 3] >> (7 - (c & 7))) & 1) == 1)
+
+    def rows(self, dates, tickers) -> np.ndarray:
+        """
+        Membership of every long row; dates/tickers outside the compiled axes are False.
+        """
+        d = pd.DatetimeIndex(pd.to_datetime(np.asarray(dates)))
+        return self.lookup(self.dates.get_indexer(d), self.tickers.get_indexer(np.asarray(tickers)))
+
+    def align(self, dates, tickers) -> np.ndarray:
+        """
+        Dense mask for other date/ticker axes (e.g. a TopKPivot); unknown labels are False.
+        """
+        r = self.dates.get_indexer(pd.DatetimeIndex(dates))
+        c = self.tickers.get_indexer(pd.Index(tickers))
+        return self.lookup(r[:, None], c[None, :])
+
+
+@dataclass
+class Universe:
+    """
+    Membership intervals, one row per (ticker, start), non-overlapping per ticker.
+
+    intervals: ['ticker','start','end'] sorted by ticker/start (end NaT = open)
+    """
+    intervals: pd.DataFrame
+
+    # ---- construction -----------------------------------------------------------------
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame) -> "Universe":
+        """
+        Intervals ['ticker','start','end'] or events ['date','ticker','action'].
+        """
+        if {"start", "ticker"} <= set(df.columns):
+            iv = df[["ticker", "start"]].assign(end=df["end"] if "end" in df.columns else pd.NaT)
+        elif {"date", "ticker", "action"} <= set(df.columns):
+            iv = _events_to_intervals(df)
+        else:
+            raise ValueError("membership needs ['ticker','start','end'] or ['date','ticker','action'] columns")
+        return cls(_normalize(iv))
+
+    @classmethod
+    def static(cls, tickers, start="1900-01-01") -> "Universe":
+        """
+        Every ticker a member from `start` on (the configured static list).
+        """
+        return cls(_normalize(pd.DataFrame({"ticker": list(tickers), "start": start, "end": pd.NaT})))
+
+    @classmethod
+    def load(cls, path: str) -> "Universe":
+        p = Path(path)
+        df = pd.read_parquet(p) if p.suffix == ".parquet" else pd.read_csv(p)
+        return cls.from_frame(df)
+
+    def save(self, path: str) -> None:
+        p = Path(path)
+        p.parent.mkdir(parents=True, exist_ok=True)
+        if p.suffix == ".parquet":
+            self.intervals.to_parquet(p, index=False)
+        else:
+            self.intervals.to_csv(p, index=False, date_format="%Y-%m-%d")
+
+    def update(self, changes: pd.DataFrame) -> "Universe":
+        """
+        New Universe with `changes` (intervals or events) applied: an interval with
+        the same (ticker, start) as a stored one replaces it (e.g. to close it with
+        an end date), anything else is added and overlapping spans are merged.
+        A `remove` event on date d ends the stored interval covering d at d - 1.
+        """
+        new = Universe.from_frame(changes).intervals
+        old = self.intervals
+        if "action" in changes.columns and "start" not in changes.columns:
+            old = _cut_at_removals(old, changes)
+        if not new.empty:
+            key_old = pd.MultiIndex.from_frame(old[["ticker", "start"]])
+            key_new = pd.MultiIndex.from_frame(new[["ticker", "start"]])
+            old = old[~key_old.isin(key_new)]
+        return Universe(_normalize(pd.concat([old, new], ignore_index=True)))
+
+    # ---- queries ----------------------------------------------------------------------
+
+    @property
+    def tickers(self) -> pd.Index:
+        return pd.Index(self.intervals["ticker"].unique(), name="ticker")
+
+    def members(self, date) -> list[str]:
+        d = _days([date])[0]
+        iv = self.intervals
+        hit = (_days(iv["start"]) <= d) & (d <= _days(iv["end"]))
+        return sorted(iv.loc[hit, "ticker"])
+
+    def compile(self, dates, tickers=None) -> MembershipMask:
+        """
+        Bitset over the sorted unique `dates` and `tickers` (default: every ticker
+        that was ever a member).
+        """
+        d_idx = pd.DatetimeIndex(pd.to_datetime(np.asarray(dates))).unique().sort_values().rename("date")
+        t_idx = (self.tickers if tickers is None else pd.Index(np.asarray(tickers))).unique().sort_values()
+        t_idx = t_idx.rename("ticker")
+        day = d_idx.to_numpy().astype("datetime64[D]").astype(np.int64)
+
+        iv = self.intervals
+        col = t_idx.get_indexer(iv["ticker"])
+        keep = col >= 0
+        r0 = np.searchsorted(day, _days(iv["start"])[keep], side="left")
+        r1 = np.searchsorted(day, _days(iv["end"])[keep], side="right")
+        # +1 at the first member row, -1 after the last: intervals are disjoint per
+        # ticker, so the running sum is exactly 0/1
+        diff = np.zeros((len(day) + 1, len(t_idx)), dtype=np.int8)
+        np.add.at(diff, (r0, col[keep]), 1)
+        np.add.at(diff, (r1, col[keep]), -1)
+        member = np.cumsum(diff[:-1], axis=0, dtype=np.int8) > 0
+        return MembershipMask(dates=d_idx, tickers=t_idx, bits=np.packbits(member, axis=1))
+
+    def filter(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Rows of a long ['ticker','date', ...] frame whose ticker was a member that date.
+        """
+        if df.empty:
+            return df
+        mask = self.compile(df["date"].to_numpy(), df["ticker"].to_numpy())
+        keep = mask.rows(df["date"].to_numpy(), df["ticker"].to_numpy())
+        return df if keep.all() else df[keep]
+
+
+def _events_to_intervals(df: pd.DataFrame) -> pd.DataFrame:
+    ev = df[["ticker", "date", "action"]].assign(
+        date=lambda d: pd.to_datetime(d["date"]),
+        action=lambda d: d["action"].astype(str).str.lower(),
+    )
+    bad = ~ev["action"].isin(["add", "remove"])
+    if bad.any():
+        raise ValueError(f"unknown membership actions {sorted(ev.loc[bad, 'action'].unique())}; expected add/remove")
+    ev = ev.sort_values(["ticker", "date"], kind="stable").reset_index(drop=True)
+    # only state changes count: an add while already a member (or a repeated remove) is a no-op
+    same = ev["ticker"] == ev["ticker"].shift(1)
+    ev = ev[~(same & (ev["action"] == ev["action"].shift(1)))].reset_index(drop=True)
+    nxt_ticker = ev["ticker"].shift(-1)
+    nxt_date = ev["date"].shift(-1)
+    adds = ev["action"] == "add"
+    closes = (nxt_ticker == ev["ticker"]) & (ev["action"].shift(-1) == "remove")
+    end = nxt_date.where(closes) - pd.Timedelta(days=1)
+    return pd.DataFrame({"ticker": ev.loc[adds, "ticker"], "start": ev.loc[adds, "date"],
+                         "end": end[adds]})
+
+
+def _cut_at_removals(iv: pd.DataFrame, events: pd.DataFrame) -> pd.DataFrame:
+    # stored intervals covering a remove date end the day before (dropped if they start on it)
+    rm = events.loc[events["action"].astype(str).str.lower() == "remove", ["ticker", "date"]]
+    if rm.empty or iv.empty:
+        return iv
+    rm = rm.assign(ticker=rm["ticker"].astype(str), date=pd.to_datetime(rm["date"]))
+    m = iv.reset_index(drop=True).reset_index().merge(rm, on="ticker")
+    m = m[(m["start"] <= m["date"]) & (m["end"].isna() | (m["end"] >= m["date"]))]
+    if m.empty:
+        return iv
+    iv = iv.reset_index(drop=True).copy()
+    cut = m.groupby("index")["date"].min() - pd.Timedelta(days=1)
+    iv.loc[cut.index, "end"] = cut.to_numpy()
+    return iv[~(iv["end"] < iv["start"])].reset_index(drop=True)
+
+
+def _normalize(iv: pd.DataFrame) -> pd.DataFrame:
+    """
+    Sort, validate and merge overlapping or adjacent intervals of each ticker.
+    """
+    cols = ["ticker", "start", "end"]
+    if iv.empty:
+        return pd.DataFrame({"ticker": pd.Series(dtype=object), "start": pd.Series(dtype="datetime64[ns]"),
+                             "end": pd.Series(dtype="datetime64[ns]")})
+    iv = iv[cols].assign(ticker=iv["ticker"].astype(str),
+                         start=pd.to_datetime(iv["start"]), end=pd.to_datetime(iv["end"]))
+    if iv["start"].isna().any():
+        raise ValueError("membership intervals need a start date")
+    if (iv["end"] < iv["start"]).any():
+        raise ValueError("membership interval ends before it starts")
+    iv = iv.sort_values(["ticker", "start"], kind="stable").reset_index(drop=True)
+
+    s, e = _days(iv["start"]), _days(iv["end"])
+    codes = pd.factorize(iv["ticker"])[0]
+    # a row starts a new span unless it begins within a day of the furthest end so far
+    reach = pd.Series(e).groupby(codes).cummax().to_numpy()
+    prev_reach = np.r_[np.iinfo(np.int64).min, reach[:-1]]
+    new_ticker = np.r_[True, codes[1:] != codes[:-1]]
+    new_span = new_ticker | (s - 1 > prev_reach)
+    span = np.cumsum(new_span) - 1
+    first = np.flatnonzero(new_span)
+    last_reach = pd.Series(reach).groupby(span).max().to_numpy()
+    end = pd.to_datetime(np.where(last_reach == _OPEN, np.datetime64("NaT"),
+                                  last_reach.astype("datetime64[D]")))
+    return pd.DataFrame({"ticker": iv["ticker"].to_numpy()[first],
+                         "start": iv["start"].to_numpy()[first],
+                         "end": end.astype("datetime64[ns]")})
+
+
+def universe_from_config(cfg: dict | None) -> Universe | None:
+    """
+    data.universe.path (CSV/Parquet membership history) or None when not configured,
+    in which case the static data.tickers list applies unfiltered.
+    """
+    ucfg = ((cfg or {}).get("data", {}) or {}).get("universe") or {}
+    path = ucfg.get("path")
+    if not path or not Path(path).exists():
+        return None
+    return Universe.load(path)
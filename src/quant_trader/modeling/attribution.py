@@ -0,0 +1,233 @@
+# src/quant_trader/modeling/attribution.py
+"""
+Which features matter: permutation importance over walk-forward folds, plus
+tree SHAP values when the `shap` package is installed.
+
+    summary, folds, shap = feature_attribution("data/processed/features.parquet",
+                                               feature_names=[...], n_repeats=5)
+    # -> docs/permutation_importance.csv, docs/permutation_importance_folds.csv,
+    #    docs/shap_importance.csv (only with shap)
+
+Rows are date-sorted and cut into n_folds + 1 date blocks (ensemble.fold_bounds);
+fold k fits one model on blocks < k and scores block k, so every score is out of
+sample. Permutation importance of feature j is the rise in test MSE when column
+j of the scored rows is shuffled (mean / std over folds x repeats).
+
+Each (fold, feature, repeat) is one task in a process pool. The scored rows of
+every fold are gathered once into one float32 array written as a .npy file that
+the workers memory-map (one page-cache copy shared by all processes, as in
+partitioned.py); fold models are pickled once and a task copies `chunk_rows`
+rows at a time, so memory stays flat in the number of features and repeats.
+
+What keeps 100+ features on 10M rows tractable:
+  - `max_eval_rows` caps the scored rows per fold with a seeded sample (the same
+    rows for every feature and repeat)
+  - a tree model never reads a feature it does not split on, so those features
+    get importance 0 without being evaluated
+The cost is at most n_folds * n_features * n_repeats predictions of
+max_eval_rows rows, plus the n_folds model fits.
+"""
+from __future__ import annotations
+import os
+import pickle
+import tempfile
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+
+from src.quant_trader.modeling.baselines import FEATURES
+from src.quant_trader.modeling.datasets import dates_to_ns, finite_rows, read_columns
+from src.quant_trader.modeling.ensemble import fold_bounds, make_estimator
+
+_WORKER_CACHE: dict = {}
+
+
+def eval_rows(lo: int, hi: int, max_eval_rows: int | None, seed: int, fold: int) -> np.ndarray:
+    """
+    Positions scored for a fold block [lo, hi): all of them, or a sorted seeded
+    sample of max_eval_rows.
+    """
+    if max_eval_rows is None or hi - lo <= max_eval_rows:
+        return np.arange(lo, hi)
+    rng = np.random.default_rng([seed, fold])
+    return lo + np.sort(rng.choice(hi - lo, size=max_eval_rows, replace=False))
+
+
+def _mse(model, E: np.ndarray, y: np.ndarray, chunk_rows: int,
+         col: int | None = None, shuffled: np.ndarray | None = None) -> float:
+    """
+    MSE of model on the scored rows E / y, with column `col` replaced by
+    `shuffled` when given; chunk_rows rows are copied at a time.
+    """
+    sse = 0.0
+    for c0 in range(0, len(E), chunk_rows):
+        Xc = np.array(E[c0:c0 + chunk_rows], dtype=np.float32)
+        if col is not None:
+            Xc[:, col] = shuffled[c0:c0 + chunk_rows]
+        err = model.predict(Xc) - y[c0:c0 + chunk_rows]
+        sse += float(err @ err)
+    return sse / max(len(E), 1)
+
+
+def _permuted_mse(E, y, model, fold, col, repeat, seed, chunk_rows) -> float:
+    rng = np.random.default_rng([seed, fold, col, repeat])
+    values = np.asarray(E[:, col], dtype=np.float32)
+    return _mse(model, E, y, chunk_rows, col, values[rng.permutation(values.size)])
+
+
+def _permutation_task(e_path: str, y_path: str, model_path: str, lo: int, hi: int, *args) -> float:
+    # worker process: the scored rows are memory-mapped and fold models unpickled once per process
+    for p in (e_path, y_path):
+        if p not in _WORKER_CACHE:
+            _WORKER_CACHE[p] = np.load(p, mmap_mode="r")
+    if model_path not in _WORKER_CACHE:
+        with open(model_path, "rb") as f:
+            _WORKER_CACHE[model_path] = pickle.load(f)
+    return _permuted_mse(_WORKER_CACHE[e_path][lo:hi], np.asarray(_WORKER_CACHE[y_path][lo:hi]),
+                         _WORKER_CACHE[model_path], *args)
+
+
+def _used_features(model, n_features: int) -> np.ndarray:
+    # tree models never look at a feature they do not split on: its importance is exactly 0
+    imp = getattr(model, "feature_importances_", None)
+    return np.ones(n_features, dtype=bool) if imp is None else np.asarray(imp) > 0
+
+
+def shap_importance(models: list, blocks: list[np.ndarray], names: list[str],
+                    shap_rows: int = 2000, seed: int = 42) -> pd.DataFrame | None:
+    """
+    Mean |SHAP| per feature from shap.TreeExplainer on up to shap_rows scored rows
+    per fold, averaged over folds. None if shap is not installed or the model is
+    not a tree model.
+    """
+    try:
+        import shap
+    except ImportError:
+        return None
+    rng = np.random.default_rng(seed)
+    vals = []
+    for model, E in zip(models, blocks):
+        take = np.sort(rng.choice(len(E), size=min(shap_rows, len(E)), replace=False))
+        try:
+            sv = shap.TreeExplainer(model).shap_values(E[take])
+        except Exception:
+            return None
+        vals.append(np.abs(np.asarray(sv)).mean(axis=0))
+    m = np.vstack(vals)
+    return pd.DataFrame({"feature": names, "mean_abs_shap": m.mean(axis=0), "std_abs_shap": m.std(axis=0)}) \
+        .sort_values("mean_abs_shap", ascending=False).reset_index(drop=True)
+
+
+def feature_attribution(features_path: str | pa.Table | pd.DataFrame = "data/processed/features.parquet",
+                        out_dir: str | None = "docs",
+                        feature_names: list[str] | None = None,
+                        target_col: str = "target",
+                        model: str = "random_forest",
+                        params: dict | None = None,
+                        n_folds: int = 4,
+                        n_repeats: int = 5,
+                        max_eval_rows: int | None = 200_000,
+                        chunk_rows: int = 65_536,
+                        max_workers: int | None = None,
+                        shap_rows: int = 2000,
+                        random_state: int = 42) -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame | None]:
+    """
+    Permutation importance (and SHAP where available) of `feature_names` for a
+    registered model (ensemble.MODELS) over walk-forward folds; see the module
+    docstring. Writes permutation_importance.csv, permutation_importance_folds.csv
+    and shap_importance.csv to out_dir (skipped when None).
+
+    max_workers: processes (default: CPU count); 1 runs in this process.
+    Returns (summary per feature, per fold/feature/repeat scores, SHAP summary or None).
+    """
+    from src.quant_trader.utils.logging import logger
+
+    names = list(feature_names or FEATURES)
+    table = read_columns(features_path, ["date", *names, target_col])
+    rows = finite_rows(table, [*names, target_col])
+    if rows.size == 0:
+        raise ValueError("No rows to attribute.")
+    dates = dates_to_ns(table.column("date"))[rows]
+    order = np.argsort(dates, kind="stable")
+    idx = rows[order]
+    d_sorted = dates[order]
+
+    X = np.empty((idx.size, len(names)), dtype=np.float32)
+    for j, c in enumerate(names):
+        X[:, j] = table.column(c).to_numpy(zero_copy_only=False)[idx]
+    y = table.column(target_col).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)[idx]
+    del table
+
+    b = fold_bounds(d_sorted, n_folds)
+    models, blocks, targets, base = [], [], [], []
+    for k in range(1, len(b) - 1):
+        est = make_estimator(model, params, random_state)
+        if est is None:
+            raise RuntimeError(f"Model {model!r} needs a package that is not installed.")
+        models.append(est.fit(X[:b[k]], y[:b[k]]))
+        pos = eval_rows(int(b[k]), int(b[k + 1]), max_eval_rows, random_state, k)
+        blocks.append(X[pos])                               # scored rows, gathered once per fold
+        targets.append(y[pos])
+        base.append(_mse(models[-1], blocks[-1], targets[-1], chunk_rows))
+    if not models:
+        raise ValueError("Not enough dates for a walk-forward fold; lower n_folds.")
+    del X, y
+
+    tasks = [(f, j, r) for f in range(len(models)) for j in range(len(names)) for r in range(n_repeats)]
+    used = [_used_features(m, len(names)) for m in models]
+    scores: dict[tuple, float] = {t: base[t[0]] for t in tasks if not used[t[0]][t[1]]}
+    todo = [t for t in tasks if t not in scores]
+    workers = max(1, min(int(max_workers or os.cpu_count() or 1), len(todo) or 1))
+    if workers == 1:
+        for f, j, r in todo:
+            scores[f, j, r] = _permuted_mse(blocks[f], targets[f], models[f], f, j, r, random_state, chunk_rows)
+    else:
+        offsets = np.r_[0, np.cumsum([len(E) for E in blocks])]
+        with tempfile.TemporaryDirectory(prefix="attribution-") as tmp, \
+                ProcessPoolExecutor(max_workers=workers) as pool:
+            e_path, y_path = os.path.join(tmp, "E.npy"), os.path.join(tmp, "y.npy")
+            np.save(e_path, np.concatenate(blocks))
+            np.save(y_path, np.concatenate(targets))
+            model_paths = []
+            for f, m in enumerate(models):
+                model_paths.append(os.path.join(tmp, f"model_{f}.pkl"))
+                if "n_jobs" in m.get_params():
+                    m.set_params(n_jobs=1)                # the pool is the parallelism
+                with open(model_paths[-1], "wb") as fh:
+                    pickle.dump(m, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            pending, queue = {}, list(todo)
+            while queue or pending:
+                while queue and len(pending) < 2 * workers:
+                    f, j, r = t = queue.pop(0)
+                    fut = pool.submit(_permutation_task, e_path, y_path, model_paths[f],
+                                      int(offsets[f]), int(offsets[f + 1]), f, j, r, random_state, chunk_rows)
+                    pending[fut] = t
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    scores[pending.pop(fut)] = fut.result()
+
+    folds = pd.DataFrame([
+        {"fold": f + 1, "feature": names[j], "repeat": r, "n_eval": len(blocks[f]),
+         "mse_base": base[f], "mse_permuted": scores[f, j, r], "importance": scores[f, j, r] - base[f]}
+        for f, j, r in tasks
+    ])
+    summary = (folds.groupby("feature", sort=False)["importance"]
+               .agg(importance_mean="mean", importance_std="std", n_evals="count").reset_index())
+    summary["importance_rel"] = summary["importance_mean"] / float(np.mean(base))
+    summary = summary.sort_values("importance_mean", ascending=False).reset_index(drop=True)
+    summary.insert(1, "rank", np.arange(1, len(summary) + 1))
+
+    shap_df = shap_importance(models, blocks, names, shap_rows, random_state)
+    if shap_df is None:
+        logger.info("[attribution] SHAP skipped: shap is not installed or cannot explain %s", model)
+
+    if out_dir is not None:
+        Path(out_dir).mkdir(parents=True, exist_ok=True)
+        summary.to_csv(Path(out_dir) / "permutation_importance.csv", index=False)
+        folds.to_csv(Path(out_dir) / "permutation_importance_folds.csv", index=False)
+        if shap_df is not None:
+            shap_df.to_csv(Path(out_dir) / "shap_importance.csv", index=False)
+    return summary, folds, shap_df
@@ -1,54 +1,106 @@
 # src/quant_trader/modeling/baselines.py
 from __future__ import annotations
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
 from pathlib import Path
 from sklearn.tree import DecisionTreeRegressor
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 
-def run_baseline(features_path: str = "data/processed/features.parquet",
-                 out_path: str = "outputs/predictions/baseline.parquet",
+from src.quant_trader.modeling.datasets import read_columns, dates_to_ns, finite_rows, time_split
+from src.quant_trader.features.lazy import load_features, DEFAULT_CACHE_DIR
+
+FEATURES = ["ret_1d", "rsi_14"]
+
+
+def run_baseline(features_path: str | pa.Table | pd.DataFrame = "data/processed/features.parquet",
+                 out_path: str | None = "outputs/predictions/baseline.parquet",
                  max_depth: int = 3,
                  test_quantile: float = 0.8,
-                 random_state: int = 42) -> dict:
+                 random_state: int = 42,
+                 min_samples_leaf: int = 1,
+                 feature_names: list[str] | None = None,
+                 prices_path: str | None = None,
+                 cache_dir: str | None = DEFAULT_CACHE_DIR,
+                 target_col: str = "target",
+                 return_predictions: bool = False,
+                 universe=None,
+                 targets: dict | None = None) -> dict | tuple[dict, pa.Table]:
     """
-    Train a tiny DecisionTreeRegressor on ['ret_1d','rsi_14'] to predict 'target'.
+    Train a tiny DecisionTreeRegressor on `feature_names` (default ['ret_1d','rsi_14'])
+    to predict `target_col` (default 'target'; e.g. 'fwd_ret_5d' for a 5-day horizon).
     Splits by date using the given quantile (default: 80% train / 20% test).
-    Saves test-set predictions to out_path.
+    Saves test-set predictions to out_path (skipped when None).
+
+    Only the needed columns are read; rows are date-sorted once so train/test are
+    contiguous slices, and the model is fit on a float32 feature array.
 
-    Returns a dict of simple metrics.
+    If `prices_path` is given, the columns are requested by name from the lazy
+    feature store (features/lazy.py, memoized under `cache_dir`) instead of
+    being read from `features_path`; its "target" follows `targets`
+    (configs/models.yaml::targets), as build_feature_matrix's does. `features_path` may also be an in-memory
+    Arrow table / DataFrame (e.g. handed over by io.exchange.StageExchange).
+
+    `universe` (io.universe.Universe) restricts train and test rows to the names
+    that were members on each date.
+
+    Returns a dict of simple metrics, or (metrics, predictions table) with
+    return_predictions=True.
     """
-    df = pd.read_parquet(features_path).dropna(subset=["ret_1d", "rsi_14", "target"])
-    df["date"] = pd.to_datetime(df["date"])
+    names = list(feature_names or FEATURES)
+    if prices_path is not None:
+        table = pa.Table.from_pandas(load_features(prices_path, [*names, target_col], cache_dir, targets), preserve_index=False)
+    else:
+        table = read_columns(features_path, ["ticker", "date", *names, target_col])
+    rows = finite_rows(table, [*names, target_col])
+    if universe is not None:
+        d_all = dates_to_ns(table.column("date"))[rows]
+        t_all = table.column("ticker").to_numpy(zero_copy_only=False)[rows]
+        rows = rows[universe.compile(d_all, t_all).rows(d_all, t_all)]
 
-    # time-based split
-    cutoff = df["date"].quantile(test_quantile)
-    train = df[df["date"] <= cutoff]
-    test  = df[df["date"] >  cutoff]
+    dates = dates_to_ns(table.column("date"))[rows]
+    order, n_train, cutoff = time_split(dates, test_quantile)
+    idx = rows[order]
 
-    X_train, y_train = train[["ret_1d", "rsi_14"]], train["target"]
-    X_test,  y_test  = test[["ret_1d", "rsi_14"]], test["target"]
+    X = np.empty((idx.size, len(names)), dtype=np.float32)
+    for j, c in enumerate(names):
+        X[:, j] = table.column(c).to_numpy(zero_copy_only=False)[idx]
+    y = table.column(target_col).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)[idx]
 
-    model = DecisionTreeRegressor(max_depth=max_depth, random_state=random_state)
+    X_train, y_train = X[:n_train], y[:n_train]
+    X_test,  y_test  = X[n_train:], y[n_train:]
+
+    model = DecisionTreeRegressor(max_depth=max_depth,
+                                  min_samples_leaf=min_samples_leaf,
+                                  random_state=random_state)
     model.fit(X_train, y_train)
 
     preds = model.predict(X_test)
 
     metrics = {
-        "n_train": int(len(train)),
-        "n_test": int(len(test)),
+        "n_train": int(n_train),
+        "n_test": int(len(y_test)),
         "mse": float(mean_squared_error(y_test, preds)),
         "mae": float(mean_absolute_error(y_test, preds)),
         "r2": float(r2_score(y_test, preds)),
-        "cutoff": cutoff.isoformat(),
+        "cutoff": pd.Timestamp(cutoff).isoformat(),
         "max_depth": max_depth,
+        "min_samples_leaf": min_samples_leaf,
+        "features": names,
+        "target": target_col,
     }
 
-    # Save predictions for inspection/backtests later
-    out = test[["ticker", "date"]].copy()
-    out["y_true"] = y_test.values
-    out["y_pred"] = preds
-    Path(out_path).parent.mkdir(parents=True, exist_ok=True)
-    out.to_parquet(out_path, index=False)
-
-    return metrics
+    # Save predictions for inspection/backtests later (Arrow, no pandas round-trip)
+    test_idx = pa.array(idx[n_train:])
+    out = pa.table({
+        "ticker": table.column("ticker").take(test_idx),
+        "date": pa.array(dates[order][n_train:], type=pa.timestamp("ns")),
+        "y_true": pa.array(y_test),
+        "y_pred": pa.array(preds),
+    })
+    if out_path is not None:
+        Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(out, out_path)
 
+    return (metrics, out) if return_predictions else metrics
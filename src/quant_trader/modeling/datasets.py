@@ -1,3 +1,83 @@
+# src/quant_trader/modeling/datasets.py
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.parquet as pq
+
+
 def make_splits(X, y, meta, cfg):
     # Stub for time-based splits and leakage guards
     return {"train": (X, y), "valid": (X, y), "test": (X, y)}
+
+
+def read_columns(source: str | pa.Table | pd.DataFrame, columns: list[str]) -> pa.Table:
+    """
+    Only `columns` of a Parquet file (projection pushdown) or of an in-memory
+    table (a zero-copy select) / DataFrame, as an Arrow table.
+    """
+    if isinstance(source, pa.Table):
+        return source.select(list(columns))
+    if isinstance(source, pd.DataFrame):
+        return pa.Table.from_pandas(source[list(columns)], preserve_index=False)
+    return pq.read_table(source, columns=list(columns))
+
+
+def dates_to_ns(col: pa.ChunkedArray | pa.Array) -> np.ndarray:
+    """
+    Arrow date/timestamp/string column -> datetime64[ns] NumPy array.
+    """
+    if pa.types.is_timestamp(col.type) or pa.types.is_date(col.type):
+        if pa.types.is_timestamp(col.type) and col.type.tz is not None:
+            col = pc.cast(col, pa.timestamp(col.type.unit))
+        return np.asarray(pc.cast(col, pa.timestamp("ns")).to_numpy(zero_copy_only=False), dtype="datetime64[ns]")
+    # strings / objects: parse once
+    return pd.to_datetime(col.to_pandas()).to_numpy(dtype="datetime64[ns]")
+
+
+def finite_rows(table: pa.Table, columns: list[str]) -> np.ndarray:
+    """
+    Integer positions of rows where every column in `columns` is non-null and finite.
+    """
+    ok = np.ones(table.num_rows, dtype=bool)
+    for c in columns:
+        a = table.column(c).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)
+        ok &= np.isfinite(a)
+    return np.flatnonzero(ok)
+
+
+def date_quantile(sorted_dates: np.ndarray, q: float) -> np.datetime64:
+    """
+    Row-weighted date quantile (linear interpolation, like `Series.quantile`)
+    computed on the unique sorted dates and their row counts instead of every row.
+    """
+    n = sorted_dates.size
+    # run-length encode the (already sorted) dates: unique values + end offsets
+    starts = np.flatnonzero(np.r_[True, sorted_dates[1:] != sorted_dates[:-1]])
+    uniq = sorted_dates[starts]
+    ends = np.r_[starts[1:], n]  # row index (exclusive) where each unique date ends
+    pos = q * (n - 1)
+    lo, hi = int(np.floor(pos)), int(np.ceil(pos))
+    d_lo = uniq[np.searchsorted(ends, lo, side="right")].astype("int64")
+    d_hi = uniq[np.searchsorted(ends, hi, side="right")].astype("int64")
+    cut = d_lo + (d_hi - d_lo) * (pos - lo)
+    return np.datetime64(int(round(cut)), "ns")
+
+
+def time_split(dates: np.ndarray, test_quantile: float = 0.8):
+    """
+    Date-sorted time split.
+
+    Returns (order, n_train, cutoff) where `order` sorts rows by date (stable, so the
+    within-date ticker order is preserved). Rows order[:n_train] have date <= cutoff
+    and order[n_train:] have date > cutoff, so train/test are contiguous slices of
+    any array taken with `order`.
+    """
+    order = np.argsort(dates, kind="stable")
+    sorted_dates = dates[order]
+    if sorted_dates.size == 0:
+        raise ValueError("No rows to split.")
+    cutoff = date_quantile(sorted_dates, test_quantile)
+    n_train = int(np.searchsorted(sorted_dates, cutoff, side="right"))
+    return order, n_train, cutoff
@@ -0,0 +1,250 @@
+# src/quant_trader/modeling/ensemble.py
+"""
+Blends of several model families over run_baseline's test window.
+
+    metrics, preds = run_ensemble("data/processed/features.parquet",
+                                  models={"decision_tree": {"max_depth": 3}, "random_forest": {}})
+    # -> outputs/predictions/ensemble_{equal,rank,stacked}.parquet + ensemble_metrics.csv
+
+The features are read once into one float32 array (date-sorted, train rows
+first) that every registered model is fit on and scores in the same pass. Per
+base model two prediction vectors are produced and cached under `cache_dir`,
+keyed by the model, its params and a fingerprint of the data/split:
+
+  oof   out-of-fold predictions on the train rows: the train window is cut into
+        n_folds + 1 date blocks and block k is predicted by a model fit on
+        blocks < k (forward chaining, no look-ahead; the first block has none)
+  test  predictions of a model fit on the whole train window
+
+Blends are computed from the cache only, so adding or changing a blend never
+refits a base model:
+
+  equal    mean of the base test predictions
+  rank     mean per-date cross-sectional percentile rank, centred at 0 (a score:
+           Top-K works, y_pred thresholds in return units do not)
+  stacked  non-negative linear regression of y on the oof predictions, applied to
+           the test predictions
+"""
+from __future__ import annotations
+import hashlib
+import importlib
+import json
+import warnings
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from src.quant_trader.modeling.baselines import FEATURES
+from src.quant_trader.modeling.datasets import dates_to_ns, finite_rows, read_columns, time_split
+
+DEFAULT_CACHE_DIR = "outputs/models/ensemble"
+BLENDS = ("equal", "rank", "stacked")
+
+# name -> (module, class, default params); optional packages are imported on use
+MODELS = {
+    "decision_tree": ("sklearn.tree", "DecisionTreeRegressor", {"max_depth": 3}),
+    "random_forest": ("sklearn.ensemble", "RandomForestRegressor",
+                      {"n_estimators": 200, "max_depth": 8, "min_samples_leaf": 50, "n_jobs": -1}),
+    "extra_trees": ("sklearn.ensemble", "ExtraTreesRegressor",
+                    {"n_estimators": 200, "max_depth": 8, "min_samples_leaf": 50, "n_jobs": -1}),
+    "ridge": ("sklearn.linear_model", "Ridge", {"alpha": 1.0}),
+    "xgboost": ("xgboost", "XGBRegressor",
+                {"n_estimators": 300, "max_depth": 3, "learning_rate": 0.05, "subsample": 0.9,
+                 "colsample_bytree": 0.9, "n_jobs": -1}),
+}
+
+
+def register_model(name: str, module: str, cls: str, defaults: dict | None = None) -> None:
+    """
+    Add a model family (any estimator with fit / predict) to the registry.
+    """
+    MODELS[name] = (module, cls, dict(defaults or {}))
+
+
+def make_estimator(name: str, params: dict | None = None, random_state: int = 42):
+    """
+    Estimator for a registered model, or None if its package is not installed.
+    """
+    if name not in MODELS:
+        raise ValueError(f"Unknown model {name!r}; registered: {sorted(MODELS)}")
+    module, cls, defaults = MODELS[name]
+    try:
+        est_cls = getattr(importlib.import_module(module), cls)
+    except ImportError:
+        return None
+    p = {**defaults, **(params or {})}
+    if "random_state" in est_cls().get_params():
+        p.setdefault("random_state", random_state)
+    return est_cls(**p)
+
+
+def fold_bounds(sorted_dates: np.ndarray, n_folds: int) -> np.ndarray:
+    """
+    n_folds + 2 row offsets cutting date-sorted rows into n_folds + 1 blocks of
+    about equal size, never splitting a date across blocks.
+    """
+    n = sorted_dates.size
+    pos = np.linspace(0, n, n_folds + 2).astype(np.int64)
+    inner = np.searchsorted(sorted_dates, sorted_dates[np.minimum(pos[1:-1], n - 1)], side="left")
+    return np.unique(np.r_[0, inner, n])
+
+
+def _fingerprint(dates: np.ndarray, y: np.ndarray, X: np.ndarray, n_train: int) -> str:
+    h = hashlib.blake2b(digest_size=12)
+    for a in (dates, y, X[:: max(1, len(X) // 4096)]):
+        h.update(np.ascontiguousarray(a).tobytes())
+    h.update(str((X.shape, n_train)).encode())
+    return h.hexdigest()
+
+
+def base_predictions(name: str, params: dict | None, X: np.ndarray, y: np.ndarray, dates: np.ndarray,
+                     n_train: int, n_folds: int = 4, random_state: int = 42,
+                     cache_dir: str | None = DEFAULT_CACHE_DIR, data_key: str | None = None) -> dict | None:
+    """
+    {'oof': (n_train,), 'test': (n - n_train,)} for one base model, read from the
+    cache when present. None if the model's package is missing.
+    """
+    if make_estimator(name, params, random_state) is None:
+        return None
+    path = None
+    if cache_dir is not None:
+        data_key = data_key or _fingerprint(dates, y, X, n_train)
+        spec = json.dumps({"model": name, "params": params or {}, "n_folds": n_folds,
+                           "random_state": random_state, "data": data_key}, sort_keys=True, default=str)
+        path = Path(cache_dir) / f"{name}-{hashlib.blake2b(spec.encode(), digest_size=10).hexdigest()}.npz"
+        if path.exists():
+            with np.load(path) as z:
+                return {"oof": z["oof"], "test": z["test"]}
+
+    X_train, y_train = X[:n_train], y[:n_train]
+    oof = np.full(n_train, np.nan)
+    b = fold_bounds(dates[:n_train], n_folds)
+    for k in range(1, len(b) - 1):
+        est = make_estimator(name, params, random_state).fit(X_train[:b[k]], y_train[:b[k]])
+        oof[b[k]:b[k + 1]] = est.predict(X_train[b[k]:b[k + 1]])
+    est = make_estimator(name, params, random_state).fit(X_train, y_train)
+    out = {"oof": oof, "test": est.predict(X[n_train:]).astype(np.float64)}
+    if path is not None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp.npz")
+        np.savez(tmp, **out)
+        tmp.replace(path)
+    return out
+
+
+def _rank_by_date(P: np.ndarray, dates: np.ndarray) -> np.ndarray:
+    # percentile rank of each column within its date, averaged over columns, centred
+    R = pd.DataFrame(P).groupby(dates).rank(pct=True).to_numpy()
+    return R.mean(axis=1) - 0.5
+
+
+def blend(kind: str, base: dict[str, dict], y_train: np.ndarray, test_dates: np.ndarray) -> tuple[np.ndarray, dict]:
+    """
+    Test-window predictions of one blend from cached base predictions, plus its
+    details (stacking weights).
+    """
+    names = list(base)
+    T = np.column_stack([base[n]["test"] for n in names])
+    if kind == "equal":
+        return T.mean(axis=1), {}
+    if kind == "rank":
+        return _rank_by_date(T, test_dates), {}
+    if kind == "stacked":
+        from sklearn.linear_model import LinearRegression
+        O = np.column_stack([base[n]["oof"] for n in names])
+        ok = ~np.isnan(O).any(axis=1)
+        if ok.sum() < len(names) + 1:
+            raise ValueError("Not enough out-of-fold rows to fit the stacker; lower n_folds or add history.")
+        meta = LinearRegression(positive=True).fit(O[ok], y_train[ok])
+        return meta.predict(T), {"weights": dict(zip(names, map(float, meta.coef_))),
+                                 "intercept": float(meta.intercept_)}
+    raise ValueError(f"Unknown blend {kind!r}; expected one of {BLENDS}")
+
+
+def run_ensemble(features_path: str | pa.Table | pd.DataFrame = "data/processed/features.parquet",
+                 out_dir: str | None = "outputs/predictions",
+                 models: dict[str, dict] | None = None,
+                 blends: tuple[str, ...] | list[str] = BLENDS,
+                 feature_names: list[str] | None = None,
+                 target_col: str = "target",
+                 test_quantile: float = 0.8,
+                 n_folds: int = 4,
+                 random_state: int = 42,
+                 cache_dir: str | None = DEFAULT_CACHE_DIR,
+                 universe=None) -> tuple[pd.DataFrame, dict[str, pa.Table]]:
+    """
+    Fit / load every base model in `models` ({name: params}, default decision_tree
+    and random_forest), build the blends and write ensemble_<blend>.parquet
+    (['ticker','date','y_true','y_pred'], like run_baseline) and
+    ensemble_metrics.csv to out_dir (skipped when None). Split, features and
+    `universe` filtering are the same as run_baseline's.
+
+    Returns (metrics per base model and blend, {blend: predictions table}).
+    """
+    from src.quant_trader.utils.logging import logger
+
+    models = dict(models or {"decision_tree": {}, "random_forest": {}})
+    names = list(feature_names or FEATURES)
+    table = read_columns(features_path, ["ticker", "date", *names, target_col])
+    rows = finite_rows(table, [*names, target_col])
+    if universe is not None:
+        d_all = dates_to_ns(table.column("date"))[rows]
+        t_all = table.column("ticker").to_numpy(zero_copy_only=False)[rows]
+        rows = rows[universe.compile(d_all, t_all).rows(d_all, t_all)]
+    dates = dates_to_ns(table.column("date"))[rows]
+    order, n_train, cutoff = time_split(dates, test_quantile)
+    idx = rows[order]
+    d_sorted = dates[order]
+
+    X = np.empty((idx.size, len(names)), dtype=np.float32)
+    for j, c in enumerate(names):
+        X[:, j] = table.column(c).to_numpy(zero_copy_only=False)[idx]
+    y = table.column(target_col).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)[idx]
+    y_test, test_dates = y[n_train:], d_sorted[n_train:]
+    data_key = _fingerprint(d_sorted, y, X, n_train) + hashlib.blake2b(
+        json.dumps([names, target_col]).encode(), digest_size=6).hexdigest()
+
+    base = {}
+    for name, params in models.items():
+        pred = base_predictions(name, params, X, y, d_sorted, n_train, n_folds, random_state, cache_dir, data_key)
+        if pred is None:
+            logger.warning("[ensemble] %s skipped: %s is not installed", name, MODELS[name][0])
+            continue
+        base[name] = pred
+    if not base:
+        raise RuntimeError("No base model could be fit.")
+
+    def scores(name, kind, p, extra=None):
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")              # constant predictions: ic is NaN
+            ic = float(pd.Series(p).corr(pd.Series(y_test), method="spearman"))
+        return {"name": name, "kind": kind, "mse": float(mean_squared_error(y_test, p)),
+                "mae": float(mean_absolute_error(y_test, p)), "r2": float(r2_score(y_test, p)),
+                "ic": ic,
+                "cutoff": pd.Timestamp(cutoff).isoformat(), "n_train": int(n_train), "n_test": int(len(y_test)),
+                "detail": json.dumps(extra or {}, sort_keys=True)}
+
+    rows_out = [scores(n, "base", b["test"]) for n, b in base.items()]
+    tickers = table.column("ticker").take(pa.array(idx[n_train:]))
+    out = {}
+    for kind in blends:
+        p, extra = blend(kind, base, y[:n_train], test_dates)
+        rows_out.append(scores(kind, "blend", p, extra))
+        out[kind] = pa.table({
+            "ticker": tickers,
+            "date": pa.array(test_dates, type=pa.timestamp("ns")),
+            "y_true": pa.array(y_test),
+            "y_pred": pa.array(np.asarray(p, dtype=np.float64)),
+        })
+    metrics = pd.DataFrame(rows_out)
+
+    if out_dir is not None:
+        Path(out_dir).mkdir(parents=True, exist_ok=True)
+        for kind, t in out.items():
+            pq.write_table(t, Path(out_dir) / f"ensemble_{kind}.parquet")
+        metrics.to_csv(Path(out_dir) / "ensemble_metrics.csv", index=False)
+    return metrics, out
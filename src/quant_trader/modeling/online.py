@@ -0,0 +1,216 @@
+# src/quant_trader/modeling/online.py
+"""
+Online (incremental) alternative to retraining the baseline from scratch every day.
+
+    m = update_online("data/processed/features.parquet", "outputs/predictions/online.parquet")
+
+State lives in `state_dir` (model.pkl + state.json) and each call does one of:
+
+- full refit (no state yet, `full_refit=True`, or `full_refit_every` updates since
+  the last one): fit on the train split (date <= test_quantile cutoff), write
+  test-split predictions exactly like run_baseline, then fold the test rows into
+  the model so it has seen all history.
+- update: read only rows dated after the last one seen (Parquet filter), predict
+  them with the current model *before* learning from them (so every appended
+  prediction is out-of-sample), append those predictions, then learn from them.
+  Cost is proportional to the new rows.
+
+Methods:
+  sgd       StandardScaler (frozen at the full refit) + SGDRegressor.partial_fit
+  gbr_warm  GradientBoostingRegressor(warm_start=True); each update adds
+            `trees_per_update` trees fit to the residuals of the new rows only
+
+At each full refit the appended online predictions of the last `drift_window_days`
+dates are compared with the refit model's predictions for the same rows
+(correlation, mean |diff|, MSE of each against y_true); the report is returned
+and appended to state_dir/drift.jsonl. The predictions file belongs to this model
+alone (not baseline.parquet, which run_baseline / run_pipeline rewrite), so the
+drift report never compares against another model's rows.
+"""
+from __future__ import annotations
+import json
+import pickle
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from src.quant_trader.modeling.baselines import FEATURES
+from src.quant_trader.modeling.datasets import dates_to_ns, finite_rows, time_split
+
+DEFAULT_STATE_DIR = "outputs/models/online"
+METHODS = ("sgd", "gbr_warm")
+
+
+class OnlineRegressor:
+    """
+    Thin wrapper giving both methods the same fit / update / predict interface.
+    """
+
+    def __init__(self, method: str = "sgd", random_state: int = 42, **params):
+        if method not in METHODS:
+            raise ValueError(f"Unknown online method {method!r}; expected one of {METHODS}")
+        self.method = method
+        self.random_state = random_state
+        self.params = params
+        self.model = None
+        self.scaler = None
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> "OnlineRegressor":
+        if self.method == "sgd":
+            from sklearn.linear_model import SGDRegressor
+            from sklearn.preprocessing import StandardScaler
+            self.scaler = StandardScaler().fit(X)
+            p = {"alpha": 1e-4, "eta0": 0.01, "learning_rate": "invscaling", "max_iter": 20, "tol": None, **self.params}
+            self.model = SGDRegressor(random_state=self.random_state, **p)
+            self.model.fit(self.scaler.transform(X), y)
+        else:
+            from sklearn.ensemble import GradientBoostingRegressor
+            p = {"n_estimators": 100, "max_depth": 3, "learning_rate": 0.05, "subsample": 1.0, **self.params}
+            p.pop("trees_per_update", None)
+            self.model = GradientBoostingRegressor(warm_start=True, random_state=self.random_state, **p)
+            self.model.fit(X, y)
+        return self
+
+    def update(self, X: np.ndarray, y: np.ndarray) -> None:
+        if len(y) == 0:
+            return
+        if self.method == "sgd":
+            self.model.partial_fit(self.scaler.transform(X), y)
+        else:
+            self.model.n_estimators += int(self.params.get("trees_per_update", 5))
+            self.model.fit(X, y)
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        if self.method == "sgd":
+            return self.model.predict(self.scaler.transform(X))
+        return self.model.predict(X)
+
+
+def _load_matrix(features_path: str, names: list[str], target_col: str, after: np.datetime64 | None = None):
+    """
+    Date-sorted (X float32, y, dates, tickers) of finite rows, optionally only date > `after`.
+    """
+    filters = [("date", ">", pd.Timestamp(after).to_pydatetime())] if after is not None else None
+    table = pq.read_table(features_path, columns=["ticker", "date", *names, target_col], filters=filters)
+    rows = finite_rows(table, [*names, target_col])
+    dates = dates_to_ns(table.column("date"))[rows]
+    order = np.argsort(dates, kind="stable")
+    idx = rows[order]
+    X = np.empty((idx.size, len(names)), dtype=np.float32)
+    for j, c in enumerate(names):
+        X[:, j] = table.column(c).to_numpy(zero_copy_only=False)[idx]
+    y = table.column(target_col).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)[idx]
+    return X, y, dates[order], table.column("ticker").take(pa.array(idx))
+
+
+def _pred_table(tickers, dates, y_true, y_pred) -> pa.Table:
+    return pa.table({
+        "ticker": tickers,
+        "date": pa.array(dates, type=pa.timestamp("ns")),
+        "y_true": pa.array(y_true),
+        "y_pred": pa.array(y_pred),
+    })
+
+
+def drift_report(online: pd.DataFrame, full: pd.DataFrame, window_days: int = 60) -> dict:
+    """
+    Compare online vs full-refit predictions (ticker, date, y_true, y_pred frames)
+    on their common rows within the last `window_days` dates of `online`.
+    """
+    if online.empty or full.empty:
+        return {"n": 0}
+    last = np.sort(online["date"].unique())[-window_days:]
+    j = online[online["date"].isin(last)].merge(full, on=["ticker", "date"], suffixes=("_online", "_full"))
+    if j.empty:
+        return {"n": 0}
+    a, b, y = j["y_pred_online"].to_numpy(), j["y_pred_full"].to_numpy(), j["y_true_online"].to_numpy()
+    corr = float(np.corrcoef(a, b)[0, 1]) if len(j) > 1 and a.std() > 0 and b.std() > 0 else float("nan")
+    return {
+        "n": int(len(j)),
+        "start": pd.Timestamp(j["date"].min()).isoformat(),
+        "end": pd.Timestamp(j["date"].max()).isoformat(),
+        "corr": corr,
+        "mean_abs_diff": float(np.mean(np.abs(a - b))),
+        "mse_online": float(np.mean((a - y) ** 2)),
+        "mse_full": float(np.mean((b - y) ** 2)),
+    }
+
+
+def update_online(features_path: str = "data/processed/features.parquet",
+                  out_path: str = "outputs/predictions/online.parquet",
+                  state_dir: str = DEFAULT_STATE_DIR,
+                  method: str = "sgd",
+                  params: dict | None = None,
+                  feature_names: list[str] | None = None,
+                  target_col: str = "target",
+                  test_quantile: float = 0.8,
+                  full_refit: bool = False,
+                  full_refit_every: int | None = 20,
+                  drift_window_days: int = 60,
+                  random_state: int = 42) -> dict:
+    """
+    One daily step (update or full refit, see module docstring). Returns metrics.
+    """
+    names = list(feature_names or FEATURES)
+    state_dir = Path(state_dir)
+    state_path, model_path = state_dir / "state.json", state_dir / "model.pkl"
+    state = json.loads(state_path.read_text()) if state_path.exists() and model_path.exists() else None
+    if state is not None and (state["method"], state["features"], state["target"]) != (method, names, target_col):
+        state = None                     # config changed: the persisted model no longer applies
+    due = state is None or full_refit or (
+        full_refit_every is not None and state["updates_since_refit"] >= int(full_refit_every))
+    out_path = Path(out_path)
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    state_dir.mkdir(parents=True, exist_ok=True)
+
+    if due:
+        X, y, dates, tickers = _load_matrix(features_path, names, target_col)
+        _, n_train, cutoff = time_split(dates, test_quantile)   # rows are already date-sorted
+        model = OnlineRegressor(method, random_state, **(params or {})).fit(X[:n_train], y[:n_train])
+        preds = model.predict(X[n_train:])
+        new = _pred_table(tickers[n_train:], dates[n_train:], y[n_train:], preds)
+        drift = {"n": 0}
+        if state is not None and out_path.exists():
+            drift = drift_report(pd.read_parquet(out_path), new.to_pandas(), drift_window_days)
+            drift["ts"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            with (state_dir / "drift.jsonl").open("a", encoding="utf-8") as f:
+                f.write(json.dumps(drift) + "\n")
+        pq.write_table(new, out_path)
+        model.update(X[n_train:], y[n_train:])
+        state = {"method": method, "features": names, "target": target_col,
+                 "last_date": pd.Timestamp(dates[-1]).isoformat(),
+                 "last_full_refit": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                 "updates_since_refit": 0, "n_seen": int(len(y))}
+        metrics = {"mode": "full_refit", "n_train": int(n_train), "n_test": int(len(y) - n_train),
+                   "cutoff": pd.Timestamp(cutoff).isoformat(), "drift": drift}
+        y_eval, p_eval = y[n_train:], preds
+    else:
+        with model_path.open("rb") as f:
+            model = pickle.load(f)
+        X, y, dates, tickers = _load_matrix(features_path, names, target_col,
+                                            after=np.datetime64(state["last_date"]))
+        preds = model.predict(X) if len(y) else np.empty(0)
+        if len(y):
+            old = pq.read_table(out_path) if out_path.exists() else None
+            new = _pred_table(tickers, dates, y, preds)
+            pq.write_table(pa.concat_tables([old.cast(new.schema), new]) if old is not None else new, out_path)
+            model.update(X, y)
+            state["last_date"] = pd.Timestamp(dates[-1]).isoformat()
+            state["n_seen"] += int(len(y))
+        state["updates_since_refit"] += 1
+        metrics = {"mode": "update", "n_new": int(len(y))}
+        y_eval, p_eval = y, preds
+
+    with model_path.open("wb") as f:
+        pickle.dump(model, f)
+    state_path.write_text(json.dumps(state, indent=2))
+    if len(y_eval):
+        metrics["mse"] = float(np.mean((p_eval - y_eval) ** 2))
+        metrics["mae"] = float(np.mean(np.abs(p_eval - y_eval)))
+    metrics.update({"method": method, "last_date": state["last_date"], "n_seen": state["n_seen"],
+                    "updates_since_refit": state["updates_since_refit"], "features": names, "target": target_col})
+    return metrics
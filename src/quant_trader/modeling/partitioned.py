@@ -0,0 +1,220 @@
+# src/quant_trader/modeling/partitioned.py
+"""
+Pooled vs per-ticker vs per-cluster models, trained in parallel.
+
+    metrics, timings = train_partitioned("data/processed/features.parquet", by="ticker",
+                                         out_path="outputs/predictions/partitioned_ticker.parquet")
+
+Rows are sorted once by (partition, date), so every partition is a contiguous
+slice [lo, hi) of the feature array and its train/test split is one searchsorted
+against the same date cutoff run_baseline uses (all modes score the same test
+window). X / y are written once as .npy files that worker processes memory-map,
+so a worker only pages in its own slice and the parent keeps at most
+`max_workers * 2` partitions in flight.
+
+  pooled   one model on every row (same split and model as run_baseline)
+  ticker   one model per ticker
+  cluster  one model per cluster id (`clusters`: ticker -> label, e.g. data.sectors;
+           tickers without a label share the "other" model)
+
+Partitions with fewer than `min_train_rows` training rows are skipped (no
+predictions). The predictions file has run_baseline's columns, so the
+simulators read it unchanged; per-partition timings go to a second file.
+"""
+from __future__ import annotations
+import os
+import tempfile
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from src.quant_trader.modeling.baselines import FEATURES
+from src.quant_trader.modeling.datasets import date_quantile, dates_to_ns, finite_rows, read_columns
+
+MODES = ("pooled", "ticker", "cluster")
+
+
+def _make_model(model: str, params: dict, random_state: int):
+    if model == "decision_tree":
+        from sklearn.tree import DecisionTreeRegressor
+        return DecisionTreeRegressor(random_state=random_state, **params)
+    if model == "random_forest":
+        from sklearn.ensemble import RandomForestRegressor
+        return RandomForestRegressor(random_state=random_state, n_jobs=1, **params)
+    raise ValueError(f"Unknown model {model!r}; expected decision_tree or random_forest")
+
+
+def _fit_slice(X: np.ndarray, y: np.ndarray, lo: int, hi: int, n_train: int,
+               model: str, params: dict, random_state: int) -> tuple[np.ndarray, float, float]:
+    """
+    Fit on rows [lo, lo + n_train) and predict [lo + n_train, hi).
+    Returns (predictions, fit seconds, predict seconds).
+    """
+    t0 = time.perf_counter()
+    est = _make_model(model, params, random_state)
+    est.fit(np.asarray(X[lo:lo + n_train]), np.asarray(y[lo:lo + n_train]))
+    t1 = time.perf_counter()
+    pred = est.predict(np.asarray(X[lo + n_train:hi]))
+    return pred, t1 - t0, time.perf_counter() - t1
+
+
+def _fit_partition(x_path: str, y_path: str, *args) -> tuple[np.ndarray, float, float]:
+    # worker process: memory-map the shared arrays, only the slice is read
+    return _fit_slice(np.load(x_path, mmap_mode="r"), np.load(y_path, mmap_mode="r"), *args)
+
+
+def train_partitioned(features_path: str | pa.Table | pd.DataFrame = "data/processed/features.parquet",
+                      by: str = "ticker",
+                      out_path: str | None = "outputs/predictions/partitioned_{by}.parquet",
+                      timings_path: str | None = None,
+                      clusters: dict | None = None,
+                      feature_names: list[str] | None = None,
+                      target_col: str = "target",
+                      test_quantile: float = 0.8,
+                      model: str = "decision_tree",
+                      params: dict | None = None,
+                      random_state: int = 42,
+                      max_workers: int | None = None,
+                      min_train_rows: int = 50,
+                      universe=None) -> tuple[dict, pd.DataFrame]:
+    """
+    Fit one model per partition (see module docstring) and write the combined
+    test-set predictions ['ticker','date','y_true','y_pred'] to out_path
+    ('{by}' is filled in; None skips writing). Timings go to timings_path
+    (default: next to out_path, *_timings.parquet).
+
+    max_workers: processes (default: CPU count); 1 fits in this process.
+    universe: io.universe.Universe; only rows of names that were members on the
+    date are trained on and scored, as in run_baseline.
+    Returns (metrics over all predicted rows, per-partition timings DataFrame
+    ['partition','n_train','n_test','fit_s','predict_s','status']).
+    """
+    if by not in MODES:
+        raise ValueError(f"Unknown partitioning {by!r}; expected one of {MODES}")
+    names = list(feature_names or FEATURES)
+    params = dict(params or {"max_depth": 3})
+    if out_path is not None:
+        out_path = out_path.format(by=by)
+
+    table = read_columns(features_path, ["ticker", "date", *names, target_col])
+    rows = finite_rows(table, [*names, target_col])
+    if universe is not None:
+        d_all = dates_to_ns(table.column("date"))[rows]
+        t_all = table.column("ticker").to_numpy(zero_copy_only=False)[rows]
+        rows = rows[universe.compile(d_all, t_all).rows(d_all, t_all)]
+    dates = dates_to_ns(table.column("date"))[rows]
+    tickers = table.column("ticker").to_numpy(zero_copy_only=False)[rows]
+    if rows.size == 0:
+        raise ValueError("No rows to train on.")
+    cutoff = date_quantile(np.sort(dates), test_quantile)
+    tcodes, t_uni = pd.factorize(tickers, sort=True)
+
+    if by == "pooled":
+        labels = np.zeros(rows.size, dtype=np.int64)
+        uniq = np.array(["pooled"], dtype=object)
+    elif by == "ticker":
+        labels, uniq = tcodes, t_uni
+    else:
+        mapping = clusters or {}
+        labels, uniq = pd.factorize(pd.Series(tickers).map(lambda t: mapping.get(t, "other")).to_numpy(), sort=True)
+
+    # one sort: partitions become contiguous, each sorted by date
+    order = np.lexsort((dates, labels))
+    bounds = np.r_[0, np.cumsum(np.bincount(labels, minlength=len(uniq)))]
+    d_sorted = dates[order]
+    idx = rows[order]
+
+    X = np.empty((idx.size, len(names)), dtype=np.float32)
+    for j, c in enumerate(names):
+        X[:, j] = table.column(c).to_numpy(zero_copy_only=False)[idx]
+    y = table.column(target_col).to_numpy(zero_copy_only=False).astype(np.float64, copy=False)[idx]
+
+    jobs = []
+    for g in range(len(uniq)):
+        lo, hi = int(bounds[g]), int(bounds[g + 1])
+        n_train = int(np.searchsorted(d_sorted[lo:hi], cutoff, side="right"))
+        jobs.append((g, lo, hi, n_train))
+
+    y_pred = np.full(idx.size, np.nan)
+    timing = {g: (0.0, 0.0, "skipped") for g, *_ in jobs}
+    runnable = [j for j in jobs if j[3] >= max(min_train_rows, 1) and j[2] - j[1] > j[3]]
+    workers = max(1, min(int(max_workers or os.cpu_count() or 1), len(runnable) or 1))
+
+    def store(j, res):
+        g, lo, hi, n_train = j
+        pred, fit_s, pred_s = res
+        y_pred[lo + n_train:hi] = pred
+        timing[g] = (fit_s, pred_s, "ok")
+
+    if workers == 1:
+        for j in runnable:
+            store(j, _fit_slice(X, y, j[1], j[2], j[3], model, params, random_state))
+    else:
+        with tempfile.TemporaryDirectory(prefix="partitioned-") as tmp, \
+                ProcessPoolExecutor(max_workers=workers) as pool:
+            x_path, y_path = os.path.join(tmp, "X.npy"), os.path.join(tmp, "y.npy")
+            np.save(x_path, X)
+            np.save(y_path, y)
+            pending, queue = {}, list(runnable)
+            while queue or pending:
+                # bounded submission window: results never pile up beyond 2 per worker
+                while queue and len(pending) < 2 * workers:
+                    j = queue.pop(0)
+                    fut = pool.submit(_fit_partition, x_path, y_path, j[1], j[2], j[3], model, params, random_state)
+                    pending[fut] = j
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    store(pending.pop(fut), fut.result())
+
+    n_test_total = sum(hi - lo - n_train for _, lo, hi, n_train in jobs)
+    test = np.zeros(idx.size, dtype=bool)
+    for _, lo, hi, n_train in jobs:
+        test[lo + n_train:hi] = True
+    done_rows = test & ~np.isnan(y_pred)
+    pos = np.flatnonzero(done_rows)
+    pos = pos[np.lexsort((tcodes[order][pos], d_sorted[pos]))]         # date, ticker order
+
+    out = pa.table({
+        "ticker": table.column("ticker").take(pa.array(idx[pos])),
+        "date": pa.array(d_sorted[pos], type=pa.timestamp("ns")),
+        "y_true": pa.array(y[pos]),
+        "y_pred": pa.array(y_pred[pos]),
+    })
+    if out_path is not None:
+        Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+        pq.write_table(out, out_path)
+
+    timings = pd.DataFrame([
+        {"partition": str(uniq[g]), "n_train": n_train, "n_test": hi - lo - n_train,
+         "fit_s": timing[g][0], "predict_s": timing[g][1], "status": timing[g][2]}
+        for g, lo, hi, n_train in jobs
+    ])
+    if timings_path is None and out_path is not None:
+        timings_path = str(Path(out_path).with_name(Path(out_path).stem + "_timings.parquet"))
+    if timings_path is not None:
+        timings.to_parquet(timings_path, index=False)
+
+    yt, yp = y[pos], y_pred[pos]
+    metrics = {
+        "by": by,
+        "n_partitions": len(jobs),
+        "n_fitted": int((timings["status"] == "ok").sum()),
+        "n_train": int(timings["n_train"].sum()),
+        "n_test": int(len(pos)),
+        "n_test_skipped": int(n_test_total - len(pos)),
+        "mse": float(mean_squared_error(yt, yp)) if len(pos) else float("nan"),
+        "mae": float(mean_absolute_error(yt, yp)) if len(pos) else float("nan"),
+        "r2": float(r2_score(yt, yp)) if len(pos) > 1 else float("nan"),
+        "cutoff": pd.Timestamp(cutoff).isoformat(),
+        "model": model,
+        "features": names,
+        "target": target_col,
+        "workers": workers,
+    }
+    return metrics, timings
@@ -0,0 +1,158 @@
+# src/quant_trader/simulation/costs.py
+"""
+Transaction-cost models for the exact simulator.
+
+Liquidity inputs (ADV, volatility, high/low range) are computed once from prices
+as date x ticker arrays (CostInputs). A cost model turns them into per-name,
+per-day coefficients, cached per parameter set, so the simulation loop only does
+array lookups. Sweeps call `model.with_params(...)` to vary the parameters while
+sharing the same inputs.
+
+Plugging in a model: any object with
+    cost(row, cols, notional) -> np.ndarray   trading cost per name ($)
+    capacity(row, cols)       -> np.ndarray   max tradable notional per name ($)
+"""
+from __future__ import annotations
+from dataclasses import dataclass, field, replace
+import numpy as np
+import pandas as pd
+
+from src.quant_trader.features.market_regime import rolling_mean, rolling_std
+from src.quant_trader.utils.panel import Panel
+
+
+@dataclass
+class CostInputs:
+    """
+    Date x ticker liquidity arrays, lagged one day (known before trading on a date);
+    NaN until a full `window` of history exists.
+      adv:   average daily dollar volume (close * volume)
+      sigma: daily log-return volatility
+      hl:    average log(high/low) range, a spread proxy
+    """
+    dates: pd.DatetimeIndex
+    tickers: pd.Index
+    adv: np.ndarray
+    sigma: np.ndarray
+    hl: np.ndarray
+
+    @classmethod
+    def from_prices(cls, prices: pd.DataFrame, window: int = 20) -> "CostInputs":
+        df = prices.dropna(subset=["close"])
+        panel = Panel.from_long(df["date"].values, df["ticker"].values)
+        C = panel.pivot(df["close"].values)
+        V = panel.pivot(df["volume"].values) if "volume" in df else np.full(panel.shape, np.nan)
+        if {"high", "low"} <= set(df.columns):
+            with np.errstate(invalid="ignore", divide="ignore"):
+                HL = np.log(panel.pivot(df["high"].values) / panel.pivot(df["low"].values))
+        else:
+            HL = np.full(panel.shape, np.nan)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            R = np.diff(np.log(C), axis=0, prepend=np.nan)
+
+        def lag(M):
+            out = np.full_like(M, np.nan)
+            out[1:] = M[:-1]
+            return out
+
+        return cls(
+            dates=panel.dates,
+            tickers=panel.tickers,
+            adv=lag(rolling_mean(C * V, window)),
+            sigma=lag(rolling_std(R, window)),
+            hl=lag(rolling_mean(HL, window)),
+        )
+
+    def row(self, date) -> int:
+        """
+        Row for `date` (the latest row on or before it; -1 if before the data).
+        """
+        return int(self.dates.searchsorted(pd.Timestamp(date), side="right")) - 1
+
+    def cols(self, tickers) -> np.ndarray:
+        """
+        Column per ticker (-1 for tickers without price data).
+        """
+        return self.tickers.get_indexer(pd.Index(tickers))
+
+
+@dataclass
+class FlatBpsCost:
+    """
+    Legacy model: bps charged on one-way turnover (half the traded notional),
+    exactly like run_exact_long_only_topk's slippage_bps. No capacity limit.
+    """
+    bps: float = 5.0
+
+    def cost(self, row: int, cols, notional) -> np.ndarray:
+        return 0.5 * np.abs(np.asarray(notional, dtype=np.float64)) * (self.bps / 10_000.0)
+
+    def capacity(self, row: int, cols) -> np.ndarray:
+        return np.full(np.shape(cols), np.inf)
+
+    def with_params(self, **kw) -> "FlatBpsCost":
+        return replace(self, **kw)
+
+
+@dataclass
+class SqrtImpactCost:
+    """
+    cost_i = Q_i * (fixed_bps/1e4 + spread_mult * hl_i)
+           + Q_i * impact_coef * sigma_i * sqrt(Q_i / ADV_i)
+
+    Q_i = traded notional. The linear and square-root coefficients are built once
+    per parameter set as date x ticker arrays. Names lacking liquidity data pay
+    only fixed_bps. max_participation caps tradable notional at that share of ADV.
+    """
+    inputs: CostInputs
+    fixed_bps: float = 1.0
+    spread_mult: float = 0.5
+    impact_coef: float = 1.0
+    max_participation: float | None = 0.1
+    _lin: np.ndarray | None = field(default=None, init=False, repr=False)
+    _sqrt: np.ndarray | None = field(default=None, init=False, repr=False)
+
+    def with_params(self, **kw) -> "SqrtImpactCost":
+        return replace(self, **kw)  # coefficient arrays are rebuilt lazily; inputs are shared
+
+    def _coefs(self):
+        if self._lin is None:
+            inp = self.inputs
+            self._lin = self.fixed_bps / 10_000.0 + self.spread_mult * np.nan_to_num(inp.hl, nan=0.0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                sq = self.impact_coef * inp.sigma / np.sqrt(inp.adv)
+            self._sqrt = np.where(np.isfinite(sq), sq, 0.0)
+        return self._lin, self._sqrt
+
+    def cost(self, row: int, cols, notional) -> np.ndarray:
+        q = np.abs(np.asarray(notional, dtype=np.float64))
+        cols = np.asarray(cols)
+        lin, sq = self._coefs()
+        known = (cols >= 0) & (row >= 0)
+        r, c = max(row, 0), np.where(known, cols, 0)
+        a = np.where(known, lin[r, c], self.fixed_bps / 10_000.0)
+        b = np.where(known, sq[r, c], 0.0)
+        return q * a + b * q ** 1.5
+
+    def capacity(self, row: int, cols) -> np.ndarray:
+        cols = np.asarray(cols)
+        if self.max_participation is None or row < 0:
+            return np.full(cols.shape, np.inf)
+        adv = np.where(cols >= 0, self.inputs.adv[row, np.where(cols >= 0, cols, 0)], np.nan)
+        return np.where(np.isfinite(adv), self.max_participation * adv, np.inf)
+
+
+def cost_model_from_config(prices: pd.DataFrame, sim_cfg: dict | None) -> FlatBpsCost | SqrtImpactCost:
+    """
+    Build the model described by configs/strategy.yaml::simulation.cost_model
+    (falls back to the flat slippage_bps model).
+    """
+    sim_cfg = sim_cfg or {}
+    cm = dict(sim_cfg.get("cost_model") or {})
+    kind = cm.pop("type", "flat")
+    if kind == "flat":
+        return FlatBpsCost(float(sim_cfg.get("slippage_bps", 5.0)))
+    if kind == "sqrt_impact":
+        window = int(cm.pop("adv_window", 20))
+        return SqrtImpactCost(CostInputs.from_prices(prices, window), **cm)
+    raise ValueError(f"Unknown cost model type: {kind!r}")
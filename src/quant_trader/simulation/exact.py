@@ -5,6 +5,8 @@ from typing import Set, List, Optional
 import numpy as np
 import pandas as pd
 
+from src.quant_trader.simulation.vectorized import hold_period_rows
+
 def _topk_by_pred(preds_for_day: pd.DataFrame, k: int) -> List[str]:
     if preds_for_day.empty:
         return []
@@ -21,10 +23,22 @@ def run_exact_long_only_topk(
     slippage_bps: float = 5.0,
     commission_per_trade: float = 0.0,
     threshold: Optional[float] = None,
+    holding_days: int = 1,
+    cost_model=None,
+    weights: Optional[pd.DataFrame] = None,
+    universe=None,
 ) -> pd.DataFrame:
     """
     Exact daily rebalance long-only Top-K (optional threshold on y_pred).
     Expects columns: ['ticker','date','y_true','y_pred'] with y_true = next-day *log* return.
+    With holding_days > 1, y_true is the holding_days-ahead log return and the book
+    is rebalanced only every holding_days dates.
+    cost_model: optional simulation.costs model (e.g. SqrtImpactCost) replacing the flat
+    slippage_bps charge with per-name costs; names whose entry size exceeds the model's
+    capacity (participation cap) are skipped when picking the Top-K.
+    weights: optional date x ticker target-weight matrix (simulation.portfolio.build_weights);
+    when given it replaces equal-weight Top-K (k/threshold are then ignored).
+    universe: optional io.universe.Universe; names are only eligible on dates they were members.
     Returns: ['date','ret_port','equity','positions','turnover','cost_value'].
     """
     if preds.empty:
@@ -33,39 +47,72 @@ def run_exact_long_only_topk(
     df = preds.copy()
     df["date"] = pd.to_datetime(df["date"])
     df = df.dropna(subset=["y_true","y_pred"]).sort_values(["date","ticker"])
+    df = hold_period_rows(df, holding_days)
+    if universe is not None:
+        df = universe.filter(df)
+
+    if cost_model is not None:
+        # cost lookups are array indices, resolved once for the whole frame
+        inputs = getattr(cost_model, "inputs", None)
+        col_of = dict(zip(inputs.tickers, range(len(inputs.tickers)))) if inputs is not None else {}
+        df = df.assign(_col=df["ticker"].map(col_of).fillna(-1).astype(int))
 
     wealth = float(initial_capital)
     prev_positions: Set[str] = set()
+    prev_w: dict = {}
     rows = []
 
     # 🚫 No equality filter — iterate by group to avoid tz/time mismatches
     for d, day in df.groupby("date", sort=True):
-        # Apply threshold if provided
-        if threshold is not None:
-            day = day[day["y_pred"] > threshold]
-
-        # Pick Top-K and build weights
-        tickers = _topk_by_pred(day, k)
-        positions = set(tickers)
-        n = len(tickers)
-        target_w = {t: 1.0 / n for t in tickers} if n > 0 else {}
-
-        # Realized simple return from next-period log returns
-        if n == 0:
-            port_ret_gross = 0.0
+        if cost_model is not None:
+            row = inputs.row(d) if inputs is not None else 0
+
+        if weights is not None:
+            # Target weights given by the portfolio-construction step
+            wrow = weights.loc[d] if d in weights.index else pd.Series(dtype=float)
+            target_w = {t: float(w) for t, w in wrow[wrow > 0].items()}
+            positions = set(target_w)
+            held = day[day["ticker"].isin(positions)]
+            simple_ret = np.exp(held["y_true"].values) - 1.0
+            port_ret_gross = float(np.dot(held["ticker"].map(target_w).values, simple_ret)) if positions else 0.0
         else:
-            simple_ret = np.exp(day.loc[day["ticker"].isin(positions), "y_true"].values) - 1.0
-            port_ret_gross = float(simple_ret.mean()) if simple_ret.size else 0.0
+            # Apply threshold if provided
+            if threshold is not None:
+                day = day[day["y_pred"] > threshold]
+
+            if cost_model is not None:
+                ok = cost_model.capacity(row, day["_col"].values) >= wealth / max(k, 1)
+                if not ok.all():
+                    day = day[ok]
 
-        # Turnover (L1/2)
-        old_w = {t: (1.0 / len(prev_positions)) if prev_positions else 0.0 for t in prev_positions}
+            # Pick Top-K and build weights
+            tickers = _topk_by_pred(day, k)
+            positions = set(tickers)
+            n = len(tickers)
+            target_w = {t: 1.0 / n for t in tickers} if n > 0 else {}
+
+            # Realized simple return from next-period log returns
+            if n == 0:
+                port_ret_gross = 0.0
+            else:
+                simple_ret = np.exp(day.loc[day["ticker"].isin(positions), "y_true"].values) - 1.0
+                port_ret_gross = float(simple_ret.mean()) if simple_ret.size else 0.0
+
+        # Turnover (L1/2) against the previous target weights
+        old_w = prev_w
         all_names = prev_positions | positions
         l1 = sum(abs(target_w.get(t, 0.0) - old_w.get(t, 0.0)) for t in all_names)
         turnover = 0.5 * l1
 
         # Costs
         trade_notional = wealth * turnover
-        slippage_cost = trade_notional * (slippage_bps / 10_000.0)
+        if cost_model is None:
+            slippage_cost = trade_notional * (slippage_bps / 10_000.0)
+        else:
+            names = sorted(all_names)
+            dw = np.array([abs(target_w.get(t, 0.0) - old_w.get(t, 0.0)) for t in names])
+            cols = np.array([col_of.get(t, -1) for t in names], dtype=int)
+            slippage_cost = float(cost_model.cost(row, cols, wealth * dw).sum()) if names else 0.0
         trades = sum(1 for t in all_names if target_w.get(t, 0.0) != old_w.get(t, 0.0))
         commission_cost = trades * commission_per_trade
         total_cost = slippage_cost + commission_cost
@@ -86,6 +133,7 @@ def run_exact_long_only_topk(
 
         wealth = wealth_next
         prev_positions = positions
+        prev_w = target_w
 
     return pd.DataFrame(rows).sort_values("date").reset_index(drop=True)
 
@@ -0,0 +1,164 @@
+# src/quant_trader/simulation/holdings.py
+"""
+Holdings-level exact accounting.
+
+run_exact_long_only_topk resets the book to its target weights every date and
+measures turnover between consecutive targets. Here the book is an array of
+per-name weights that drifts with realized returns between rebalances:
+
+    w_{t+1} = w_t * (1 + r_t) / (1 + w_t . r_t)        (cash keeps the rest)
+
+and on a rebalance date the trade is target - w (drifted), so turnover and costs
+come from what is actually held. Rebalance rules:
+
+  daily      every date
+  weekly     first date of each calendar week
+  monthly    first date of each month
+  threshold  when the one-way distance 0.5 * |target - w|_1 exceeds `drift_threshold`
+
+Predictions are pivoted once (vectorized.TopKPivot) and targets for every date
+come from one topk_mask call, so the date loop only does O(names) array updates.
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+
+from src.quant_trader.simulation.vectorized import TopKPivot, topk_mask
+
+REBALANCE_RULES = ("daily", "weekly", "monthly", "threshold")
+
+
+def rebalance_schedule(dates: pd.DatetimeIndex, rule: str = "daily") -> np.ndarray:
+    """
+    Boolean per date: True where a calendar rule rebalances (the first date always
+    does). "threshold" only has the first date; drift decides the rest.
+    """
+    if rule not in REBALANCE_RULES:
+        raise ValueError(f"Unknown rebalance rule {rule!r}; expected one of {REBALANCE_RULES}")
+    n = len(dates)
+    if rule == "daily":
+        return np.ones(n, dtype=bool)
+    if rule == "threshold":
+        return np.r_[True, np.zeros(max(n - 1, 0), dtype=bool)][:n]
+    d = dates.to_numpy().astype("datetime64[D]")
+    if rule == "weekly":
+        period = (d.astype(np.int64) + 3) // 7          # weeks starting Monday (1970-01-01 was a Thursday)
+    else:
+        period = d.astype("datetime64[M]").astype(np.int64)
+    return np.r_[True, period[1:] != period[:-1]]
+
+
+def target_weights(pivot: TopKPivot, k: int, threshold: float | None = None,
+                   weights: pd.DataFrame | None = None) -> np.ndarray:
+    """
+    (n_dates, n_tickers) target weights: equal-weight Top-K of y_pred, or a
+    date x ticker weight matrix (portfolio.build_weights) aligned to the pivot.
+    """
+    if weights is not None:
+        W = weights.reindex(index=pivot.dates, columns=pivot.tickers).to_numpy(dtype=np.float64)
+        return np.nan_to_num(np.clip(W, 0.0, None))
+    ok = ~np.isnan(pivot.pred)
+    if threshold is not None:
+        ok &= pivot.pred > threshold
+    mask = topk_mask(np.where(ok, pivot.pred, -np.inf), k, ok, pivot.order)
+    n = mask.sum(axis=1, keepdims=True)
+    return np.divide(mask, n, out=np.zeros(mask.shape), where=n > 0)
+
+
+def run_holdings_topk(
+    preds: pd.DataFrame,
+    k: int = 5,
+    initial_capital: float = 100_000.0,
+    slippage_bps: float = 5.0,
+    commission_per_trade: float = 0.0,
+    threshold: float | None = None,
+    rebalance: str = "daily",
+    drift_threshold: float = 0.05,
+    cost_model=None,
+    weights: pd.DataFrame | None = None,
+    universe=None,
+    pivot: TopKPivot | None = None,
+) -> pd.DataFrame:
+    """
+    Long-only Top-K (or `weights`) with drifting holdings and a rebalance rule.
+
+    Same inputs as run_exact_long_only_topk (y_true = next-period log return of a
+    position opened on the date). A held name without a row on a date is assumed
+    flat that day. cost_model (simulation.costs) prices each traded name and its
+    capacity excludes names from the Top-K on rebalance dates, as in the exact sim.
+
+    Returns ['date','ret_port','equity','positions','turnover','cost_value','rebalanced'];
+    turnover is one-way, 0.5 * |target - drifted weights|_1, and 0 between rebalances.
+    """
+    cols_out = ["date", "ret_port", "equity", "positions", "turnover", "cost_value", "rebalanced"]
+    if pivot is None:
+        if preds.empty:
+            return pd.DataFrame(columns=cols_out)
+        pivot = TopKPivot.from_preds(preds, universe)
+    dates, tickers = pivot.dates, pivot.tickers.to_numpy()
+    n_dates, n_names = pivot.pred.shape
+
+    schedule = rebalance_schedule(dates, rebalance)
+    T = target_weights(pivot, k, threshold, weights)
+    R = np.expm1(np.nan_to_num(pivot.true))             # simple returns, 0 where missing
+
+    if cost_model is not None:
+        inputs = getattr(cost_model, "inputs", None)
+        cost_cols = inputs.cols(pivot.tickers) if inputs is not None else np.full(n_names, -1)
+        ok_score = ~np.isnan(pivot.pred)
+        if threshold is not None:
+            ok_score &= pivot.pred > threshold
+
+    w = np.zeros(n_names)
+    wealth = float(initial_capital)
+    ret_port = np.zeros(n_dates)
+    equity = np.zeros(n_dates)
+    turnover = np.zeros(n_dates)
+    cost_value = np.zeros(n_dates)
+    rebalanced = np.zeros(n_dates, dtype=bool)
+    held = np.zeros((n_dates, n_names), dtype=bool)
+
+    for t in range(n_dates):
+        target = T[t]
+        row = inputs.row(dates[t]) if cost_model is not None and inputs is not None else 0
+        if cost_model is not None and weights is None:
+            fits = cost_model.capacity(row, cost_cols) >= wealth / max(k, 1)
+            if not fits[target > 0].all():
+                ok = ok_score[t] & fits
+                m = topk_mask(np.where(ok, pivot.pred[t], -np.inf)[None], k, ok[None], pivot.order[t][None])[0]
+                target = m / m.sum() if m.any() else np.zeros(n_names)
+
+        dw = target - w
+        dist = 0.5 * np.abs(dw).sum()
+        if schedule[t] or (rebalance == "threshold" and dist > drift_threshold):
+            traded = np.abs(dw) > 1e-12
+            if cost_model is None:
+                cost = wealth * dist * (slippage_bps / 10_000.0)
+            else:
+                cost = float(cost_model.cost(row, cost_cols[traded], wealth * np.abs(dw[traded])).sum())
+            cost += int(traded.sum()) * commission_per_trade
+            w = target.copy()
+            turnover[t], cost_value[t], rebalanced[t] = dist, cost, True
+            wealth_after = max(wealth - cost, 0.0)
+        else:
+            wealth_after = wealth
+
+        gross = float(w @ R[t])
+        wealth_next = wealth_after * (1.0 + gross)
+        ret_port[t] = np.log(wealth_next / wealth) if wealth > 0 and wealth_next > 0 else 0.0
+        equity[t] = wealth_next
+        held[t] = w > 0
+        # drift: each name grows with its return, the book with the portfolio return
+        if gross > -1.0:
+            w = w * (1.0 + R[t]) / (1.0 + gross)
+        wealth = wealth_next
+
+    return pd.DataFrame({
+        "date": dates,
+        "ret_port": ret_port,
+        "equity": equity,
+        "positions": [",".join(tickers[h]) for h in held],
+        "turnover": turnover,
+        "cost_value": cost_value,
+        "rebalanced": rebalanced,
+    })
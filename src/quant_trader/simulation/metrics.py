@@ -24,17 +24,18 @@ def cagr(returns: pd.Series, periods_per_year: int = 252) -> float:
     years = len(returns) / periods_per_year
     return float(np.exp(total_log_ret / max(years, 1e-9)) - 1.0)
 
-def summarize(port: pd.DataFrame) -> dict:
+def summarize(port: pd.DataFrame, periods_per_year: int | float = 252) -> dict:
     """
     port: DataFrame with columns ['date','ret_port'].
+    periods_per_year: 252 for daily rows; 252 / holding_days for multi-day holds.
     """
     if port.empty:
         return {"CAGR": 0.0, "Sharpe": 0.0, "MaxDD": 0.0, "N": 0}
 
     eq = (1.0 * np.exp(port["ret_port"].cumsum())).rename("equity")
     return {
-        "CAGR": cagr(port["ret_port"]),
-        "Sharpe": sharpe_ratio(port["ret_port"]),
+        "CAGR": cagr(port["ret_port"], periods_per_year),
+        "Sharpe": sharpe_ratio(port["ret_port"], periods_per_year),
         "MaxDD": max_drawdown(eq),
         "N": int(len(port)),
     }
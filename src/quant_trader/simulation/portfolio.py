@@ -0,0 +1,221 @@
+# src/quant_trader/simulation/portfolio.py
+"""
+Portfolio construction: turn predictions into a date x ticker weight matrix.
+
+Methods (configs/strategy.yaml::position_sizing):
+  equal          1/K over the selected names
+  inverse_vol    w ~ 1/sigma from an exponentially weighted variance
+  risk_parity    equal risk contribution under the EW covariance
+  mean_variance  max mu'w - (risk_aversion/2) w'Sw - (turnover_penalty/2)|w - w_prev|^2,
+                 long-only, fully invested; mu = y_pred
+
+The EW covariance is updated once per price date (S <- lam*S + (1-lam)*r r'),
+never refit from a window. Each date's risk-parity / mean-variance solve starts
+from the previous date's solution, so only a few iterations are needed.
+"""
+from __future__ import annotations
+import numpy as np
+import pandas as pd
+from scipy.linalg import solve as _solve
+
+from src.quant_trader.simulation.vectorized import topk_mask
+from src.quant_trader.utils.panel import Panel
+
+METHODS = ("equal", "inverse_vol", "risk_parity", "mean_variance")
+
+
+def project_simplex(v: np.ndarray) -> np.ndarray:
+    """
+    Euclidean projection onto {w >= 0, sum(w) = 1}.
+    """
+    u = np.sort(v)[::-1]
+    css = np.cumsum(u) - 1.0
+    rho = np.flatnonzero(u - css / np.arange(1, v.size + 1) > 0)[-1]
+    return np.maximum(v - css[rho] / (rho + 1.0), 0.0)
+
+
+def risk_parity_weights(S: np.ndarray, y0: np.ndarray | None = None, tol: float = 1e-4, max_iter: int = 50) -> np.ndarray:
+    """
+    Equal-risk-contribution weights (unnormalized y; w = y / sum(y)).
+
+    Minimizes the convex 0.5 y'Sy - (1/n) sum(log y), whose optimum satisfies
+    y_i (S y)_i = 1/n, with damped Newton steps until every risk contribution is
+    within `tol` (relative) of 1/n. Started from the previous date's solution this
+    typically needs one or two steps.
+    """
+    n = S.shape[0]
+    b = 1.0 / n
+    d = np.maximum(np.diag(S), 1e-300)
+    y = np.sqrt(b / d) if y0 is None else y0.copy()
+    for _ in range(max_iter):
+        Sy = S @ y
+        if np.max(np.abs(y * Sy / b - 1.0)) < tol:
+            break
+        g = Sy - b / y
+        H = S + np.diag(b / (y * y))
+        try:
+            dy = _solve(H, g, assume_a="pos", check_finite=False)  # H is SPD: Cholesky
+        except np.linalg.LinAlgError:
+            dy = g / np.diag(H)
+        step = 1.0
+        while np.any(y - step * dy <= 0):
+            step *= 0.5
+        y = y - step * dy
+    return y
+
+
+def _max_eig(S: np.ndarray, n_iter: int = 30, safety: float = 1.2) -> float:
+    # power iteration from the equal-weight direction (the market mode of a covariance)
+    v = np.ones(S.shape[0]) / np.sqrt(S.shape[0])
+    lam = 0.0
+    for _ in range(n_iter):
+        u = S @ v
+        lam = float(v @ u)
+        nu = np.linalg.norm(u)
+        if nu == 0:
+            break
+        v = u / nu
+    return safety * lam
+
+
+def mean_variance_weights(S: np.ndarray, mu: np.ndarray, w_prev: np.ndarray, risk_aversion: float,
+                          turnover_penalty: float, w0: np.ndarray | None = None,
+                          tol: float = 1e-7, max_iter: int = 1000) -> np.ndarray:
+    """
+    Long-only mean-variance with a quadratic turnover penalty, by accelerated
+    (FISTA, with adaptive restart) projected gradient ascent on the simplex
+    starting from `w0` (warm start).
+    The step uses a power-iteration estimate of S's largest eigenvalue (no
+    eigendecomposition per date).
+    """
+    n = mu.size
+    L = risk_aversion * _max_eig(S) + turnover_penalty
+    step = 1.0 / max(L, 1e-12)
+    w = np.full(n, 1.0 / n) if w0 is None else w0
+    z, t = w, 1.0
+    for _ in range(max_iter):
+        g = mu - risk_aversion * (S @ z) - turnover_penalty * (z - w_prev)
+        w_new = project_simplex(z + step * g)
+        if np.max(np.abs(w_new - w)) < tol:
+            return w_new
+        if (z - w_new) @ (w_new - w) > 0:  # momentum points uphill: restart
+            t = 1.0
+        t_new = 0.5 * (1.0 + np.sqrt(1.0 + 4.0 * t * t))
+        z = w_new + ((t - 1.0) / t_new) * (w_new - w)
+        w, t = w_new, t_new
+    return w
+
+
+def selection_mask(scores: np.ndarray, k: int | None, threshold: float | None = None) -> np.ndarray:
+    """
+    Boolean date x ticker mask of the top-k scores per date (NaN never selected).
+    """
+    ok = ~np.isnan(scores)
+    if threshold is not None:
+        ok &= scores > threshold
+    if k is None:
+        return ok
+    return topk_mask(np.where(ok, scores, -np.inf), k, ok)
+
+
+def build_weights(
+    preds: pd.DataFrame,
+    prices: pd.DataFrame,
+    method: str = "equal",
+    k: int | None = 5,
+    threshold: float | None = None,
+    halflife: float = 60.0,
+    min_periods: int = 20,
+    risk_aversion: float = 5.0,
+    turnover_penalty: float = 0.01,
+) -> pd.DataFrame:
+    """
+    Weight matrix (index = preds dates, columns = tickers) for `method`.
+
+    preds:  ['ticker','date','y_pred'] (top-k per date are the candidates; y_pred is mu)
+    prices: ['ticker','date','close'] history used for the EW risk model; the
+            estimate on a date uses returns up to and including that date.
+    Until `min_periods` returns are seen, risk-based methods fall back to equal weights.
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method!r}; expected one of {METHODS}")
+    if preds.empty:
+        return pd.DataFrame()
+
+    pp = preds.dropna(subset=["y_pred"])
+    panel = Panel.from_long(pp["date"].values, pp["ticker"].values)
+    scores = panel.pivot(pp["y_pred"].values)
+    sel = selection_mask(scores, k, threshold)
+    W = np.zeros(panel.shape)
+
+    if method == "equal":
+        n = sel.sum(axis=1, keepdims=True)
+        W = np.where(sel, 1.0 / np.maximum(n, 1), 0.0)
+        return pd.DataFrame(W, index=panel.dates, columns=panel.tickers)
+
+    # price returns on the price calendar, restricted to the prediction universe
+    px = prices[prices["ticker"].isin(panel.tickers)].dropna(subset=["close"])
+    pxp = Panel.from_long(px["date"].values, px["ticker"].values)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        R_all = np.diff(np.log(pxp.pivot(px["close"].values)), axis=0, prepend=np.nan)
+    R = np.full((len(pxp.dates), len(panel.tickers)), np.nan)
+    R[:, panel.tickers.get_indexer(pxp.tickers)] = R_all
+    # for each price date, the prediction row decided on it (-1 if none)
+    pred_row = panel.dates.get_indexer(pxp.dates)
+
+    lam = 0.5 ** (1.0 / halflife)
+    N = len(panel.tickers)
+    mean = np.zeros(N)
+    S = np.zeros((N, N))
+    var = np.zeros(N)
+    seen = np.zeros(N)
+    w_prev_full = np.zeros(N)
+    y_prev_full = np.zeros(N)
+
+    for t in range(len(pxp.dates)):
+        r = R[t]
+        obs = ~np.isnan(r)
+        if obs.any():
+            x = np.where(obs, r, 0.0)
+            seen += obs
+            # EW mean/covariance update (names without a return contribute 0)
+            mean = lam * mean + (1 - lam) * x
+            d = x - mean
+            if method == "inverse_vol":
+                var = lam * var + (1 - lam) * d * d
+            else:
+                S *= lam
+                S += (1 - lam) * np.outer(d, d)
+
+        i = pred_row[t]
+        if i < 0:
+            continue
+        names = np.flatnonzero(sel[i])
+        if names.size == 0:
+            continue
+        if seen[names].min() < min_periods:
+            W[i, names] = 1.0 / names.size
+            continue
+
+        if method == "inverse_vol":
+            inv = 1.0 / np.sqrt(np.maximum(var[names], 1e-300))
+            w = inv / inv.sum()
+        elif method == "risk_parity":
+            Ss = S[np.ix_(names, names)]
+            y0 = y_prev_full[names]
+            if (y0 > 0).any():
+                y0 = np.where(y0 > 0, y0, y0[y0 > 0].mean())  # new names start at the average
+            y = risk_parity_weights(Ss, y0 if (y0 > 0).all() else None)
+            y_prev_full[:] = 0.0
+            y_prev_full[names] = y
+            w = y / y.sum()
+        else:  # mean_variance
+            Ss = S[np.ix_(names, names)]
+            w_old = w_prev_full[names]
+            w0 = w_old / w_old.sum() if w_old.sum() > 0 else None
+            w = mean_variance_weights(Ss, scores[i, names], w_old, risk_aversion, turnover_penalty, w0)
+        W[i, names] = w
+        w_prev_full[:] = 0.0
+        w_prev_full[names] = w
+
+    return pd.DataFrame(W, index=panel.dates, columns=panel.tickers)
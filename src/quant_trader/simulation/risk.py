@@ -0,0 +1,272 @@
+# src/quant_trader/simulation/risk.py
+"""
+Rolling risk analytics for portfolio returns or a whole sweep matrix at once.
+
+    R = store.return_matrix(run_ids)                      # date x run log returns
+    bench = benchmark_returns("data/processed/prices.parquet", ["SPY"])
+    fac = factor_returns(prices, market=bench["SPY"])
+    risk = rolling_risk(R, window=63, alpha=0.05, benchmarks=bench, factors=fac)
+
+Every statistic is a trailing-window update, O(n) per series:
+  var_hist / cvar_hist    historical VaR / CVaR (loss, positive) from a sorted window
+                          kept up to date with one insert and one delete per step
+                          (bisect + list shift), and a running sum of its lower tail
+  var_param / cvar_param  normal VaR / CVaR from rolling sums of r and r^2
+  beta_<bench>            cov / var from rolling sums of r, b, r*b and b^2
+  exp_<factor>            multi-factor OLS exposures (with intercept) from rolling
+                          sums of the factor cross-products and factor x return
+
+Returns are used as given (the simulators' log returns). ret_port on date d is
+earned from d to the next date, so benchmark and factor returns are labelled the
+same way (forward=True).
+"""
+from __future__ import annotations
+from bisect import bisect_left, bisect_right
+from statistics import NormalDist
+import warnings
+import numpy as np
+import pandas as pd
+
+from src.quant_trader.utils.panel import Panel
+
+RISK_COLUMNS = ["var_hist", "cvar_hist", "var_param", "cvar_param"]
+
+
+def _as_matrix(x) -> tuple[np.ndarray, bool]:
+    M = np.asarray(x, dtype=np.float64)
+    return (M[:, None], True) if M.ndim == 1 else (M, False)
+
+
+def rolling_sum(M: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Trailing sums and valid counts down axis 0 (NaN counts as missing), via cumsum.
+    """
+    M = np.asarray(M, dtype=np.float64)
+    valid = ~np.isnan(M)
+    s = np.cumsum(np.where(valid, M, 0.0), axis=0)
+    n = np.cumsum(valid, axis=0)
+    s[window:] = s[window:] - s[:-window]
+    n[window:] = n[window:] - n[:-window]
+    return s, n
+
+
+def rolling_var_cvar(R, window: int = 63, alpha: float = 0.05,
+                     min_periods: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Historical VaR and CVaR (positive = loss) of each column over a trailing window.
+
+    VaR is minus the alpha-quantile (linear interpolation, as np.quantile / pandas
+    rolling quantile); CVaR is minus the mean of the window values at or below it.
+    Each column keeps its window as a sorted list: one bisect insert for the new
+    value and one bisect delete for the value leaving the window per step. The
+    sum of the lo + 1 smallest values (lo = floor(alpha * (n - 1))) is kept
+    running as well; values between win[lo] and the VaR quantile are all equal
+    to it, so CVaR needs no pass over the tail.
+    """
+    M, flat = _as_matrix(R)
+    min_periods = window if min_periods is None else min_periods
+    T, N = M.shape
+    var = np.full((T, N), np.nan)
+    cvar = np.full((T, N), np.nan)
+    for j in range(N):
+        col = M[:, j].tolist()
+        win: list[float] = []
+        c, s = 0, 0.0                                    # s = sum(win[:c])
+        for t, v in enumerate(col):
+            if t >= window:
+                old = col[t - window]
+                if old == old:                           # not NaN
+                    p = bisect_left(win, old)
+                    del win[p]
+                    if p < c:
+                        c, s = c - 1, s - old
+            if v == v:
+                p = bisect_right(win, v)
+                win.insert(p, v)
+                if p < c:
+                    c, s = c + 1, s + v
+            n = len(win)
+            lo = int(alpha * (n - 1)) if n else 0
+            target = lo + 1 if n else 0
+            while c < target:
+                s += win[c]
+                c += 1
+            while c > target:
+                c -= 1
+                s -= win[c]
+            if t % window == 0:
+                s = sum(win[:c])                         # drop accumulated rounding error
+            if n >= max(min_periods, 1):
+                pos = alpha * (n - 1)
+                hi = min(lo + 1, n - 1)
+                q = win[lo] + (win[hi] - win[lo]) * (pos - lo)
+                m = bisect_right(win, q)
+                var[t, j] = -q
+                cvar[t, j] = -(s + (m - c) * q) / m
+    return (var[:, 0], cvar[:, 0]) if flat else (var, cvar)
+
+
+def rolling_parametric_var(R, window: int = 63, alpha: float = 0.05,
+                           min_periods: int | None = None) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Normal VaR / CVaR: -(mu + z_a sigma) and -(mu - sigma phi(z_a) / alpha).
+    """
+    M, flat = _as_matrix(R)
+    min_periods = window if min_periods is None else min_periods
+    s1, n = rolling_sum(M, window)
+    s2, _ = rolling_sum(M * M, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mu = s1 / n
+        sigma = np.sqrt(np.clip((s2 - s1 * s1 / n) / (n - 1), 0.0, None))
+    nd = NormalDist()
+    z = nd.inv_cdf(alpha)
+    var = -(mu + z * sigma)
+    cvar = -(mu - sigma * nd.pdf(z) / alpha)
+    short = n < max(min_periods, 2)
+    var[short] = np.nan
+    cvar[short] = np.nan
+    return (var[:, 0], cvar[:, 0]) if flat else (var, cvar)
+
+
+def rolling_beta(R, b, window: int = 63, min_periods: int | None = None) -> np.ndarray:
+    """
+    Beta of every column of R to the benchmark series b over a trailing window,
+    on the dates where both are present.
+    """
+    M, flat = _as_matrix(R)
+    min_periods = window if min_periods is None else min_periods
+    b = np.asarray(b, dtype=np.float64)[:, None]
+    both = ~np.isnan(M) & ~np.isnan(b)
+    r = np.where(both, M, np.nan)
+    bb = np.where(both, b, np.nan)
+    sr, n = rolling_sum(r, window)
+    sb, _ = rolling_sum(bb, window)
+    srb, _ = rolling_sum(r * bb, window)
+    sbb, _ = rolling_sum(bb * bb, window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        beta = (n * srb - sr * sb) / (n * sbb - sb * sb)
+    beta[(n < max(min_periods, 2)) | ~np.isfinite(beta)] = np.nan
+    return beta[:, 0] if flat else beta
+
+
+def rolling_exposures(R, F, window: int = 63) -> np.ndarray:
+    """
+    (T, N, K) OLS loadings of each column of R on the K factor columns of F
+    (intercept included, not returned) over a trailing window; NaN unless the
+    whole window has the return and every factor.
+    """
+    M, flat = _as_matrix(R)
+    F = np.asarray(F, dtype=np.float64)
+    F = F[:, None] if F.ndim == 1 else F
+    T, N = M.shape
+    K = F.shape[1]
+    f_ok = ~np.isnan(F).any(axis=1)
+    G = np.where(f_ok[:, None], np.c_[np.ones(T), F], 0.0)          # (T, K+1)
+    ok = ~np.isnan(M) & f_ok[:, None]
+    Y = np.where(ok, M, 0.0)
+
+    # rolling sums of G'G and G'y: cumulative sums of the per-date products
+    GG = np.cumsum(G[:, :, None] * G[:, None, :], axis=0)
+    GY = np.cumsum(G[:, :, None] * Y[:, None, :], axis=0)             # (T, K+1, N)
+    cnt = np.cumsum(ok, axis=0)
+    for a in (GG, GY, cnt):
+        a[window:] = a[window:] - a[:-window]
+    coef = np.linalg.pinv(GG) @ GY                                     # (T, K+1, N)
+    out = np.moveaxis(coef[:, 1:, :], 1, 2).copy()                    # (T, N, K)
+    out[cnt < window] = np.nan
+    return out[:, 0, :] if flat else out
+
+
+def benchmark_returns(prices_path: str, tickers, forward: bool = True) -> pd.DataFrame:
+    """
+    date x ticker log close-to-close returns of the benchmark tickers, reading only
+    their rows and the ['ticker','date','close'] columns. forward=True labels the
+    return from d to the next date at d (like ret_port / y_true).
+    """
+    import pyarrow.parquet as pq
+
+    tickers = list(tickers)
+    t = pq.read_table(prices_path, columns=["ticker", "date", "close"],
+                      filters=[("ticker", "in", tickers)]) if tickers else None
+    if t is None or t.num_rows == 0:
+        return pd.DataFrame(index=pd.DatetimeIndex([], name="date"))
+    df = t.to_pandas().dropna(subset=["close"])
+    panel = Panel.from_long(df["date"].to_numpy(), df["ticker"].to_numpy())
+    with np.errstate(invalid="ignore", divide="ignore"):
+        L = np.log(panel.pivot(df["close"].to_numpy()))
+    R = np.full(L.shape, np.nan)
+    if forward:
+        R[:-1] = L[1:] - L[:-1]
+    else:
+        R[1:] = L[1:] - L[:-1]
+    return pd.DataFrame(R, index=panel.dates, columns=list(panel.tickers))
+
+
+def factor_returns(prices: pd.DataFrame, market: pd.Series | None = None, quantile: float = 0.3,
+                   mom_lookback: int = 252, mom_skip: int = 21, size_window: int = 63) -> pd.DataFrame:
+    """
+    Daily long-short factor returns from a long price frame (forward-labelled):
+      mkt  `market` (e.g. benchmark_returns(...)['SPY']) or the equal-weight average
+      smb  bottom minus top `quantile` by average dollar volume (size proxy)
+      mom  top minus bottom `quantile` by the return from t-mom_lookback to t-mom_skip
+    Signals only use data up to each date.
+    """
+    df = prices.dropna(subset=["close"])
+    panel = Panel.from_long(df["date"].to_numpy(), df["ticker"].to_numpy())
+    C = panel.pivot(df["close"].to_numpy())
+    with np.errstate(invalid="ignore", divide="ignore"):
+        L = np.log(C)
+    R = np.full(C.shape, np.nan)
+    R[:-1] = L[1:] - L[:-1]
+
+    if "volume" in df.columns:
+        dv, n = rolling_sum(C * panel.pivot(df["volume"].to_numpy()), size_window)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            size = np.where(n >= size_window, dv / n, np.nan)
+    else:
+        size = np.full(C.shape, np.nan)
+    mom = np.full(C.shape, np.nan)
+    if len(C) > mom_lookback:
+        mom[mom_lookback:] = L[mom_lookback - mom_skip:len(C) - mom_skip] - L[:len(C) - mom_lookback]
+
+    def long_short(signal: np.ndarray, long_high: bool) -> np.ndarray:
+        s = pd.DataFrame(np.where(np.isnan(R), np.nan, signal)).rank(axis=1, pct=True).to_numpy()
+        hi, lo = s >= 1.0 - quantile, s <= quantile
+        top, bot = (hi, lo) if long_high else (lo, hi)
+        return np.nanmean(np.where(top, R, np.nan), axis=1) - np.nanmean(np.where(bot, R, np.nan), axis=1)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)          # all-NaN rows before signals exist
+        mkt = market.reindex(panel.dates).to_numpy(dtype=np.float64) if market is not None else np.nanmean(R, axis=1)
+        return pd.DataFrame({"mkt": mkt, "smb": long_short(size, False), "mom": long_short(mom, True)},
+                            index=panel.dates)
+
+
+def rolling_risk(returns: pd.DataFrame | pd.Series, window: int = 63, alpha: float = 0.05,
+                 benchmarks: pd.DataFrame | None = None, factors: pd.DataFrame | None = None,
+                 min_periods: int | None = None) -> pd.DataFrame:
+    """
+    Long ['date','series', *RISK_COLUMNS, beta_<bench>..., exp_<factor>...] for a
+    date-indexed return Series (series = its name) or a date x series matrix.
+    Benchmarks/factors are aligned to the return dates.
+    """
+    R = returns.to_frame(returns.name or "portfolio") if isinstance(returns, pd.Series) else returns
+    R = R.sort_index()
+    M = R.to_numpy(dtype=np.float64)
+    T, N = M.shape
+    var_h, cvar_h = rolling_var_cvar(M, window, alpha, min_periods)
+    var_p, cvar_p = rolling_parametric_var(M, window, alpha, min_periods)
+    cols = {"var_hist": var_h, "cvar_hist": cvar_h, "var_param": var_p, "cvar_param": cvar_p}
+    if benchmarks is not None:
+        B = benchmarks.reindex(R.index)
+        for name in B.columns:
+            cols[f"beta_{name}"] = rolling_beta(M, B[name].to_numpy(dtype=np.float64), window, min_periods)
+    if factors is not None and len(factors.columns):
+        E = rolling_exposures(M, factors.reindex(R.index).to_numpy(dtype=np.float64), window)
+        for k, name in enumerate(factors.columns):
+            cols[f"exp_{name}"] = E[:, :, k]
+    return pd.DataFrame({
+        "date": np.repeat(R.index.to_numpy(), N),
+        "series": np.tile(np.asarray(R.columns, dtype=object), T),
+        **{c: v.ravel() for c, v in cols.items()},
+    })
@@ -1,12 +1,99 @@
 # src/quant_trader/simulation/vectorized.py
 from __future__ import annotations
+from dataclasses import dataclass
 import numpy as np
 import pandas as pd
 
+from src.quant_trader.utils.panel import Panel
+
+@dataclass
+class TopKPivot:
+    """
+    Date x ticker matrices of a predictions frame, built once and reused by
+    long_only_topk / topk_selections for any K, threshold or holding period.
+
+    pred/true: y_pred / y_true (NaN where the ticker has no usable row that date)
+    order:     position of the row in the input frame (tie-break, as rank(method="first"))
+    """
+    dates: pd.DatetimeIndex
+    tickers: pd.Index
+    pred: np.ndarray
+    true: np.ndarray
+    order: np.ndarray
+
+    @classmethod
+    def from_preds(cls, preds: pd.DataFrame, universe=None, calendar=None) -> "TopKPivot":
+        """
+        Pivot ['ticker','date','y_true','y_pred'] (one row per ticker/date); rows
+        missing either value are dropped, like the long-frame path did.
+        With a `universe` (io.universe.Universe), names that were not members on a
+        date get no score there (one AND with the compiled membership mask).
+        A `calendar` (utils.time.TradingCalendar) codes dates by session id.
+        """
+        y_pred = preds["y_pred"].to_numpy(dtype=np.float64)
+        y_true = preds["y_true"].to_numpy(dtype=np.float64)
+        keep = np.flatnonzero(~np.isnan(y_pred) & ~np.isnan(y_true))
+        panel = Panel.from_long(preds["date"].to_numpy()[keep], preds["ticker"].to_numpy()[keep], calendar)
+        pred = panel.pivot(y_pred[keep])
+        if universe is not None:
+            pred[~universe.compile(panel.dates, panel.tickers).dense()] = np.nan
+        return cls(
+            dates=panel.dates,
+            tickers=panel.tickers,
+            pred=pred,
+            true=panel.pivot(y_true[keep]),
+            order=panel.pivot(keep, fill=np.iinfo(np.int64).max, dtype=np.int64),
+        )
+
+    def select(self, k: int, threshold: float | None = None, holding_days: int = 1) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (row indices of the rebalance dates, boolean selection mask for those rows).
+        """
+        rows = np.arange(0, len(self.dates), max(int(holding_days), 1))
+        scores = self.pred[rows]
+        ok = ~np.isnan(scores)
+        if threshold is not None:
+            ok &= scores > threshold
+        return rows, topk_mask(np.where(ok, scores, -np.inf), k, ok, self.order[rows])
+
+
+def topk_mask(scores: np.ndarray, k: int, valid: np.ndarray, tiebreak: np.ndarray | None = None) -> np.ndarray:
+    """
+    Boolean mask of the k largest valid `scores` per row via np.argpartition.
+
+    Ties at the k-th value go to the smallest `tiebreak` (column order if None), so
+    the result equals ranking each row with rank(method="first") and keeping rank <= k.
+    """
+    n_rows, n_cols = scores.shape
+    if k <= 0 or n_cols == 0:
+        return np.zeros(scores.shape, dtype=bool)
+    if k >= n_cols:
+        return valid.copy()
+    part = np.argpartition(scores, n_cols - k, axis=1)
+    kth = np.take_along_axis(scores, part[:, n_cols - k:n_cols - k + 1], axis=1)
+    mask = valid & (scores > kth)
+    need = k - mask.sum(axis=1)
+    tie = valid & (scores == kth)
+    split = np.flatnonzero(tie.sum(axis=1) > need)    # rows where only some tied names fit
+    if split.size:
+        tb = np.broadcast_to(np.arange(n_cols), scores.shape) if tiebreak is None else tiebreak
+        key = np.where(tie[split], tb[split], np.iinfo(np.int64).max)
+        first = np.argsort(key, axis=1, kind="stable")
+        take = np.arange(n_cols) < need[split, None]
+        sub = np.zeros((split.size, n_cols), dtype=bool)
+        np.put_along_axis(sub, first, take, axis=1)
+        tie[split] = sub
+    return mask | tie
+
+
 def long_only_topk(
     preds: pd.DataFrame,
     k: int = 5,
     threshold: float | None = None,   # NEW optional arg
+    holding_days: int = 1,
+    pivot: TopKPivot | None = None,
+    universe=None,
+    calendar=None,
 ) -> pd.DataFrame:
     """
     Vectorized Long-Only Top-K by predicted return.
@@ -22,38 +109,90 @@ def long_only_topk(
         Max number of assets to hold per day.
     threshold : float, optional
         Only include assets where predicted return > threshold.
+    holding_days : int, default=1
+        Rebalance every `holding_days` dates (non-overlapping holds) for
+        multi-horizon targets where y_true is the `holding_days`-ahead log return.
+    pivot : TopKPivot, optional
+        Precomputed TopKPivot.from_preds(preds); pass it when sweeping K /
+        threshold so the frame is pivoted only once (`preds` is then ignored).
+    universe : io.universe.Universe, optional
+        Only names that were universe members on a date can be selected that date.
+    calendar : utils.time.TradingCalendar, optional
+        Codes dates by session id when the pivot is built here (Panel.from_long).
 
     Returns
     -------
     pd.DataFrame
         ['date','ret_port'] daily portfolio log returns.
     """
-    if preds.empty:
-        return pd.DataFrame(columns=["date", "ret_port"])
+    sel = topk_selections(preds, k=k, threshold=threshold, holding_days=holding_days, pivot=pivot,
+                          universe=universe, calendar=calendar)
+    return sel[["date", "ret_port"]]
 
-    df = preds.copy()
-    df["date"] = pd.to_datetime(df["date"])
-    df = df.dropna(subset=["y_true", "y_pred"])
 
-    # filter by threshold
-    if threshold is not None:
-        df = df[df["y_pred"] > threshold]
-
-    # rank by prediction within each date (higher is better)
-    df["rank"] = df.groupby("date")["y_pred"].rank(method="first", ascending=False)
+def topk_selections(
+    preds: pd.DataFrame,
+    k: int = 5,
+    threshold: float | None = None,
+    holding_days: int = 1,
+    pivot: TopKPivot | None = None,
+    universe=None,
+    calendar=None,
+) -> pd.DataFrame:
+    """
+    Per rebalance date with at least one name selected: ['date','n_selected',
+    'selected' (tuple of tickers), 'ret_port' (equal-weight mean of y_true)].
+    `universe` and `calendar` are used only when the pivot is built here.
+    """
+    if pivot is None:
+        if preds.empty:
+            return pd.DataFrame(columns=["date", "n_selected", "selected", "ret_port"])
+        pivot = TopKPivot.from_preds(preds, universe, calendar)
+    rows, mask = pivot.select(k, threshold, holding_days)
+    counts = mask.sum(axis=1)
+    has = counts > 0
+    with np.errstate(invalid="ignore"):
+        ret = np.nanmean(np.where(mask[has], pivot.true[rows[has]], np.nan), axis=1)
+    tickers = pivot.tickers.to_numpy()
+    return pd.DataFrame({
+        "date": pivot.dates[rows[has]],
+        "n_selected": counts[has],
+        "selected": [tuple(tickers[m]) for m in mask[has]],
+        "ret_port": ret,
+    })
 
-    # select top-k
-    sel = df[df["rank"] <= k].copy()
+def weighted_returns(preds: pd.DataFrame, weights: pd.DataFrame) -> pd.DataFrame:
+    """
+    Portfolio log returns for a date x ticker weight matrix (e.g. from
+    simulation.portfolio.build_weights): ret_port = sum_i w_i * y_true_i per date.
 
-    # equal-weight mean of realized returns per day
-    port = (
-        sel.groupby("date", as_index=False)["y_true"]
-           .mean()
-           .rename(columns={"y_true": "ret_port"})
-           .sort_values("date")
-    )
+    Returns
+    -------
+    pd.DataFrame
+        ['date','ret_port'] for dates with any weight.
+    """
+    if preds.empty or weights.empty:
+        return pd.DataFrame(columns=["date", "ret_port"])
+    df = preds.dropna(subset=["y_true"])
+    d = pd.to_datetime(df["date"])
+    ri = weights.index.get_indexer(d)
+    ci = weights.columns.get_indexer(df["ticker"])
+    ok = (ri >= 0) & (ci >= 0)
+    W = weights.to_numpy(dtype=np.float64)
+    contrib = W[ri[ok], ci[ok]] * df["y_true"].to_numpy(dtype=np.float64)[ok]
+    ret = np.bincount(ri[ok], weights=contrib, minlength=len(weights.index))
+    has = (W != 0).any(axis=1)
+    return pd.DataFrame({"date": weights.index[has], "ret_port": ret[has]}).reset_index(drop=True)
 
-    return port
+def hold_period_rows(df: pd.DataFrame, holding_days: int = 1) -> pd.DataFrame:
+    """
+    Keep only every `holding_days`-th trading date (first date included), so
+    positions opened on one rebalance date are held until the next one.
+    """
+    if holding_days <= 1 or df.empty:
+        return df
+    dates = np.sort(df["date"].unique())
+    return df[df["date"].isin(dates[::holding_days])]
 
 def equity_curve(returns: pd.Series, initial: float = 1.0) -> pd.Series:
     """
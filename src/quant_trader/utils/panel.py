@@ -0,0 +1,74 @@
+# src/quant_trader/utils/panel.py
+from __future__ import annotations
+from dataclasses import dataclass
+import numpy as np
+import pandas as pd
+
+
+@dataclass
+class Panel:
+    """
+    Mapping between a tidy long frame (one row per ticker/date) and a dense
+    date x ticker matrix layout.
+
+    dates/tickers: sorted unique axis labels
+    row/col:       integer date/ticker code of every long row (int32)
+    """
+    dates: pd.DatetimeIndex
+    tickers: pd.Index
+    row: np.ndarray
+    col: np.ndarray
+
+    @classmethod
+    def from_long(cls, dates, tickers, calendar=None) -> "Panel":
+        """
+        Build the layout from the long frame's date and ticker columns (any array-likes).
+
+        With a `calendar` (utils.time.TradingCalendar) dates are coded by session id
+        (a searchsorted over the session index) instead of hashing timestamps; the
+        layout is the same. Falls back to factorizing when a date is not a session.
+        """
+        d = pd.to_datetime(np.asarray(dates))
+        coded = _session_codes(d, calendar) if calendar is not None else None
+        if coded is not None:
+            row, d_uni = coded
+        else:
+            row, d_uni = pd.factorize(d, sort=True)
+        col, t_uni = pd.factorize(np.asarray(tickers), sort=True)
+        return cls(
+            dates=pd.DatetimeIndex(d_uni, name="date"),
+            tickers=pd.Index(t_uni, name="ticker"),
+            row=row.astype(np.int32, copy=False),
+            col=col.astype(np.int32, copy=False),
+        )
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.dates), len(self.tickers)
+
+    def pivot(self, values, fill: float = np.nan, dtype=np.float64) -> np.ndarray:
+        """
+        Long values -> (n_dates, n_tickers) matrix. Cells without a row are `fill`.
+        """
+        M = np.full(self.shape, fill, dtype=dtype)
+        M[self.row, self.col] = np.asarray(values, dtype=dtype)
+        return M
+
+    def unpivot(self, M: np.ndarray) -> np.ndarray:
+        """
+        (n_dates, n_tickers) matrix -> 1D array aligned with the original long rows.
+        """
+        return M[self.row, self.col]
+
+
+def _session_codes(d: pd.DatetimeIndex, calendar) -> tuple[np.ndarray, pd.DatetimeIndex] | None:
+    # (row code per date, sorted unique dates) from session ids; None unless every date is a session
+    if d.tz is not None or not len(d):
+        return None
+    ids = calendar.session_ids(d.values)
+    if (ids < 0).any() or not (d.values == calendar.sessions.values[ids]).all():
+        return None
+    present = np.zeros(len(calendar.sessions), dtype=bool)
+    present[ids] = True
+    code = np.cumsum(present, dtype=np.int32) - 1
+    return code[ids], calendar.sessions[present]
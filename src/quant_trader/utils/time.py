@@ -1,2 +1,281 @@
-from datetime import timezone
+# src/quant_trader/utils/time.py
+"""
+Time helpers and the trading calendar.
+
+    cal = calendar_from_config(cfg)                   # project.calendar (default XNYS), built once
+    ids = cal.session_ids(df["date"])                 # int32 session ids, -1 if not a session
+    panel, M = cal.align(df, ["close", "volume"])     # session x ticker matrices
+
+Calendars are rule-based (no market-calendar dependency):
+  XNYS      NYSE holidays (observed rules, Juneteenth from 2022, special closures),
+            13:00 early closes on Jul 3, the day after Thanksgiving and Dec 24
+  XTSE      TSX holidays (Family/Victoria/Civic days, Boxing Day), 13:00 closes Dec 24 / Dec 31
+  weekdays  every Monday-Friday
+`extra_holidays` / `extra_early_closes` add one-off closures (configs/base.yaml).
+
+Sessions are tz-naive midnight dates, like the `date` column of the price files;
+open/close instants are in the exchange timezone.
+"""
+from __future__ import annotations
+from datetime import date, time, timedelta, timezone
+from functools import lru_cache
+from zoneinfo import ZoneInfo
+
+import numpy as np
+import pandas as pd
+
+from src.quant_trader.utils.panel import Panel
+
 TZ = timezone.utc
+
+# closures outside the yearly rules (national days of mourning, 9/11, Hurricane Sandy)
+_NYSE_SPECIAL = ["2001-09-11", "2001-09-12", "2001-09-13", "2001-09-14", "2004-06-11", "2007-01-02",
+                 "2012-10-29", "2012-10-30", "2018-12-05", "2025-01-09"]
+
+
+def _easter(year: int) -> date:
+    a, b, c = year % 19, year // 100, year % 100
+    d, e = b // 4, b % 4
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = c // 4, c % 4
+    l_ = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * l_) // 451
+    month = (h + l_ - 7 * m + 114) // 31
+    return date(year, month, (h + l_ - 7 * m + 114) % 31 + 1)
+
+
+def _nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """
+    n-th (1-based; -1 = last) `weekday` (Mon=0) of the month.
+    """
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def _nyse_observed(d: date) -> date:
+    return d - timedelta(days=1) if d.weekday() == 5 else d + timedelta(days=1) if d.weekday() == 6 else d
+
+
+def _next_monday_if_weekend(d: date) -> date:
+    return d + timedelta(days=(7 - d.weekday()) % 7) if d.weekday() >= 5 else d
+
+
+def _xnys(year: int) -> tuple[list[date], list[date]]:
+    hol = [
+        _nth_weekday(year, 2, 0, 3),                           # Presidents' Day
+        _easter(year) - timedelta(days=2),                     # Good Friday
+        _nth_weekday(year, 5, 0, -1),                          # Memorial Day
+        _nyse_observed(date(year, 7, 4)),
+        _nth_weekday(year, 9, 0, 1),                           # Labor Day
+        _nth_weekday(year, 11, 3, 4),                          # Thanksgiving
+        _nyse_observed(date(year, 12, 25)),
+    ]
+    if date(year, 1, 1).weekday() != 5:                        # no Friday holiday for a Saturday New Year
+        hol.append(_nyse_observed(date(year, 1, 1)))
+    if year >= 1998:
+        hol.append(_nth_weekday(year, 1, 0, 3))                # Martin Luther King Jr. Day
+    if year >= 2022:
+        hol.append(_nyse_observed(date(year, 6, 19)))          # Juneteenth
+    early = [_nth_weekday(year, 11, 3, 4) + timedelta(days=1)]
+    for d in (date(year, 7, 3), date(year, 12, 24)):
+        if d.weekday() < 4:
+            early.append(d)
+    return hol, early
+
+
+def _xtse(year: int) -> tuple[list[date], list[date]]:
+    xmas = _next_monday_if_weekend(date(year, 12, 25))
+    boxing = max(date(year, 12, 26), xmas + timedelta(days=1))
+    while boxing.weekday() >= 5:
+        boxing += timedelta(days=1)
+    hol = [
+        _next_monday_if_weekend(date(year, 1, 1)),
+        _easter(year) - timedelta(days=2),                     # Good Friday
+        date(year, 5, 24) - timedelta(days=date(year, 5, 24).weekday()),   # Victoria Day
+        _next_monday_if_weekend(date(year, 7, 1)),             # Canada Day
+        _nth_weekday(year, 8, 0, 1),                           # Civic Holiday
+        _nth_weekday(year, 9, 0, 1),                           # Labour Day
+        _nth_weekday(year, 10, 0, 2),                          # Thanksgiving
+        xmas, boxing,
+    ]
+    if year >= 2008:
+        hol.append(_nth_weekday(year, 2, 0, 3))                # Family Day
+    early = [d for d in (date(year, 12, 24), date(year, 12, 31)) if d.weekday() < 5]
+    return hol, early
+
+
+_RULES = {
+    "XNYS": (_xnys, "America/New_York", time(9, 30), time(16, 0), time(13, 0), _NYSE_SPECIAL),
+    "XTSE": (_xtse, "America/Toronto", time(9, 30), time(16, 0), time(13, 0), []),
+    "weekdays": (None, "America/New_York", time(9, 30), time(16, 0), time(13, 0), []),
+}
+CALENDARS = tuple(_RULES)
+
+
+class TradingCalendar:
+    def __init__(self, name: str = "XNYS", start: str = "1990-01-01", end: str = "2035-12-31",
+                 extra_holidays=(), extra_early_closes=()):
+        if name not in _RULES:
+            raise ValueError(f"Unknown calendar {name!r}; expected one of {CALENDARS}")
+        rules, tz, self.open_time, self.close_time, self.early_close_time, special = _RULES[name]
+        self.name, self.tz = name, ZoneInfo(tz)
+        start, end = pd.Timestamp(start).normalize(), pd.Timestamp(end).normalize()
+
+        hol, early = set(), set()
+        if rules is not None:
+            for y in range(start.year, end.year + 1):
+                h, e = rules(y)
+                hol.update(h)
+                early.update(e)
+        hol.update(pd.to_datetime(list(special) + list(extra_holidays)).date)
+        early.update(pd.to_datetime(list(extra_early_closes)).date)
+
+        days = pd.bdate_range(start, end)
+        self.holidays = pd.DatetimeIndex(sorted(d for d in pd.to_datetime(sorted(hol)) if start <= d <= end
+                                                and d.weekday() < 5))
+        self.sessions = days.difference(self.holidays).rename("date")
+        self.early_closes = pd.DatetimeIndex(sorted(pd.to_datetime(sorted(early)))).intersection(self.sessions)
+        self._days = self.sessions.to_numpy(dtype="datetime64[D]").astype(np.int64)
+
+    def __repr__(self) -> str:
+        return (f"TradingCalendar({self.name!r}, {self.sessions[0].date()}..{self.sessions[-1].date()}, "
+                f"{len(self.sessions)} sessions)")
+
+    # ---- session ids -------------------------------------------------------------------
+
+    @staticmethod
+    def _day_ints(dates) -> np.ndarray:
+        arr = np.asarray(dates)
+        if arr.dtype.kind != "M":
+            arr = pd.to_datetime(arr).to_numpy()
+        return arr.astype("datetime64[D]").astype(np.int64)
+
+    def session_ids(self, dates, how: str = "exact") -> np.ndarray:
+        """
+        int32 session id (position in `sessions`) per date.
+
+        how: "exact"    -1 for dates that are not sessions
+             "previous" the last session on or before the date (-1 before the first)
+             "next"     the first session on or after the date (-1 after the last)
+        """
+        d = self._day_ints(dates)
+        if how == "previous":
+            ids = np.searchsorted(self._days, d, side="right") - 1
+        elif how in ("exact", "next"):
+            ids = np.searchsorted(self._days, d, side="left")
+            hit = ids < len(self._days)
+            if how == "exact":
+                hit &= self._days[np.minimum(ids, len(self._days) - 1)] == d
+            ids = np.where(hit, ids, -1)
+        else:
+            raise ValueError(f"how must be exact, previous or next, not {how!r}")
+        return ids.astype(np.int32)
+
+    def is_session(self, dates) -> np.ndarray:
+        return self.session_ids(dates) >= 0
+
+    def offset(self, dates, n: int) -> pd.DatetimeIndex:
+        """
+        The session `n` sessions after (n < 0: before) each date's session
+        (non-sessions count from the previous session).
+        """
+        ids = self.session_ids(dates, how="previous").astype(np.int64) + n
+        if (ids < 0).any() or (ids >= len(self.sessions)).any():
+            raise ValueError("offset falls outside the calendar range")
+        return self.sessions[ids]
+
+    def sessions_in_range(self, start=None, end=None) -> pd.DatetimeIndex:
+        lo = 0 if start is None else int(np.searchsorted(self._days, self._day_ints([start])[0], side="left"))
+        hi = len(self._days) if end is None else int(np.searchsorted(self._days, self._day_ints([end])[0], side="right"))
+        return self.sessions[lo:hi]
+
+    def closes(self, start=None, end=None) -> pd.DatetimeIndex:
+        """
+        Close instant (exchange timezone) of every session in the range, early closes included.
+        """
+        s = self.sessions_in_range(start, end)
+        early = s.isin(self.early_closes)
+        t = np.where(early, self.early_close_time.hour * 60 + self.early_close_time.minute,
+                     self.close_time.hour * 60 + self.close_time.minute)
+        return (s + pd.to_timedelta(t, unit="min")).tz_localize(self.tz)
+
+    # ---- alignment ------------------------------------------------------------------------
+
+    def panel(self, dates, tickers, start=None, end=None) -> Panel:
+        """
+        Panel whose date axis is the calendar's sessions from `start` (default: the
+        first date) to `end` (default: the last date), so every ticker shares one
+        index and rows are found by session id instead of hashing timestamps.
+        All dates must be sessions (see align(), which drops the others).
+        """
+        ids = self.session_ids(dates)
+        if (ids < 0).any():
+            raise ValueError(f"{int((ids < 0).sum())} dates are not {self.name} sessions")
+        lo = int(ids.min()) if start is None else int(self.session_ids([start], how="next")[0])
+        hi = int(ids.max()) if end is None else int(self.session_ids([end], how="previous")[0])
+        if ids.size and (ids.min() < lo or ids.max() > hi):
+            raise ValueError("dates fall outside [start, end]")
+        col, t_uni = pd.factorize(np.asarray(tickers), sort=True)
+        return Panel(
+            dates=self.sessions[lo:hi + 1],
+            tickers=pd.Index(t_uni, name="ticker"),
+            row=(ids - lo).astype(np.int32),
+            col=col.astype(np.int32, copy=False),
+        )
+
+    def align(self, df: pd.DataFrame, columns: list[str], ffill: bool = False,
+              start=None, end=None) -> tuple[Panel, dict[str, np.ndarray]]:
+        """
+        Ragged long ['ticker','date', *columns] -> (panel, {column: sessions x tickers
+        matrix}), NaN where a ticker has no bar. Rows on non-session dates are dropped.
+        With ffill, each ticker's last value is carried forward after its first bar.
+        """
+        ok = self.is_session(df["date"].to_numpy())
+        sub = df if ok.all() else df[ok]
+        panel = self.panel(sub["date"].to_numpy(), sub["ticker"].to_numpy(), start, end)
+        out = {}
+        for c in columns:
+            M = panel.pivot(sub[c].to_numpy(dtype=np.float64))
+            if ffill:
+                M = _ffill_rows(M)
+            out[c] = M
+        return panel, out
+
+
+def _ffill_rows(M: np.ndarray) -> np.ndarray:
+    # forward-fill along axis 0 (dates) without pandas
+    idx = np.where(~np.isnan(M), np.arange(M.shape[0])[:, None], 0)
+    np.maximum.accumulate(idx, axis=0, out=idx)
+    out = M[idx, np.arange(M.shape[1])[None, :]]
+    return out
+
+
+def get_calendar(name: str = "XNYS", start: str = "1990-01-01", end: str = "2035-12-31",
+                 extra_holidays=(), extra_early_closes=()) -> TradingCalendar:
+    """
+    Cached TradingCalendar: the session index is built once per process.
+    """
+    return _cached_calendar(name, str(start), str(end), tuple(map(str, extra_holidays)),
+                            tuple(map(str, extra_early_closes)))
+
+
+@lru_cache(maxsize=8)
+def _cached_calendar(name, start, end, extra_holidays, extra_early_closes) -> TradingCalendar:
+    return TradingCalendar(name, start, end, extra_holidays, extra_early_closes)
+
+
+def calendar_from_config(cfg: dict | None) -> TradingCalendar:
+    """
+    project.calendar (XNYS | XTSE | weekdays) with optional project.calendar_extra:
+    {holidays: [...], early_closes: [...]}.
+    """
+    pcfg = (cfg or {}).get("project", {}) or {}
+    extra = pcfg.get("calendar_extra", {}) or {}
+    return get_calendar(pcfg.get("calendar", "XNYS"),
+                        extra_holidays=extra.get("holidays", []) or [],
+                        extra_early_closes=extra.get("early_closes", []) or [])
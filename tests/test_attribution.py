@@ -0,0 +1,42 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.modeling.attribution import eval_rows, feature_attribution  # noqa: E402
+
+
+def _features(n_dates=200, n_tickers=8):
+    rng = np.random.default_rng(3)
+    dates = pd.bdate_range("2021-01-04", periods=n_dates)
+    n = n_dates * n_tickers
+    df = pd.DataFrame({"date": np.repeat(dates, n_tickers),
+                       "signal": rng.normal(0, 1, n), "weak": rng.normal(0, 1, n), "noise": rng.normal(0, 1, n)})
+    df["target"] = 1.0 * df["signal"] + 0.2 * df["weak"] + rng.normal(0, 0.1, n)
+    return df.sample(frac=1.0, random_state=2).reset_index(drop=True)
+
+
+def test_eval_rows_sample_is_seeded_and_in_block():
+    a = eval_rows(100, 1100, 50, seed=1, fold=2)
+    assert a.size == 50 and a.min() >= 100 and a.max() < 1100 and np.all(np.diff(a) > 0)
+    assert np.array_equal(a, eval_rows(100, 1100, 50, seed=1, fold=2))
+    assert np.array_equal(eval_rows(0, 10, None, 1, 1), np.arange(10))
+
+
+def test_permutation_importance_ranks_features_and_pool_matches_serial(tmp_path):
+    df = _features()
+    kw = dict(feature_names=["noise", "weak", "signal"], model="decision_tree", params={"max_depth": 6},
+              n_folds=3, n_repeats=3, max_eval_rows=300, chunk_rows=128)
+    summary, folds, _ = feature_attribution(df, out_dir=str(tmp_path), max_workers=1, **kw)
+    assert list(summary["feature"][:2]) == ["signal", "weak"]
+    assert summary.loc[summary["feature"] == "signal", "importance_mean"].item() > 0.5
+    assert len(folds) == 3 * 3 * 3 and (folds["n_eval"] == 300).all()
+    assert (tmp_path / "permutation_importance.csv").exists()
+    assert (tmp_path / "permutation_importance_folds.csv").exists()
+
+    pooled, folds2, _ = feature_attribution(df, out_dir=None, max_workers=2, **kw)
+    assert np.allclose(folds2["mse_permuted"], folds["mse_permuted"])
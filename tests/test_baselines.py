@@ -0,0 +1,38 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.modeling.baselines import run_baseline  # noqa: E402
+
+
+def test_run_baseline_time_split_and_min_samples_leaf(tmp_path):
+    dates = pd.date_range("2024-01-01", periods=50, freq="B")
+    rng = np.random.default_rng(0)
+    rows = []
+    for t in ["AAPL", "MSFT", "SPY"]:
+        rows.append(pd.DataFrame({
+            "ticker": t,
+            "date": dates,
+            "ret_1d": rng.normal(0, 0.01, len(dates)),
+            "rsi_14": rng.uniform(0, 100, len(dates)),
+            "target": rng.normal(0, 0.01, len(dates)),
+        }))
+    feat = pd.concat(rows, ignore_index=True)
+    feat.loc[3, "rsi_14"] = np.nan  # dropped before the split
+    feat_path = tmp_path / "features.parquet"
+    feat.to_parquet(feat_path, index=False)
+
+    out_path = tmp_path / "preds.parquet"
+    m = run_baseline(str(feat_path), str(out_path), max_depth=2, min_samples_leaf=5)
+    assert m["min_samples_leaf"] == 5
+    assert m["n_train"] + m["n_test"] == len(feat) - 1
+
+    preds = pd.read_parquet(out_path)
+    assert list(preds.columns) == ["ticker", "date", "y_true", "y_pred"]
+    assert len(preds) == m["n_test"]
+    assert (preds["date"] > pd.Timestamp(m["cutoff"])).all()
@@ -0,0 +1,32 @@
+import subprocess
+import sys
+import pandas as pd
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.cli import COMMANDS, main  # noqa: E402
+
+
+def test_help_does_not_import_heavy_deps():
+    for argv in (["--help"], ["simulate", "--help"], ["train", "--help"]):
+        res = subprocess.run([sys.executable, "-X", "importtime", "-m", "src.quant_trader", *argv],
+                             cwd=REPO, capture_output=True, text=True)
+        assert res.returncode == 0
+        imported = {line.split("|")[-1].strip() for line in res.stderr.splitlines() if line.startswith("import time:")}
+        assert not imported & {"pandas", "sklearn", "optuna", "matplotlib"}, argv
+        if argv == ["--help"]:
+            assert all(cmd in res.stdout for cmd in COMMANDS)
+
+
+def test_dispatch_runs_script(tmp_path, monkeypatch, capsys):
+    (tmp_path / "outputs" / "predictions").mkdir(parents=True)
+    preds = pd.DataFrame({"ticker": ["AAPL"] * 3, "date": pd.date_range("2024-01-02", periods=3),
+                          "y_true": [0.1, 0.2, 0.3], "y_pred": [0.0, 0.1, 0.2]})
+    preds.to_parquet(tmp_path / "outputs" / "predictions" / "baseline.parquet", index=False)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(sys, "argv", list(sys.argv))
+    assert main(["predict"]) == 0
+    assert "rows= 3" in capsys.readouterr().out
@@ -0,0 +1,48 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.simulation.costs import CostInputs, FlatBpsCost, SqrtImpactCost  # noqa: E402
+from src.quant_trader.simulation.exact import run_exact_long_only_topk  # noqa: E402
+
+
+def _data():
+    dates = pd.date_range("2024-01-02", periods=60, freq="B")
+    rng = np.random.default_rng(5)
+    prices, preds = [], []
+    for t in ["AAPL", "MSFT", "NVDA", "SPY"]:
+        close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+        prices.append(pd.DataFrame({"ticker": t, "date": dates, "close": close, "high": close * 1.01,
+                                    "low": close * 0.99, "volume": 50_000.0}))
+        preds.append(pd.DataFrame({"ticker": t, "date": dates, "y_true": rng.normal(0, 0.01, len(dates)),
+                                   "y_pred": rng.normal(0, 0.01, len(dates))}))
+    return pd.concat(prices, ignore_index=True), pd.concat(preds, ignore_index=True)
+
+
+def test_flat_cost_model_matches_legacy_slippage():
+    _, preds = _data()
+    legacy = run_exact_long_only_topk(preds, k=2, slippage_bps=5.0)
+    plugged = run_exact_long_only_topk(preds, k=2, cost_model=FlatBpsCost(5.0))
+    assert np.allclose(legacy["equity"], plugged["equity"])
+
+
+def test_sqrt_impact_costs_and_participation_cap():
+    prices, preds = _data()
+    model = SqrtImpactCost(CostInputs.from_prices(prices), max_participation=None)
+    row, cols = 40, model.inputs.cols(["AAPL", "MSFT"])
+    small, big = model.cost(row, cols, [1e4, 1e4]), model.cost(row, cols, [1e6, 1e6])
+    assert (big / 1e6 > small / 1e4).all()  # impact grows faster than linear
+
+    pricier = model.with_params(impact_coef=5.0)
+    assert pricier.inputs is model.inputs
+    assert (pricier.cost(row, cols, [1e6, 1e6]) > big).all()
+
+    # $5M per name against ~$5M ADV with a 1% cap: nothing is tradable after warm-up
+    capped = run_exact_long_only_topk(preds, k=2, initial_capital=1e7,
+                                      cost_model=model.with_params(max_participation=0.01))
+    assert (capped["positions"].iloc[25:] == "").all()
@@ -0,0 +1,94 @@
+import sys
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.automation.cron import CronExpr, FakeClock, Job, RunHistory, Scheduler  # noqa: E402
+
+TZ = ZoneInfo("America/Toronto")
+
+
+def test_cron_next_after_weekdays_and_dst():
+    e = CronExpr.parse("15 17 * * 1-5")
+    fri_evening = datetime(2025, 1, 3, 23, 0, tzinfo=timezone.utc)  # 18:00 Toronto, Friday
+    nxt = e.next_after(fri_evening, TZ)
+    assert (nxt.weekday(), nxt.hour, nxt.minute) == (0, 17, 15)
+    # 02:30 does not exist on 2025-03-09 in Toronto: the next run is the day after
+    nxt = CronExpr.parse("30 2 * * *").next_after(datetime(2025, 3, 8, 12, tzinfo=timezone.utc), TZ)
+    assert nxt.date().isoformat() == "2025-03-10"
+    assert CronExpr.parse("0 0 * * 7").weekday == frozenset({0})
+
+
+def test_group_limits_overlap_and_retries(tmp_path):
+    clock = FakeClock(datetime(2025, 1, 6, 21, 59, tzinfo=timezone.utc))  # 16:59 Toronto, Monday
+    release = threading.Event()
+    active, peak = {"features": 0}, {"features": 0}
+    lock = threading.Lock()
+
+    def fetch():
+        release.wait(5)
+
+    def features():
+        with lock:
+            active["features"] += 1
+            peak["features"] = max(peak["features"], active["features"])
+        release.wait(5)
+        with lock:
+            active["features"] -= 1
+
+    jobs = [Job(f"fetch_{p}", "0 17 * * 1-5", fn=fetch, group="fetch") for p in ("yahoo", "av", "fred")]
+    jobs += [Job(f"features_{i}", "0 17 * * 1-5", fn=features, group="features") for i in range(2)]
+    sched = Scheduler(jobs, tz="America/Toronto", max_workers=8, group_limits={"fetch": 3, "features": 1},
+                      clock=clock, history=RunHistory(tmp_path / "history.sqlite"))
+
+    clock.advance(60)
+    started = sched.tick()
+    assert {"fetch_yahoo", "fetch_av", "fetch_fred"} <= set(started)   # providers concurrently
+    assert sum(n.startswith("features") for n in started) == 1                  # features serialized
+
+    clock.advance(24 * 3600)   # next day fires while everything is still blocked
+    sched.tick()
+    release.set()
+    sched.wait()
+    sched.shutdown()
+
+    rows = sched.history.rows()
+    assert peak["features"] == 1
+    assert {r["job"] for r in rows if r["status"] == "skipped"} >= {"fetch_yahoo", "features_1"}
+    assert any(s["job"] == "fetch_av" and s["ok"] == 1 for s in sched.history.summary())
+
+
+def test_retries_are_recorded():
+    calls = []
+
+    def flaky():
+        calls.append(1)
+        if len(calls) < 3:
+            raise RuntimeError("provider down")
+
+    clock = FakeClock(datetime(2025, 1, 6, 12, 0, tzinfo=timezone.utc))
+    sched = Scheduler([Job("flaky", "* * * * *", fn=flaky, retries=2, retry_delay=60)], clock=clock)
+    clock.advance(60)
+    sched.tick()
+    sched.wait()
+    sched.shutdown()
+    rows = sched.history.rows("flaky")
+    assert [r["status"] for r in rows] == ["failed", "failed", "ok"]
+    assert [r["attempt"] for r in rows] == [1, 2, 3]
+    assert "provider down" in rows[0]["error"]
+
+
+def test_command_job_hard_timeout():
+    job = Job("sleepy", "* * * * *", command=[sys.executable, "-c", "import time; time.sleep(5)"], timeout=0.2)
+    clock = FakeClock(datetime(2025, 1, 6, 12, 0, tzinfo=timezone.utc))
+    sched = Scheduler([job], clock=clock)
+    clock.advance(60)
+    sched.tick()
+    sched.wait()
+    sched.shutdown()
+    assert sched.history.rows("sleepy")[0]["status"] == "timeout"
@@ -0,0 +1,110 @@
+import json
+import sys
+from functools import partial
+import threading
+import urllib.error
+import urllib.request
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.automation.daemon import Worker, WorkerServer, call as _call  # noqa: E402
+
+
+def _prices(n_days=80):
+    dates = pd.date_range("2024-01-02", periods=n_days, freq="B")
+    rng = np.random.default_rng(2)
+    return pd.concat([pd.DataFrame({"ticker": t, "date": dates, "volume": 1e6,
+                                    "close": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n_days)))})
+                      for t in ["AAPL", "MSFT", "NVDA"]], ignore_index=True)
+
+
+def _post(port, cmd, body=b"{}", headers=None):
+    req = urllib.request.Request(f"http://127.0.0.1:{port}/{cmd}", data=body, headers=headers or {}, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=5) as r:
+            return r.status
+    except urllib.error.HTTPError as e:
+        return e.code
+
+
+def test_daemon_commands_round_trip(tmp_path):
+    path = tmp_path / "prices.parquet"
+    _prices().assign(DGS10=4.0).to_parquet(path, index=False)      # a macro column the store does not load
+    worker = Worker(str(path), models_yaml=str(tmp_path / "missing.yaml"), cache_dir=None)
+    server = WorkerServer(worker, port=0, config_files=[], token="s3cret")
+    port = server.server_address[1]
+    call = partial(_call, token="s3cret")
+    thread = threading.Thread(target=server.serve_until_stopped, daemon=True)
+    thread.start()
+    try:
+        status = call("status", port=port)
+        assert status["rows"] == 240 and status["tickers"] == 3
+
+        first = call("simulate", port=port, k=2)
+        assert call("simulate", port=port, k=2) == first  # memoized until state changes
+        assert first["N"] > 0
+
+        last = pd.Timestamp(status["last_date"])
+        bars = [{"ticker": t, "date": last + pd.offsets.BDay(1), "close": 100.0, "volume": 1e6}
+                for t in ["AAPL", "MSFT", "NVDA"]]
+        bad = [{"ticker": "AAPL", "date": last + pd.offsets.BDay(1), "close": -1.0, "volume": 1e6}]
+        res = call("append", port=port, bars=bad)                 # quarantined by io.quality, nothing stored
+        assert res["appended"] == 0 and res["quarantined"] == 1 and res["rows"] == 240
+        res = call("append", port=port, bars=bars)
+        assert res["rows"] == 243 and res["quarantined"] == 0
+        saved = pd.read_parquet(path)
+        assert saved.shape[0] == 243 and "DGS10" in saved  # persisted, extra columns kept
+        assert (saved.dropna(subset=["DGS10"]).shape[0] == 240) and (saved["DGS10"].dropna() == 4.0).all()
+        scores = call("score", port=port)
+        assert {s["ticker"] for s in scores} == {"AAPL", "MSFT", "NVDA"}
+        assert all(pd.Timestamp(s["date"]) == last + pd.offsets.BDay(1) for s in scores)
+        assert call("simulate", port=port, k=2)["version"] > first["version"]
+
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/status", timeout=5) as r:
+            assert json.loads(r.read())["result"]["rows"] == 243
+        try:
+            urllib.request.urlopen(f"http://127.0.0.1:{port}/shutdown", timeout=5)
+        except urllib.error.HTTPError as e:
+            assert e.code == 405
+        else:
+            raise AssertionError("GET must not run commands")
+        assert server.stop is None
+
+        # cross-origin style requests: wrong content type, or no token for a mutating command
+        assert _post(port, "shutdown", headers={"Content-Type": "text/plain"}) == 415
+        assert _post(port, "shutdown", headers={"Content-Type": "application/json"}) == 403
+        assert _post(port, "fit", headers={"Content-Type": "application/json", "X-Daemon-Token": "nope"}) == 403
+        assert _post(port, "status", headers={"Content-Type": "application/json"}) == 200
+        assert server.stop is None
+
+        try:
+            call("nope", port=port)
+        except RuntimeError as e:
+            assert "unknown command" in str(e)
+        else:
+            raise AssertionError("expected an error")
+    finally:
+        call("shutdown", port=port)
+        thread.join(timeout=5)
+    assert server.stop == "shutdown"
+
+
+def test_reload_rereads_configs(tmp_path):
+    path = tmp_path / "prices.parquet"
+    _prices().to_parquet(path, index=False)
+    models, strategy = tmp_path / "models.yaml", tmp_path / "strategy.yaml"
+    models.write_text("targets: {horizon_days: 1}\n")
+    worker = Worker(str(path), models_yaml=str(models), strategy_path=str(strategy), cache_dir=None, persist=False)
+    assert worker.store.target_name == "fwd_ret_1d" and worker.sim_defaults["slippage_bps"] == 5.0
+
+    models.write_text("targets: {horizon_days: 5, horizons: [5]}\n")
+    strategy.write_text("simulation: {slippage_bps: 20, initial_capital: 5000}\n")
+    res = worker.reload()
+    assert worker.store.target_name == "fwd_ret_5d" and res["simulation"]["slippage_bps"] == 20.0
+    explicit = worker.simulate(k=2, exact=True, initial_capital=5000, slippage_bps=20)
+    assert worker.simulate(k=2, exact=True)["final_equity"] == explicit["final_equity"]
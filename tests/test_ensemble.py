@@ -0,0 +1,79 @@
+import json
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.modeling import ensemble  # noqa: E402
+from src.quant_trader.modeling.baselines import run_baseline  # noqa: E402
+from src.quant_trader.modeling.ensemble import fold_bounds, register_model, run_ensemble  # noqa: E402
+
+
+def _features(n_dates=150, tickers=("AAA", "BBB", "CCC", "DDD", "EEE", "FFF")):
+    rng = np.random.default_rng(9)
+    dates = pd.bdate_range("2022-01-03", periods=n_dates)
+    n = n_dates * len(tickers)
+    df = pd.DataFrame({"ticker": np.tile(tickers, n_dates), "date": np.repeat(dates, len(tickers)),
+                       "ret_1d": rng.normal(0, 0.01, n), "rsi_14": rng.uniform(0, 100, n)})
+    df["target"] = 0.5 * df["ret_1d"] + 1e-4 * (df["rsi_14"] - 50) + rng.normal(0, 0.003, n)
+    return df.sample(frac=1.0, random_state=1).reset_index(drop=True)
+
+
+def test_fold_bounds_never_split_a_date():
+    d = np.repeat(np.arange(10), 7)
+    b = fold_bounds(d, 3)
+    assert b[0] == 0 and b[-1] == d.size and len(b) == 5
+    assert all(d[i - 1] != d[i] for i in b[1:-1])
+
+
+def test_blends_and_cache_reuse(tmp_path):
+    df = _features()
+    register_model("not_installed", "no_such_package_xyz", "Regressor")
+    models = {"decision_tree": {"max_depth": 3}, "ridge": {}, "not_installed": {}}
+    cache = tmp_path / "cache"
+    metrics, preds = run_ensemble(df, out_dir=str(tmp_path), models=models, cache_dir=str(cache))
+
+    assert set(metrics.loc[metrics["kind"] == "base", "name"]) == {"decision_tree", "ridge"}
+    for kind in ("equal", "rank", "stacked"):
+        out = pd.read_parquet(tmp_path / f"ensemble_{kind}.parquet")
+        assert list(out.columns) == ["ticker", "date", "y_true", "y_pred"]
+    assert (tmp_path / "ensemble_metrics.csv").exists()
+
+    # base decision tree = run_baseline on the same split; equal blend = mean of the bases
+    _, base = run_baseline(df, out_path=None, return_predictions=True)
+    base = base.to_pandas().sort_values(["date", "ticker"]).reset_index(drop=True)
+    eq = preds["equal"].to_pandas().sort_values(["date", "ticker"]).reset_index(drop=True)
+    assert np.array_equal(base["y_true"], eq["y_true"])
+    files = sorted(cache.glob("*.npz"))
+    assert len(files) == 2
+    loaded = {f.name.split("-")[0]: np.load(f) for f in files}
+    assert np.allclose(loaded["decision_tree"]["test"].mean(), base["y_pred"].mean())
+    assert np.isnan(loaded["ridge"]["oof"]).any() and not np.isnan(loaded["ridge"]["oof"]).all()
+
+    rank = preds["rank"].to_pandas()
+    assert rank["y_pred"].between(-0.5, 0.5).all()
+    detail = metrics.set_index("name").loc["stacked", "detail"]
+    assert all(w >= 0 for w in json.loads(detail)["weights"].values())
+
+    # a second run with a new blend list reads the cache: no base model is fit again
+    calls = []
+    real = ensemble.make_estimator
+
+    def counting(name, params=None, random_state=42):
+        est = real(name, params, random_state)
+        if est is not None:
+            fit = est.fit
+            est.fit = lambda *a, **k: (calls.append(name), fit(*a, **k))[1]
+        return est
+
+    ensemble.make_estimator = counting
+    try:
+        m2, p2 = run_ensemble(df, out_dir=None, models=models, blends=["stacked"], cache_dir=str(cache))
+    finally:
+        ensemble.make_estimator = real
+    assert calls == [] and list(p2) == ["stacked"]
+    assert np.isclose(m2.set_index("name").loc["stacked", "r2"], metrics.set_index("name").loc["stacked", "r2"])
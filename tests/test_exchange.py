@@ -0,0 +1,52 @@
+import sys
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.io.exchange import StageExchange  # noqa: E402
+from src.quant_trader.modeling.baselines import run_baseline  # noqa: E402
+
+
+def _features():
+    dates = pd.date_range("2024-01-01", periods=40, freq="B")
+    rng = np.random.default_rng(1)
+    return pd.concat([pd.DataFrame({
+        "ticker": t, "date": dates,
+        "ret_1d": rng.normal(0, 0.01, len(dates)),
+        "rsi_14": rng.uniform(0, 100, len(dates)),
+        "target": rng.normal(0, 0.01, len(dates)),
+    }) for t in ["AAPL", "MSFT", "SPY"]], ignore_index=True)
+
+
+def test_in_memory_handoff_matches_parquet_round_trip(tmp_path):
+    feat = _features()
+    feat_path = tmp_path / "features.parquet"
+    feat.to_parquet(feat_path, index=False)
+    want = run_baseline(str(feat_path), str(tmp_path / "disk.parquet"), max_depth=2)
+
+    with StageExchange() as ex:
+        table = ex.put("features", feat, path=tmp_path / "async" / "features.parquet")
+        assert ex.get("features") is table and ex.get_pandas("features") is feat
+        got, preds = run_baseline(table, out_path=None, max_depth=2, return_predictions=True)
+        ex.put("predictions", preds, path=tmp_path / "async" / "preds.parquet")
+        assert isinstance(ex.get("predictions"), pa.Table)
+        assert ex.get_pandas("predictions") is ex.get_pandas("predictions")   # converted once
+    assert got == want
+    assert pd.read_parquet(tmp_path / "async" / "features.parquet").equals(feat)
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "async" / "preds.parquet"),
+                                  pd.read_parquet(tmp_path / "disk.parquet"))
+    assert not list((tmp_path / "async").glob(".*.tmp"))
+
+
+def test_failed_background_write_is_raised(tmp_path):
+    (tmp_path / "blocker").write_text("a file, not a directory")
+    ex = StageExchange()
+    ex.put("x", pa.table({"a": [1, 2]}), path=tmp_path / "blocker" / "x.parquet")
+    with pytest.raises(OSError, match="x.parquet"):
+        ex.close()
@@ -0,0 +1,85 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.io.experiments import ExperimentStore  # noqa: E402
+from src.quant_trader.simulation.metrics import summarize  # noqa: E402
+
+
+def _port(seed, n=30):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"date": pd.date_range("2024-01-02", periods=n, freq="B"),
+                         "ret_port": rng.normal(0.001 * seed, 0.01, n)})
+
+
+def test_record_query_and_compact(tmp_path):
+    store = ExperimentStore(tmp_path / "exp")
+    ids = [store.record(_port(s), kind="vec", params={"k": s}) for s in range(5)]
+    store.record(_port(9), kind="exact")
+
+    runs = store.runs(kind="vec")
+    assert len(runs) == 5 and set(runs["run_id"]) == set(ids)
+    r = runs.set_index("run_id").loc[ids[2]]
+    assert np.isclose(r["Sharpe"], summarize(_port(2))["Sharpe"])
+
+    store.compact()
+    assert len(list((tmp_path / "exp" / "runs").glob("*.parquet"))) == 1
+    best = store.top(2, by="CAGR", kind="vec")
+    rets = store.returns(best["run_id"], columns=["date", "ret_port"])
+    assert set(rets["run_id"]) == set(best["run_id"]) and len(rets) == 60
+
+
+def test_ingest_legacy_files_once(tmp_path):
+    bt = tmp_path / "backtests"
+    bt.mkdir()
+    _port(1).to_parquet(bt / "vec_k5.parquet", index=False)
+    store = ExperimentStore(tmp_path / "exp")
+    assert len(store.ingest_files(sorted(bt.glob("vec_*.parquet")))) == 1
+    assert store.ingest_files(sorted(bt.glob("vec_*.parquet"))) == []
+    assert store.runs()["name"].tolist() == ["vec_k5"]
+
+
+def test_reingest_and_replace_update_by_name(tmp_path):
+    import os
+    bt = tmp_path / "backtests"
+    bt.mkdir()
+    f = bt / "vec_k5.parquet"
+    _port(1).to_parquet(f, index=False)
+    store = ExperimentStore(tmp_path / "exp")
+    store.ingest_files([f])
+    store.compact()
+
+    _port(2).to_parquet(f, index=False)                     # a later run rewrites the file
+    st = f.stat()
+    os.utime(f, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert len(store.ingest_files([f])) == 1
+    runs = store.runs()
+    assert runs["name"].tolist() == ["vec_k5"]
+    assert np.isclose(runs["Sharpe"].item(), summarize(_port(2))["Sharpe"])
+    assert len(store.returns(runs["run_id"])) == 30
+
+    for s in (3, 4):
+        store.record(_port(s), kind="exact", name="exact_k5", replace=True)
+    exact = store.runs(kind="exact")
+    assert len(exact) == 1 and np.isclose(exact["Sharpe"].item(), summarize(_port(4))["Sharpe"])
+    all_rets = store.returns(store.runs()["run_id"])
+    assert len(all_rets) == 60
+
+
+def test_ingest_keeps_runs_recorded_with_their_file(tmp_path):
+    import json
+    f = tmp_path / "exact_k5.parquet"
+    _port(1).to_parquet(f, index=False)
+    store = ExperimentStore(tmp_path / "exp")
+    store.record(_port(1), kind="exact", name=f.stem, params={"k": 5}, replace=True, source_file=f)
+    legacy = tmp_path / "vec_k5.parquet"                     # recorded before file mtimes were stored
+    _port(2).to_parquet(legacy, index=False)
+    store.record(_port(2), kind="vec", name=legacy.stem, params={"k": 5, "position_sizing": "equal"})
+    assert store.ingest_files([f, legacy]) == []
+    params = store.runs().set_index("name")["params"].map(json.loads)
+    assert params["exact_k5"]["k"] == 5 and params["vec_k5"]["position_sizing"] == "equal"
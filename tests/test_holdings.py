@@ -0,0 +1,60 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.simulation.exact import run_exact_long_only_topk  # noqa: E402
+from src.quant_trader.simulation.holdings import rebalance_schedule, run_holdings_topk  # noqa: E402
+
+
+def _preds(n_dates=30, tickers="ABCDEF", seed=0):
+    rng = np.random.default_rng(seed)
+    dates = pd.bdate_range("2024-01-01", periods=n_dates)
+    n = n_dates * len(tickers)
+    return pd.DataFrame({"date": np.repeat(dates, len(tickers)), "ticker": np.tile(list(tickers), n_dates),
+                         "y_true": rng.normal(0, 0.02, n), "y_pred": rng.normal(0, 0.01, n)})
+
+
+def _reference(preds, k, rule, drift_threshold, bps):
+    # per-name dict bookkeeping the array engine replaces
+    sched = dict(zip(sorted(preds["date"].unique()), rebalance_schedule(
+        pd.DatetimeIndex(sorted(preds["date"].unique())), rule)))
+    w, wealth, out = {}, 100_000.0, []
+    for d, day in preds.groupby("date", sort=True):
+        top = day.sort_values("y_pred", ascending=False, kind="stable").head(k)["ticker"]
+        target = {t: 1.0 / len(top) for t in top}
+        names = set(w) | set(target)
+        dist = 0.5 * sum(abs(target.get(t, 0.0) - w.get(t, 0.0)) for t in names)
+        turnover = 0.0
+        if sched[d] or (rule == "threshold" and dist > drift_threshold):
+            wealth -= wealth * dist * bps / 1e4
+            w, turnover = dict(target), dist
+        r = dict(zip(day["ticker"], np.expm1(day["y_true"])))
+        gross = sum(wt * r[t] for t, wt in w.items())
+        wealth *= 1 + gross
+        w = {t: wt * (1 + r[t]) / (1 + gross) for t, wt in w.items()}
+        out.append((d, wealth, turnover))
+    return pd.DataFrame(out, columns=["date", "equity", "turnover"])
+
+
+def test_drifting_book_matches_reference_for_each_rule():
+    preds = _preds()
+    for rule, thr in [("daily", 0.05), ("weekly", 0.05), ("monthly", 0.05), ("threshold", 0.6)]:
+        got = run_holdings_topk(preds, k=2, rebalance=rule, drift_threshold=thr, slippage_bps=10.0)
+        ref = _reference(preds, 2, rule, thr, 10.0)
+        assert np.allclose(got["equity"], ref["equity"]) and np.allclose(got["turnover"], ref["turnover"])
+    weekly = run_holdings_topk(preds, k=2, rebalance="weekly")
+    assert weekly["rebalanced"].tolist() == [d.weekday() == 0 for d in weekly["date"]]
+
+
+def test_without_returns_matches_target_reset_engine():
+    preds = _preds(seed=1).assign(y_true=0.0)
+    ex = run_exact_long_only_topk(preds, k=3, slippage_bps=5.0, commission_per_trade=1.0)
+    got = run_holdings_topk(preds, k=3, slippage_bps=5.0, commission_per_trade=1.0)
+    for c in ["equity", "turnover", "cost_value"]:
+        assert np.allclose(got[c], ex[c])
+    assert got["positions"].tolist() == ex["positions"].tolist()
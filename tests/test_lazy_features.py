@@ -0,0 +1,90 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.features.lazy import FeatureStore  # noqa: E402
+from src.quant_trader.features.feature_set import build_feature_matrix  # noqa: E402
+
+
+def _prices():
+    dates = pd.date_range("2024-01-02", periods=60, freq="B")
+    rng = np.random.default_rng(3)
+    return pd.concat([
+        pd.DataFrame({"ticker": t, "date": dates[i * 5:],
+                      "close": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates) - i * 5)))})
+        for i, t in enumerate(["AAPL", "MSFT", "SPY"])
+    ], ignore_index=True)
+
+
+def test_lazy_features_match_feature_matrix_and_memoize(tmp_path):
+    prices = _prices()
+    fs = FeatureStore(prices, cache_dir=str(tmp_path))
+    df = fs.get(["ret_1d", "rsi_14", "target"])
+    assert "ret_5d" not in fs.stats["computed"]  # only what was asked for
+
+    X, y, _ = build_feature_matrix(prices, {})
+    ref = X.assign(target=y).reset_index()
+    m = ref.merge(df, on=["ticker", "date"], suffixes=("_ref", ""))
+    assert len(m) == len(ref)
+    for c in ("ret_1d", "rsi_14", "target"):
+        assert np.allclose(m[c], m[f"{c}_ref"])
+
+    fs2 = FeatureStore(prices, cache_dir=str(tmp_path))
+    fs2.get(["rsi_14", "bb_width_20"])
+    assert fs2.stats["loaded"] == ["rsi_14"]
+    assert "bb_width_20" in fs2.stats["computed"]
+
+
+def test_append_matches_full_recompute():
+    rng = np.random.default_rng(4)
+    dates = pd.bdate_range("2015-01-01", periods=1200)
+    prices = pd.concat([pd.DataFrame({"ticker": t, "date": dates[:n], "volume": 1e6,
+                                      "close": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))})
+                        for t, n in [("AAPL", 1200), ("MSFT", 900), ("NVDA", 30)]], ignore_index=True)
+    names = ["ret_1d", "rsi_14", "sma_20", "ema_10", "target", "fwd_ret_5d"]
+    cut = prices.groupby("ticker")["date"].transform("max") - pd.offsets.BDay(2)
+    old, bars = prices[prices["date"] <= cut], prices[prices["date"] > cut]
+
+    store = FeatureStore(old, cache_dir=None)
+    for n in names:
+        store.column(n)
+    appended = store.append(bars)
+    full = FeatureStore(prices, cache_dir=None)
+
+    assert appended.stats["computed"] == []  # carried over, nothing recomputed on the new store
+    assert appended.prices[["ticker", "date"]].equals(full.prices[["ticker", "date"]])
+    for n in names:
+        assert np.allclose(appended.column(n), full.column(n), equal_nan=True, rtol=1e-9, atol=1e-9), n
+
+
+def test_target_alias_follows_targets_config():
+    prices = _prices()
+    tcfg = {"horizon_days": 5, "horizons": [5]}
+    fs = FeatureStore(prices, cache_dir=None, targets=tcfg)
+    df = fs.get(["ret_1d", "rsi_14", "target"])
+    assert np.allclose(df["target"], fs.column("fwd_ret_5d"), equal_nan=True)
+
+    X, y, _ = build_feature_matrix(prices, {"targets": tcfg})
+    m = y.rename("target_ref").reset_index().merge(df, on=["ticker", "date"])
+    assert len(m) == len(y) and np.allclose(m["target"], m["target_ref"])
+
+
+def test_classification_target_uses_label_threshold(tmp_path):
+    prices = _prices()
+    tcfg = {"type": "classification", "horizon_days": 1, "label_threshold": 0.005}
+    fs = FeatureStore(prices, cache_dir=str(tmp_path), targets=tcfg)
+    df = fs.get(["target"])
+    _, y, _ = build_feature_matrix(prices, {"targets": tcfg})
+    m = y.rename("target_ref").reset_index().merge(df, on=["ticker", "date"])
+    assert len(m) == len(y) and (m["target"] == m["target_ref"]).all()
+
+    # the threshold is part of the cache key: a 0 threshold does not reuse those labels
+    fs0 = FeatureStore(prices, cache_dir=str(tmp_path), targets={**tcfg, "label_threshold": 0.0})
+    assert fs0.cache_key("fwd_up_1d") != fs.cache_key("fwd_up_1d")
+    fs0.get(["target"])
+    assert "fwd_up_1d" in fs0.stats["computed"]
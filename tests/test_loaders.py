@@ -0,0 +1,89 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.io.loaders import (  # noqa: E402
+    PRICE_COLUMNS, RecordedTransport, _download_yahoo, _wide_to_long, fetch_all, last_dates,
+)
+
+TICKERS = ["AAPL", "MSFT", "NVDA", "SPY", "V"]
+
+
+def _yahoo_wide(dates, tickers):
+    # the (field, ticker) layout yfinance.download returns for several tickers
+    rng = np.random.default_rng(0)
+    fields = ["Adj Close", "Close", "High", "Low", "Open", "Volume"]
+    cols = pd.MultiIndex.from_product([fields, tickers], names=["Price", "Ticker"])
+    wide = pd.DataFrame(rng.uniform(10, 20, (len(dates), len(cols))), index=dates, columns=cols)
+    wide.index.name = "Date"
+    if "NVDA" in tickers:
+        wide.loc[dates[:3], (slice(None), "NVDA")] = np.nan  # not listed yet
+    return wide
+
+
+def test_chunked_download_from_recorded_fixture(tmp_path):
+    dates = pd.date_range("2024-01-02", periods=10, freq="B")
+    path = tmp_path / "yahoo.parquet"
+    RecordedTransport.record(lambda t, s, e: _yahoo_wide(dates, t), TICKERS, None, None, str(path))
+    transport = RecordedTransport(str(path))
+
+    got = _download_yahoo(TICKERS, "2024-01-01", "2024-02-01", chunk_size=2, max_workers=3, transport=transport)
+    assert sorted(len(c[0]) for c in transport.calls) == [1, 2, 2]
+    assert list(got.columns) == PRICE_COLUMNS
+    assert len(got) == 5 * 10 - 3
+    wide = _yahoo_wide(dates, TICKERS)
+    row = got[(got["ticker"] == "MSFT") & (got["date"] == dates[4])].iloc[0]
+    assert row["adj_close"] == wide.loc[dates[4], ("Adj Close", "MSFT")]
+    assert row["volume"] == wide.loc[dates[4], ("Volume", "MSFT")]
+    assert got.equals(got.sort_values(["ticker", "date"]).reset_index(drop=True))
+
+    # incremental: only bars after each ticker's last stored date, one request per start date
+    stored = got[got["date"] <= dates[5]]
+    stored = stored[~((stored["ticker"] == "V") & (stored["date"] > dates[2]))]
+    transport.calls.clear()
+    new = _download_yahoo(TICKERS, "2024-01-01", "2024-02-01", chunk_size=10, transport=transport,
+                          since=last_dates(stored))
+    assert sorted(c[1] for c in transport.calls) == [dates[3].strftime("%Y-%m-%d"), dates[6].strftime("%Y-%m-%d")]
+    merged = pd.concat([stored, new]).sort_values(["ticker", "date"]).reset_index(drop=True)
+    pd.testing.assert_frame_equal(merged, got)
+
+    # fetch_all wires the configured chunking / incremental mode through
+    cfg = {"data": {"tickers": TICKERS, "start_date": "2024-01-01", "end_date": "2024-02-01"},
+           "sources": {"yahoo": {"use": True, "chunk_size": 3}, "fred": {"use": False}}}
+    pd.testing.assert_frame_equal(fetch_all(cfg, transport=transport), got)
+    assert fetch_all(cfg, existing=got, transport=transport).empty
+
+
+def test_incremental_refetches_restated_history(tmp_path):
+    dates = pd.date_range("2024-01-02", periods=10, freq="B")
+    tickers = ["AAPL", "MSFT"]
+    wide = _yahoo_wide(dates, tickers)
+    stored = _download_yahoo(tickers, None, None, transport=lambda t, s, e: wide)
+    stored = stored[stored["date"] <= dates[5]].reset_index(drop=True)
+
+    # a 2:1 split after the stored bars restates AAPL's whole history
+    restated = wide.copy()
+    restated.loc[:, (["Close", "Adj Close"], "AAPL")] /= 2
+    path = tmp_path / "yahoo.parquet"
+    RecordedTransport.record(lambda t, s, e: restated, tickers, None, None, str(path))
+    transport = RecordedTransport(str(path))
+    cfg = {"data": {"tickers": tickers, "start_date": "2024-01-01", "end_date": "2024-02-01"},
+           "sources": {"yahoo": {"use": True}, "fred": {"use": False}}}
+    new = fetch_all(cfg, existing=stored, transport=transport)
+
+    assert transport.calls[0][1] == dates[5].strftime("%Y-%m-%d")  # overlaps the last stored bar
+    aapl, msft = new[new["ticker"] == "AAPL"], new[new["ticker"] == "MSFT"]
+    assert len(aapl) == 10 and np.allclose(aapl["close"], restated[("Close", "AAPL")])
+    assert list(msft["date"]) == list(dates[6:])                    # unchanged: only the new bars
+
+
+def test_single_ticker_flat_columns():
+    dates = pd.date_range("2024-01-02", periods=3, freq="B")
+    wide = _yahoo_wide(dates, ["SPY"]).droplevel("Ticker", axis=1)
+    long = _wide_to_long(wide, ["SPY"])
+    assert long["ticker"].tolist() == ["SPY"] * 3 and long["date"].tolist() == list(dates)
@@ -0,0 +1,77 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.features.market_regime import (  # noqa: E402
+    rolling_extreme, rolling_extreme_deque, build_regime_features, filter_by_regime, expanding_percentile,
+)
+from src.quant_trader.features.feature_set import build_feature_matrix  # noqa: E402
+
+
+def test_rolling_extreme_matches_pandas():
+    rng = np.random.default_rng(1)
+    M = rng.normal(size=(300, 4))
+    M[rng.random(M.shape) < 0.1] = np.nan
+    df = pd.DataFrame(M)
+    for w in (1, 7, 60):
+        ref_max = df.rolling(w, min_periods=1).max().values
+        assert np.allclose(rolling_extreme(M, w, "max", 1), ref_max, equal_nan=True)
+        assert np.allclose(rolling_extreme(M, w, "min", w), df.rolling(w).min().values, equal_nan=True)
+        assert np.allclose(rolling_extreme_deque(M[:, 0], w, "max", 1), ref_max[:, 0], equal_nan=True)
+
+
+def test_regime_features_join_and_filter():
+    dates = pd.date_range("2023-01-02", periods=120, freq="B")
+    rng = np.random.default_rng(2)
+    prices = pd.concat([
+        pd.DataFrame({"ticker": t, "date": dates,
+                      "close": 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))})
+        for t in ["AAPL", "MSFT", "SPY"]
+    ])
+    reg = build_regime_features(prices, {"regime": {"vol_min_periods": 20}})
+    assert len(reg) == len(prices)
+    assert reg["near_52w_low"].dtype == bool
+    assert reg.groupby("date")["breadth_above_sma200"].nunique(dropna=False).max() == 1
+
+    preds = prices[["ticker", "date"]].assign(y_true=0.0, y_pred=0.0)
+    kept = filter_by_regime(preds, reg, ["high_volatility", "near_52w_low"])
+    expected = (reg["high_volatility"] | reg["near_52w_low"]).sum()
+    assert len(kept) == expected
+
+
+def test_expanding_percentile_matches_history_rank():
+    rng = np.random.default_rng(3)
+    M = np.round(rng.normal(size=(150, 5)), 1)          # ties
+    M[rng.random(M.shape) < 0.15] = np.nan
+    M[:30, 1] = np.nan
+    out = expanding_percentile(M, min_periods=5)
+    for j in range(M.shape[1]):
+        hist = []
+        for t, v in enumerate(M[:, j]):
+            if np.isnan(v):
+                assert np.isnan(out[t, j])
+                continue
+            hist.append(v)
+            ref = np.mean(np.asarray(hist) <= v) if len(hist) >= 5 else np.nan
+            assert np.isclose(out[t, j], ref, equal_nan=True)
+
+
+def test_feature_matrix_regime_hook():
+    dates = pd.date_range("2023-01-02", periods=90, freq="B")
+    rng = np.random.default_rng(4)
+    prices = pd.concat([
+        pd.DataFrame({"ticker": t, "date": dates,
+                      "close": 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))})
+        for t in ["AAA", "BBB"]
+    ])
+    X, _, _ = build_feature_matrix(prices, {"features": {"regime": {"columns": ["rvol_pct", "high_volatility"],
+                                                                    "vol_min_periods": 20}}})
+    assert {"rvol_pct", "high_volatility"} <= set(X.columns)
+    assert X["high_volatility"].dropna().isin([0.0, 1.0]).all()
+    X0, _, _ = build_feature_matrix(prices, {})
+    assert "rvol_pct" not in X0.columns and len(X0) == len(X)
@@ -0,0 +1,161 @@
+import json
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+import pandas as pd
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.automation.cron import FakeClock, Job, Scheduler  # noqa: E402
+from src.quant_trader.automation.notifier import (  # noqa: E402
+    FileBackend, Message, Notifier, SMTPBackend, WebhookBackend, notifier_from_config,
+    timing_anomaly, trade_messages,
+)
+
+
+class _Recorder:
+    def __init__(self, delay=0.0, fail=False):
+        self.batches, self.delay, self.fail = [], delay, fail
+
+    def send(self, batch):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("backend down")
+        self.batches.append([m.title for m in batch])
+
+
+def test_notify_is_non_blocking_batched_and_rate_limited():
+    slow = _Recorder(delay=0.5)
+    n = Notifier([slow], batch_size=3, flush_interval=0.05, max_batches_per_minute=6000)
+    t0 = time.perf_counter()
+    for i in range(7):
+        assert n.notify(Message(kind="info", title=str(i)))
+    assert time.perf_counter() - t0 < 0.05          # a slow backend never stalls the caller
+    n.close()
+    assert [t for b in slow.batches for t in b] == [str(i) for i in range(7)]
+    assert all(len(b) <= 3 for b in slow.batches)
+
+    # one batch per minute: the second batch must wait for the bucket to refill
+    rec = _Recorder()
+    n = Notifier([rec, _Recorder(fail=True)], batch_size=2, flush_interval=0.01, max_batches_per_minute=1)
+    n.notify_all(Message(kind="info", title=str(i)) for i in range(4))
+    time.sleep(0.3)
+    n.close(timeout=0.2)
+    assert rec.batches == [["0", "1"]]
+    assert n.stats["errors"] == 1
+
+    full = Notifier([rec], max_queue=1, flush_interval=60)
+    full._stop.set()
+    full._thread.join()                              # nobody drains: the queue fills up
+    assert full.notify(Message("info", "a")) and not full.notify(Message("info", "b"))
+    assert full.stats["dropped"] == 1
+
+
+def test_trade_messages_from_positions_diff():
+    ex = pd.DataFrame({
+        "date": pd.to_datetime(["2024-01-02", "2024-01-03", "2024-01-04", "2024-01-05"]),
+        "positions": ["A,B", "A,B", "B,C", ""],
+        "equity": [100.0, 101.0, 102.0, 103.0],
+    })
+    msgs = trade_messages(ex)
+    assert [m.data["buy"] for m in msgs] == [["A", "B"], ["C"], []]
+    assert [m.data["sell"] for m in msgs] == [[], ["A"], ["B", "C"]]
+    latest = trade_messages(ex, since=ex["date"].iloc[-2])
+    assert len(latest) == 1 and latest[0].data["date"] == "2024-01-05"
+
+
+def test_timing_anomaly_threshold():
+    hist = [10.0, 11.0, 9.5, 10.5, 10.2, 30.0]
+    assert timing_anomaly("train", 11.0, hist) is None
+    msg = timing_anomaly("train", 25.0, hist)
+    assert msg is not None and msg.kind == "timing"
+    assert timing_anomaly("train", 99.0, hist[:3]) is None      # not enough history
+
+
+def test_file_webhook_and_smtp_backends(tmp_path, monkeypatch):
+    received = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(204)
+            self.end_headers()
+
+        def log_message(self, *a):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    sent = []
+
+    class FakeSMTP:
+        def __init__(self, host, port, timeout=None):
+            self.calls = [("connect", host, port)]
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *exc):
+            sent.append(self.calls)
+
+        def starttls(self):
+            self.calls.append(("starttls",))
+
+        def login(self, user, password):
+            self.calls.append(("login", user, password))
+
+        def send_message(self, msg):
+            self.calls.append(("send", msg["Subject"], msg.get_content()))
+
+    monkeypatch.setenv("TEST_SMTP_PW", "secret")
+    path = tmp_path / "notes.jsonl"
+    backends = [
+        FileBackend(path),
+        WebhookBackend(f"http://127.0.0.1:{server.server_port}/hook"),
+        SMTPBackend("mail.local", 2525, "bot@x", ["me@x"], username="bot@x", password_env="TEST_SMTP_PW",
+                    starttls=True, smtp_factory=FakeSMTP),
+    ]
+    try:
+        with Notifier(backends, batch_size=10, flush_interval=0.05) as n:
+            n.notify(Message(kind="failure", title="train failed", level="error", body="boom"))
+            n.notify(Message(kind="trade", title="buy A"))
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    lines = [json.loads(x) for x in path.read_text().splitlines()]
+    assert [x["title"] for x in lines] == ["train failed", "buy A"]
+    assert [m["title"] for m in received[0]["messages"]] == ["train failed", "buy A"]
+    calls = sent[0]
+    assert calls[1] == ("starttls",) and calls[2] == ("login", "bot@x", "secret")
+    assert calls[3][1] == "[quant_trader error] 2 notifications" and "boom" in calls[3][2]
+
+    cfg = {"notifications": {"flush_interval": 0.01, "backends": [{"type": "file", "path": str(tmp_path / "c.jsonl")}]}}
+    n = notifier_from_config(cfg)
+    assert isinstance(n.backends[0], FileBackend)
+    n.close()
+    assert notifier_from_config({}) is None
+
+
+def test_scheduler_notifies_final_failure():
+    rec = _Recorder()
+    notifier = Notifier([rec], flush_interval=0.01)
+    clock = FakeClock(datetime(2025, 1, 6, 12, 0, tzinfo=timezone.utc))
+
+    def boom():
+        raise ValueError("bad data")
+
+    sched = Scheduler([Job("fetch", "* * * * *", fn=boom, retries=1)], clock=clock, notifier=notifier)
+    sched.next_run["fetch"] = clock.now()
+    sched.tick()
+    sched.wait()
+    sched.shutdown()
+    notifier.close()
+    assert rec.batches == [["fetch failed (attempt 2)"]]
@@ -0,0 +1,59 @@
+import json
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.modeling.online import update_online  # noqa: E402
+
+
+def _features(dates):
+    rng = np.random.default_rng(len(dates))
+    frames = []
+    for t in ["AAPL", "MSFT", "SPY"]:
+        ret = rng.normal(0, 0.01, len(dates))
+        frames.append(pd.DataFrame({
+            "ticker": t, "date": dates, "ret_1d": ret, "rsi_14": rng.uniform(0, 100, len(dates)),
+            "target": 0.5 * ret + rng.normal(0, 0.002, len(dates)),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_online_update_appends_only_new_rows_then_refits(tmp_path):
+    dates = pd.date_range("2024-01-01", periods=80, freq="B")
+    feat_path, state = tmp_path / "features.parquet", tmp_path / "state"
+    full = _features(dates)
+
+    for method in ("sgd", "gbr_warm"):
+        out_path = tmp_path / f"{method}.parquet"
+        full[full["date"] <= dates[59]].to_parquet(feat_path, index=False)
+        m = update_online(str(feat_path), str(out_path), str(state / method), method=method,
+                          params={"n_estimators": 20} if method == "gbr_warm" else None)
+        assert m["mode"] == "full_refit" and m["n_train"] + m["n_test"] == 180
+        n_before = len(pd.read_parquet(out_path))
+
+        # nothing new: a no-op update
+        m = update_online(str(feat_path), str(out_path), str(state / method), method=method)
+        assert m["mode"] == "update" and m["n_new"] == 0
+
+        # five new days: only those rows are predicted (out-of-sample) and learned from
+        full[full["date"] <= dates[64]].to_parquet(feat_path, index=False)
+        m = update_online(str(feat_path), str(out_path), str(state / method), method=method)
+        assert m["mode"] == "update" and m["n_new"] == 15 and m["n_seen"] == 195
+        preds = pd.read_parquet(out_path)
+        assert len(preds) == n_before + 15
+        assert preds["date"].max() == dates[64] and not preds.duplicated(["ticker", "date"]).any()
+
+    # scheduled refit after `full_refit_every` updates, with a drift report
+    full.to_parquet(feat_path, index=False)
+    m = update_online(str(feat_path), str(tmp_path / "sgd.parquet"), str(state / "sgd"), method="sgd",
+                      full_refit_every=2)
+    assert m["mode"] == "full_refit"
+    assert m["drift"]["n"] > 0 and set(m["drift"]) >= {"corr", "mean_abs_diff", "mse_online", "mse_full"}
+    report = [json.loads(x) for x in (state / "sgd" / "drift.jsonl").read_text().splitlines()]
+    assert report[-1]["n"] == m["drift"]["n"]
+    assert json.loads((state / "sgd" / "state.json").read_text())["updates_since_refit"] == 0
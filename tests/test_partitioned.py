@@ -0,0 +1,71 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from sklearn.tree import DecisionTreeRegressor
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.modeling.baselines import run_baseline  # noqa: E402
+from src.quant_trader.modeling.partitioned import train_partitioned  # noqa: E402
+
+
+def _features(n_dates=120, tickers=("AAA", "BBB", "CCC", "DDD", "EEE")):
+    rng = np.random.default_rng(5)
+    dates = pd.bdate_range("2023-01-02", periods=n_dates)
+    n = n_dates * len(tickers)
+    df = pd.DataFrame({"ticker": np.tile(tickers, n_dates), "date": np.repeat(dates, len(tickers)),
+                       "ret_1d": rng.normal(0, 0.01, n), "rsi_14": rng.uniform(0, 100, n)})
+    slope = df["ticker"].map({"AAA": 1.0, "BBB": -1.0, "CCC": 0.5, "DDD": 0.0, "EEE": 2.0})
+    df["target"] = slope * df["ret_1d"] + rng.normal(0, 0.002, n)
+    return df.sample(frac=1.0, random_state=0).reset_index(drop=True)   # arrives unsorted
+
+
+def test_pooled_matches_baseline_and_ticker_models_match_manual_fits(tmp_path):
+    df = _features()
+    m_base, base = run_baseline(df, out_path=None, return_predictions=True)
+    m_pool, _ = train_partitioned(df, by="pooled", out_path=None, max_workers=1)
+    assert np.isclose(m_pool["r2"], m_base["r2"]) and m_pool["n_test"] == m_base["n_test"]
+
+    out = tmp_path / "part_{by}.parquet"
+    m_tk, timings = train_partitioned(df, by="ticker", out_path=str(out), max_workers=2, min_train_rows=10)
+    preds = pd.read_parquet(tmp_path / "part_ticker.parquet")
+    assert list(preds.columns) == ["ticker", "date", "y_true", "y_pred"]
+    assert preds.equals(preds.sort_values(["date", "ticker"]).reset_index(drop=True))
+    assert set(timings["partition"]) == set(df["ticker"]) and (timings["status"] == "ok").all()
+    assert (tmp_path / "part_ticker_timings.parquet").exists() and m_tk["r2"] > m_pool["r2"]
+
+    cutoff = pd.Timestamp(m_base["cutoff"])
+    g = df[df["ticker"] == "BBB"].sort_values("date")
+    tr, te = g[g["date"] <= cutoff], g[g["date"] > cutoff]
+    manual = DecisionTreeRegressor(max_depth=3, random_state=42).fit(
+        tr[["ret_1d", "rsi_14"]].to_numpy(np.float32), tr["target"]).predict(te[["ret_1d", "rsi_14"]].to_numpy(np.float32))
+    assert np.allclose(preds.loc[preds["ticker"] == "BBB", "y_pred"].to_numpy(), manual)
+
+    serial, _ = train_partitioned(df, by="ticker", out_path=None, max_workers=1, min_train_rows=10)
+    assert serial["mse"] == m_tk["mse"]
+
+
+def test_clusters_and_small_partitions():
+    df = _features()
+    df = df[~((df["ticker"] == "EEE") & (df["date"] > df["date"].min() + pd.Timedelta(days=20)))]
+    m, timings = train_partitioned(df, by="cluster", out_path=None, max_workers=1, min_train_rows=30,
+                                   clusters={"AAA": "up", "CCC": "up", "BBB": "down"})
+    assert sorted(timings["partition"]) == ["down", "other", "up"] and m["n_fitted"] == 3
+    m2, timings2 = train_partitioned(df, by="ticker", out_path=None, max_workers=1, min_train_rows=30)
+    assert timings2.set_index("partition").loc["EEE", "status"] == "skipped" and m2["n_fitted"] == 4
+
+
+def test_universe_restricts_partitions_like_baseline():
+    from src.quant_trader.io.universe import Universe
+    df = _features()
+    uni = Universe.from_frame(pd.DataFrame({"ticker": ["AAA", "BBB", "CCC"],
+                                            "start": ["2023-01-02", "2023-01-02", "2023-03-01"],
+                                            "end": [None, "2023-05-01", None]}))
+    m_base = run_baseline(df, out_path=None, universe=uni)
+    m_pool, _ = train_partitioned(df, by="pooled", out_path=None, max_workers=1, universe=uni)
+    assert np.isclose(m_pool["r2"], m_base["r2"]) and m_pool["n_test"] == m_base["n_test"]
+    _, timings = train_partitioned(df, by="ticker", out_path=None, max_workers=1, min_train_rows=10, universe=uni)
+    assert sorted(timings["partition"]) == ["AAA", "BBB", "CCC"]
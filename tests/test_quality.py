@@ -0,0 +1,79 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.io.quality import check_prices, validate_appended, validate_prices  # noqa: E402
+
+
+def _prices():
+    rng = np.random.default_rng(3)
+    dates = pd.bdate_range("2024-01-01", periods=120)
+    frames = []
+    for t in ["AAA", "BBB", "CCC"]:
+        close = 50 * np.exp(np.cumsum(rng.normal(0, 0.01, len(dates))))
+        frames.append(pd.DataFrame({
+            "ticker": t, "date": dates, "open": close * 1.001, "high": close * 1.02, "low": close * 0.98,
+            "close": close, "adj_close": close, "volume": rng.uniform(1e6, 2e6, len(dates)),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_each_check_flags_the_planted_problem():
+    df = _prices()
+    a = df.index[df["ticker"] == "AAA"]
+    b = df.index[df["ticker"] == "BBB"]
+    c = df.index[df["ticker"] == "CCC"]
+    df.loc[a[10], "close"] = -1.0                                        # nonpositive
+    df.loc[a[20], "high"] = df.loc[a[20], "low"] * 0.5                   # ohlc
+    df.loc[a[40:], ["open", "high", "low", "close"]] *= 0.5              # unadjusted 2:1 split
+    df.loc[a[60], "close"] *= 1.6                                        # bad print
+    df.loc[a[60], ["high"]] = df.loc[a[60], "close"]
+    df.loc[b[30:37], ["open", "high", "low", "close"]] = df.loc[b[29], "close"]   # stale quote
+    df.loc[b[50], "volume"] = 5e9                                        # volume spike
+    df = df.drop(c[70:75])                                               # a week missing
+    df = pd.concat([df, df.loc[[b[5]]]])                                 # duplicate row
+    df = df.sample(frac=1.0, random_state=1)                             # arrives unsorted
+
+    rep = validate_prices(df)
+    rows = lambda check: set(df.loc[rep.has(check), ["ticker", "date"]].itertuples(index=False, name=None))
+    dates = pd.bdate_range("2024-01-01", periods=120)
+    assert rows("nonpositive") == {("AAA", dates[10])}
+    assert rows("ohlc") == {("AAA", dates[20])}
+    assert rows("split") == {("AAA", dates[40])}
+    assert ("AAA", dates[60]) in rows("outlier")
+    assert rows("stale") == {("BBB", dates[i]) for i in range(29, 37)}
+    assert ("BBB", dates[50]) in rows("volume")
+    assert rows("gap") == {("CCC", dates[75])}
+    assert rows("duplicate") == {("BBB", dates[5])} and rep.counts["duplicate"] == 1
+    assert rep.quarantine.sum() == 3                                     # duplicate, nonpositive, ohlc
+    bt = rep.by_ticker.set_index("ticker")
+    assert bt.loc["CCC", "missing_bdays"] == 5 and bt.loc["BBB", "rows"] == 121
+
+    clean = rep.clean(df)
+    assert len(clean) == len(df) - 3 and not clean.duplicated(["ticker", "date"]).any()
+
+
+def test_clean_frame_and_config_wrapper(tmp_path):
+    df = _prices()
+    rep = validate_prices(df)
+    assert rep.ok and rep.summary().endswith("no issues")
+    kept, rep = check_prices(df, {"data": {"quality": {"stale_run": 3, "quarantine": ["stale"]}}},
+                             report_path=str(tmp_path / "q.parquet"))
+    assert len(kept) == len(df) and len(pd.read_parquet(tmp_path / "q.parquet")) == 3
+    assert validate_prices(df.iloc[:0]).n_rows == 0
+
+
+def test_validate_appended_checks_bars_against_each_tickers_tail():
+    df = _prices()
+    hist = df[df["date"] < df["date"].max()]
+    bars = df[df["date"] == df["date"].max()].copy()
+    bars.loc[bars["ticker"] == "AAA", "close"] = -5.0                   # bad print
+    fix = hist[hist["ticker"] == "BBB"].tail(1).assign(close=lambda d: d["close"] * 1.001)   # a correction
+    kept, rep = validate_appended(hist, pd.concat([bars, fix]), tail=50)
+    assert sorted(kept["ticker"]) == ["BBB", "BBB", "CCC"]             # the correction is not a duplicate
+    assert rep.n_rows == 3 * 50 + 4 and rep.counts["nonpositive"] == 1
@@ -0,0 +1,45 @@
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+pytest.importorskip("duckdb")
+from src.quant_trader.io.query import QueryLayer  # noqa: E402
+from src.quant_trader.simulation.metrics import summarize  # noqa: E402
+
+
+def test_views_stats_and_leaderboard(tmp_path):
+    (tmp_path / "data" / "processed").mkdir(parents=True)
+    (tmp_path / "outputs" / "backtests").mkdir(parents=True)
+    dates = pd.date_range("2024-01-02", periods=50, freq="B")
+    rng = np.random.default_rng(3)
+    prices = pd.concat([pd.DataFrame({"ticker": t, "date": dates, "volume": 1e5,
+                                      "close": 100 * np.exp(np.cumsum(rng.normal(0, 0.01, 50)))})
+                        for t in ["AAPL", "MSFT"]])
+    prices.to_parquet(tmp_path / "data" / "processed" / "prices.parquet", index=False)
+    expected = {}
+    for i in range(3):
+        port = pd.DataFrame({"date": dates, "ret_port": rng.normal(0.001, 0.01, 50)})
+        port.to_parquet(tmp_path / "outputs" / "backtests" / f"vec_k{i}.parquet", index=False)
+        expected[f"vec_k{i}"] = summarize(port)
+
+    q = QueryLayer(tmp_path)
+    assert {"prices", "backtests"} <= set(q.views)
+
+    stats = q.ticker_stats(start="2024-02-01", tickers=["MSFT"]).to_pandas()
+    assert stats["ticker"].tolist() == ["MSFT"]
+    assert stats["n_rows"].iloc[0] == (dates >= "2024-02-01").sum()
+
+    part = q.slice(start="2024-01-03", end="2024-01-05", columns=["ticker", "close"])
+    assert part.column_names == ["ticker", "close"] and part.num_rows == 6
+
+    lb = q.leaderboard(by="Sharpe", n=3, kind="vec").to_pandas()
+    assert lb["Sharpe"].is_monotonic_decreasing
+    for _, r in lb.iterrows():
+        m = expected[r["name"]]
+        assert np.isclose(r["Sharpe"], m["Sharpe"]) and np.isclose(r["MaxDD"], m["MaxDD"])
@@ -0,0 +1,74 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from statistics import NormalDist
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.io.experiments import ExperimentStore  # noqa: E402
+from src.quant_trader.simulation.risk import (  # noqa: E402
+    benchmark_returns, factor_returns, rolling_beta, rolling_exposures, rolling_parametric_var,
+    rolling_risk, rolling_var_cvar,
+)
+
+
+def test_rolling_statistics_match_window_recomputation():
+    rng = np.random.default_rng(1)
+    T, N, w = 120, 4, 30
+    R = rng.standard_t(4, (T, N)) * 0.01
+    R[50, 2] = np.nan
+    b = rng.normal(0, 0.01, T)
+    F = rng.normal(0, 0.01, (T, 2))
+
+    var, cvar = rolling_var_cvar(R, w, 0.1, min_periods=20)
+    var_p, cvar_p = rolling_parametric_var(R, w, 0.1, min_periods=20)
+    beta = rolling_beta(R, b, w, min_periods=20)
+    E = rolling_exposures(R, F, w)
+    z = NormalDist().inv_cdf(0.1)
+    for t in (25, 60, 119):
+        for j in range(N):
+            win = slice(max(t - w + 1, 0), t + 1)
+            x = R[win, j]
+            ok = ~np.isnan(x)
+            q = np.quantile(x[ok], 0.1)
+            assert np.isclose(var[t, j], -q) and np.isclose(cvar[t, j], -x[ok][x[ok] <= q].mean())
+            mu, sd = x[ok].mean(), x[ok].std(ddof=1)
+            assert np.isclose(var_p[t, j], -(mu + z * sd))
+            assert np.isclose(cvar_p[t, j], -(mu - sd * NormalDist().pdf(z) / 0.1))
+            assert np.isclose(beta[t, j], np.cov(x[ok], b[win][ok])[0, 1] / np.var(b[win][ok], ddof=1))
+            if t >= w - 1 and ok.all():
+                coef = np.linalg.lstsq(np.c_[np.ones(w), F[win]], x, rcond=None)[0][1:]
+                assert np.allclose(E[t, j], coef)
+    assert np.isnan(var[18]).all() and np.isnan(E[50:50 + w, 2]).all()
+    assert np.allclose(rolling_var_cvar(R[:, 0], w)[0], rolling_var_cvar(R, w)[0][:, 0], equal_nan=True)
+
+
+def test_sweep_matrix_report_and_benchmark_read(tmp_path):
+    rng = np.random.default_rng(2)
+    dates = pd.bdate_range("2024-01-01", periods=60)
+    prices = pd.DataFrame({
+        "ticker": np.repeat(["SPY", "AAA", "BBB", "CCC"], 60), "date": np.tile(dates, 4),
+        "close": np.exp(np.cumsum(rng.normal(0, 0.01, 240))) * 100, "volume": rng.uniform(1e6, 2e6, 240),
+    })
+    path = tmp_path / "prices.parquet"
+    prices.to_parquet(path, index=False)
+    bench = benchmark_returns(str(path), ["SPY"])
+    spy = np.log(prices.loc[prices["ticker"] == "SPY", "close"].to_numpy())
+    assert list(bench.columns) == ["SPY"] and np.allclose(bench["SPY"].to_numpy()[:-1], np.diff(spy))
+    assert np.isnan(bench["SPY"].iloc[-1])
+
+    store = ExperimentStore(tmp_path / "exp")
+    ids = [store.record(pd.DataFrame({"date": dates, "ret_port": rng.normal(0, 0.01, 60)}), kind="vec")
+           for _ in range(3)]
+    M = store.return_matrix(ids)
+    assert list(M.columns) == ids and M.shape == (60, 3)
+
+    fac = factor_returns(prices, market=bench["SPY"], mom_lookback=20, mom_skip=5, size_window=10)
+    risk = rolling_risk(M, window=20, alpha=0.05, benchmarks=bench, factors=fac)
+    assert len(risk) == 180 and {"var_hist", "cvar_param", "beta_SPY", "exp_mkt", "exp_smb", "exp_mom"} <= set(risk)
+    last = risk[risk["date"] == dates[-2]].set_index("series")
+    assert np.isclose(last.loc[ids[1], "beta_SPY"], rolling_beta(M[ids[1]], bench["SPY"].to_numpy(), 20)[-2])
+    assert (last["cvar_hist"] >= last["var_hist"]).all()
@@ -0,0 +1,29 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.features.targets import build_targets  # noqa: E402
+
+
+def test_forward_targets_respect_ticker_boundaries():
+    dates = pd.date_range("2024-01-02", periods=30, freq="B")
+    rng = np.random.default_rng(4)
+    prices = pd.concat([
+        pd.DataFrame({"ticker": t, "date": dates,
+                      "close": 100 * np.exp(np.cumsum(rng.normal(0, 0.02, len(dates))))})
+        for t in ["AAPL", "MSFT"]
+    ], ignore_index=True)
+
+    out = build_targets(prices, horizons=(1, 5))
+    close = prices.sort_values(["ticker", "date"])["close"].reset_index(drop=True)
+    ref5 = np.log(close.groupby(out["ticker"]).shift(-5) / close)
+    assert np.allclose(out["fwd_ret_5d"], ref5, equal_nan=True)
+    # last 5 rows of each ticker have no 5-day target
+    assert out.groupby("ticker")["fwd_ret_5d"].apply(lambda s: s.tail(5).isna().all()).all()
+    assert (out["fwd_mdd_5d"].dropna() <= 0).all()
+    assert set(out["fwd_up_1d"].dropna().unique()) <= {0.0, 1.0}
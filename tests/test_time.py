@@ -0,0 +1,61 @@
+import sys
+import numpy as np
+import pandas as pd
+import pytest
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.utils.time import TradingCalendar, calendar_from_config, get_calendar  # noqa: E402
+
+
+def test_nyse_and_tsx_sessions():
+    nyse = get_calendar("XNYS")
+    counts = {y: len(nyse.sessions_in_range(f"{y}-01-01", f"{y}-12-31")) for y in range(2019, 2026)}
+    assert counts == {2019: 252, 2020: 253, 2021: 252, 2022: 251, 2023: 250, 2024: 252, 2025: 250}
+    assert pd.Timestamp("2021-12-31") in nyse.sessions          # Saturday New Year: no Friday holiday
+    assert pd.Timestamp("2022-06-20") in nyse.holidays          # Juneteenth observed
+    assert list(nyse.early_closes[nyse.early_closes.year == 2024].strftime("%m-%d")) == ["07-03", "11-29", "12-24"]
+    closes = nyse.closes("2024-11-29", "2024-11-29")
+    assert closes[0].hour == 13 and str(closes[0].tz) == "America/New_York"
+
+    tsx = TradingCalendar("XTSE", "2021-01-01", "2021-12-31")
+    assert {"2021-05-24", "2021-08-02", "2021-10-11", "2021-12-27", "2021-12-28"} <= set(tsx.holidays.strftime("%Y-%m-%d"))
+    assert calendar_from_config({"project": {"calendar": "XNYS"}}) is nyse
+
+
+def test_session_ids_and_alignment():
+    cal = get_calendar("XNYS")
+    d = pd.to_datetime(["2024-07-03", "2024-07-04", "2024-07-05", "2024-07-06"])
+    exact = cal.session_ids(d)
+    assert exact.dtype == np.int32 and exact[1] == -1 and exact[3] == -1 and exact[2] == exact[0] + 1
+    assert (cal.session_ids(d, how="previous") == exact[[0, 0, 2, 2]]).all()
+    assert cal.session_ids(d, how="next")[1] == exact[2]
+    assert cal.offset(["2024-07-03"], 1)[0] == pd.Timestamp("2024-07-05")
+
+    df = pd.DataFrame({
+        "ticker": ["B", "A", "A", "B", "A"],
+        "date": pd.to_datetime(["2024-07-01", "2024-07-01", "2024-07-03", "2024-07-05", "2024-07-06"]),
+        "close": [10.0, 1.0, 2.0, 12.0, 99.0],                  # the Saturday bar is dropped
+    })
+    panel, M = cal.align(df, ["close"], ffill=True)
+    assert list(panel.dates.strftime("%m-%d")) == ["07-01", "07-02", "07-03", "07-05"]
+    assert list(panel.tickers) == ["A", "B"]
+    assert np.array_equal(M["close"], [[1, 10], [1, 10], [2, 10], [2, 12]])
+    with pytest.raises(ValueError):
+        cal.panel(df["date"], df["ticker"])
+
+
+def test_panel_from_long_with_calendar_matches_factorize():
+    from src.quant_trader.utils.panel import Panel
+    cal = get_calendar("XNYS")
+    d = pd.to_datetime(["2024-07-05", "2024-07-01", "2024-07-03", "2024-07-05", "2024-07-01"])
+    t = ["A", "B", "A", "B", "A"]
+    a, b = Panel.from_long(d, t), Panel.from_long(d, t, cal)
+    assert a.dates.equals(b.dates) and a.tickers.equals(b.tickers)
+    assert np.array_equal(a.row, b.row) and np.array_equal(a.col, b.col) and b.row.dtype == np.int32
+    # a non-session date (July 4th) falls back to factorizing
+    c = Panel.from_long(d.insert(0, pd.Timestamp("2024-07-04")), ["A", *t], cal)
+    assert list(c.dates.strftime("%m-%d")) == ["07-01", "07-03", "07-04", "07-05"]
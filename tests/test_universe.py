@@ -0,0 +1,91 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.io.universe import Universe, universe_from_config  # noqa: E402
+from src.quant_trader.simulation.exact import run_exact_long_only_topk  # noqa: E402
+from src.quant_trader.simulation.vectorized import TopKPivot, long_only_topk  # noqa: E402
+
+
+def _membership():
+    return Universe.from_frame(pd.DataFrame({
+        "ticker": ["A", "A", "B", "C"],
+        "start": ["2024-01-01", "2024-01-09", "2024-01-03", "2024-01-01"],
+        "end": ["2024-01-05", None, "2024-01-04", "2024-01-10"],
+    }))
+
+
+def test_intervals_compile_to_bitset_and_update(tmp_path):
+    uni = _membership()
+    dates = pd.bdate_range("2024-01-01", "2024-01-12")
+    mask = uni.compile(dates, ["A", "B", "C", "D"])
+    M = mask.dense()
+    expect = np.zeros((len(dates), 4), dtype=bool)
+    for j, t in enumerate("ABCD"):
+        expect[:, j] = [t in uni.members(d) for d in dates]
+    assert np.array_equal(M, expect) and mask.bits.shape == (len(dates), 1)
+    assert list(M[:, 0]) == [True] * 5 + [False, True, True, True, True]   # out Jan 8, back Jan 9
+
+    long = pd.DataFrame({"date": np.repeat(dates, 4), "ticker": np.tile(list("ABCD"), len(dates))})
+    assert np.array_equal(mask.rows(long["date"], long["ticker"]), M.ravel())
+
+    # incremental: events add D and remove C early; an interval with a known start closes A
+    uni2 = uni.update(pd.DataFrame({"date": ["2024-01-08", "2024-01-04"], "ticker": ["D", "C"],
+                                    "action": ["add", "remove"]}))
+    assert uni2.members("2024-01-04") == ["A", "B"] and uni2.members("2024-01-03") == ["A", "B", "C"]
+    uni2 = uni2.update(pd.DataFrame({"ticker": ["A", "C"], "start": ["2024-01-09", "2024-01-01"],
+                                     "end": ["2024-01-10", "2024-01-03"]}))
+    assert uni2.members("2024-01-11") == ["D"] and uni2.members("2024-01-03") == ["A", "B", "C"]
+    path = tmp_path / "membership.csv"
+    uni2.save(str(path))
+    cfg = {"data": {"universe": {"path": str(path)}}}
+    pd.testing.assert_frame_equal(universe_from_config(cfg).intervals, uni2.intervals)
+    assert universe_from_config({"data": {"universe": {"path": None}}}) is None
+
+
+def test_simulators_only_pick_members():
+    rng = np.random.default_rng(0)
+    dates = pd.bdate_range("2024-01-01", "2024-01-12")
+    preds = pd.DataFrame({"date": np.repeat(dates, 4), "ticker": np.tile(list("ABCD"), len(dates)),
+                          "y_true": rng.normal(0, 0.01, 4 * len(dates))})
+    preds["y_pred"] = preds["ticker"].map({"A": 0.1, "B": 0.3, "C": 0.2, "D": 0.4})  # D never a member
+    uni = _membership()
+    vec = long_only_topk(preds, k=1, universe=uni)
+    expected = long_only_topk(uni.filter(preds), k=1)
+    pd.testing.assert_frame_equal(vec.reset_index(drop=True), expected.reset_index(drop=True))
+
+    ex = run_exact_long_only_topk(preds, k=1, universe=uni)
+    assert ex.set_index("date")["positions"].to_dict() == {
+        d: ("B" if d in pd.DatetimeIndex(["2024-01-03", "2024-01-04"]) else
+            "C" if d <= pd.Timestamp("2024-01-10") else "A") for d in dates}
+    assert np.isnan(TopKPivot.from_preds(preds, uni).pred[:, 3]).all()
+
+
+def test_repeated_add_events_are_no_ops():
+    uni = Universe.from_frame(pd.DataFrame({
+        "date": ["2020-01-01", "2020-06-01", "2021-01-01", "2021-02-01", "2021-03-01"],
+        "ticker": ["A", "A", "A", "A", "B"],
+        "action": ["add", "add", "remove", "remove", "add"],
+    }))
+    a = uni.intervals[uni.intervals["ticker"] == "A"]
+    assert len(a) == 1 and a["start"].item() == pd.Timestamp("2020-01-01")
+    assert a["end"].item() == pd.Timestamp("2020-12-31")
+    assert uni.members("2020-09-01") == ["A"] and uni.members("2021-06-01") == ["B"]
+
+
+def test_remove_event_closes_a_stored_open_interval():
+    uni = Universe.from_frame(pd.DataFrame({"ticker": ["A", "B"], "start": ["2020-01-01", "2020-01-01"],
+                                            "end": [None, None]}))
+    uni2 = uni.update(pd.DataFrame({"date": ["2021-01-01"], "ticker": ["A"], "action": ["remove"]}))
+    a = uni2.intervals[uni2.intervals["ticker"] == "A"]
+    assert a["end"].item() == pd.Timestamp("2020-12-31")
+    assert uni2.members("2021-06-01") == ["B"] and uni2.members("2020-12-31") == ["A", "B"]
+    # add (already a member) then remove in one batch still ends the stored span
+    uni3 = uni.update(pd.DataFrame({"date": ["2020-06-01", "2021-01-01"], "ticker": ["A", "A"],
+                                    "action": ["add", "remove"]}))
+    assert uni3.members("2021-06-01") == ["B"] and uni3.members("2020-03-01") == ["A", "B"]
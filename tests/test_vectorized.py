@@ -0,0 +1,59 @@
+import sys
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+REPO = Path(__file__).resolve().parents[1]
+if str(REPO) not in sys.path:
+    sys.path.append(str(REPO))
+
+from src.quant_trader.simulation.vectorized import (  # noqa: E402
+    TopKPivot, hold_period_rows, long_only_topk, topk_selections,
+)
+
+
+def _groupby_topk(preds, k, threshold=None, holding_days=1):
+    # the long-frame rank(method="first") formulation the matrix path replaces
+    df = preds.dropna(subset=["y_true", "y_pred"]).copy()
+    df["date"] = pd.to_datetime(df["date"])
+    df = hold_period_rows(df, holding_days)
+    if threshold is not None:
+        df = df[df["y_pred"] > threshold]
+    df["rank"] = df.groupby("date")["y_pred"].rank(method="first", ascending=False)
+    sel = df[df["rank"] <= k]
+    return (sel.groupby("date", as_index=False)["y_true"].mean()
+               .rename(columns={"y_true": "ret_port"}).sort_values("date").reset_index(drop=True))
+
+
+def test_matrix_topk_matches_groupby_rank_with_ties_and_gaps():
+    rng = np.random.default_rng(7)
+    dates = pd.date_range("2024-01-01", periods=25, freq="B")
+    tickers = [f"T{i}" for i in range(9)]
+    preds = pd.DataFrame([(t, d) for d in dates for t in tickers], columns=["ticker", "date"])
+    preds = preds.sample(frac=1.0, random_state=3).reset_index(drop=True)   # tie order != ticker order
+    preds["y_pred"] = rng.integers(0, 4, len(preds)) / 100.0                 # many ties
+    preds["y_true"] = rng.normal(0, 0.01, len(preds))
+    preds.loc[rng.random(len(preds)) < 0.1, "y_pred"] = np.nan
+    preds.loc[rng.random(len(preds)) < 0.1, "y_true"] = np.nan
+
+    pivot = TopKPivot.from_preds(preds)
+    for k in (1, 3, 20):
+        for threshold in (None, 0.015):
+            for h in (1, 3):
+                want = _groupby_topk(preds, k, threshold, h)
+                got = long_only_topk(preds, k=k, threshold=threshold, holding_days=h, pivot=pivot)
+                pd.testing.assert_frame_equal(got, want, check_dtype=False)
+
+
+def test_topk_selections_sets_and_counts():
+    preds = pd.DataFrame({
+        "ticker": ["A", "B", "C", "A", "B", "C"],
+        "date": pd.to_datetime(["2024-01-02"] * 3 + ["2024-01-03"] * 3),
+        "y_pred": [0.03, 0.01, 0.02, -0.01, 0.05, -0.02],
+        "y_true": [0.01, 0.02, 0.03, 0.04, 0.05, 0.06],
+    })
+    sel = topk_selections(preds, k=2, threshold=0.0)
+    assert sel["selected"].tolist() == [("A", "C"), ("B",)]
+    assert sel["n_selected"].tolist() == [2, 1]
+    assert np.allclose(sel["ret_port"], [0.02, 0.05])
+    assert long_only_topk(preds.iloc[:0], k=2).empty